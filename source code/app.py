@@ -1,17 +1,69 @@
 import sys
+import io
+import re
+import csv
+import json
+import bisect
+import glob
+import gzip
+import queue
+import atexit
+import socket
+import select
+import asyncio
+import getpass
+import shutil
+import tarfile
+import tempfile
+import hashlib
+import time
+import datetime
+import argparse
+import functools
+import itertools
+import multiprocessing
+import ipaddress
+import threading
 import psycopg2
+import psycopg2.pool
+import psycopg2.extensions
+import psycopg2.extras
+import psycopg2.errors
 import logging
+import logging.handlers
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 import os
-from PyQt6.QtWidgets import (QApplication, QMessageBox, QDateEdit, QFileDialog, QTabWidget, QMainWindow, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QWidget, QLineEdit, QLabel, QDialog, QFormLayout, QTextEdit, QComboBox, QHBoxLayout)
-from PyQt6.QtCore import Qt, QDate
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from PyQt6.QtWidgets import (QApplication, QMessageBox, QDateEdit, QFileDialog, QTabWidget, QMainWindow, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QWidget, QLineEdit, QLabel, QDialog, QFormLayout, QTextEdit, QComboBox, QHBoxLayout, QTableView, QStyledItemDelegate, QProgressBar, QTreeWidget, QTreeWidgetItem, QSpinBox, QProgressDialog, QListView, QCheckBox)
+from PyQt6.QtCore import Qt, QDate, QTimer, QAbstractTableModel, QAbstractListModel, QModelIndex, QEvent, QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QColor, QFont, QFontDatabase
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, TableStyle, LongTable
 from reportlab.lib.styles import getSampleStyleSheet
+from xml.sax.saxutils import escape
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+try:
+    import maxminddb
+except ImportError:  # IP enrichment is optional
+    maxminddb = None
+
+try:
+    import dns.asyncresolver
+    import dns.resolver
+except ImportError:  # Without dnspython, domains resolve through getaddrinfo (A/AAAA only)
+    dns = None
 
 
 load_dotenv()
@@ -26,18 +78,75 @@ class Config:
     DB_PASSWORD = os.getenv("DB_PASSWORD", "yourpassword")
     DB_HOST = os.getenv("DB_HOST", "localhost")
     DB_PORT = os.getenv("DB_PORT", "5432")
+    DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+    DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+    DB_POOL_HEALTH_CHECK = int(os.getenv("DB_POOL_HEALTH_CHECK", "30"))  # Seconds idle before a connection is pinged
 
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
     LOG_FILE_PATH = os.getenv("LOG_FILE_PATH", "logs/user_activity.log")
+    LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")  # e.g. "midnight"; empty rotates by size instead
+    LOG_ROTATE_MB = int(os.getenv("LOG_ROTATE_MB", "50"))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "20"))  # Compressed segments kept
+    LOG_RATE_WINDOW = float(os.getenv("LOG_RATE_WINDOW", "10"))  # Seconds
+    LOG_RATE_BURST = int(os.getenv("LOG_RATE_BURST", "5"))  # Identical messages allowed per window
+
+    # Audit Trail
+    AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+    AUDIT_USER = os.getenv("AUDIT_USER") or getpass.getuser()
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "2"))  # Seconds between batched writes
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))  # Events that trigger an early write
+    AUDIT_PAGE_SIZE = int(os.getenv("AUDIT_PAGE_SIZE", "500"))  # Events per page in the log viewer
 
     # Reports
     REPORT_FONT = os.getenv("REPORT_FONT", "Helvetica")
     REPORT_TITLE = os.getenv("REPORT_TITLE", "OSINT Case Report")
     REPORT_SAVE_PATH = os.getenv("REPORT_SAVE_PATH", "reports/")
+    REPORT_TABLE_CHUNK = int(os.getenv("REPORT_TABLE_CHUNK", "500"))  # Rows per report table
+    REPORT_CACHE_PATH = os.getenv("REPORT_CACHE_PATH", "reports/.cache/")
+    REPORT_CACHE_MAX_MB = int(os.getenv("REPORT_CACHE_MAX_MB", "512"))
+    REPORT_CACHE_MAX_DAYS = int(os.getenv("REPORT_CACHE_MAX_DAYS", "30"))
+
+    # Exports
+    EXPORT_PATH = os.getenv("EXPORT_PATH", "exports/")
+    EXPORT_FORMAT = os.getenv("EXPORT_FORMAT", "jsonl")  # jsonl, csv or parquet
+    EXPORT_COMPRESSION = os.getenv("EXPORT_COMPRESSION", "gzip")  # none or gzip; parquet also snappy or zstd
+    EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "10000"))  # Rows per server-side cursor fetch
+    BUNDLE_PATH = os.getenv("BUNDLE_PATH", "bundles/")  # Default folder for exported case bundles
+
+    # IP Enrichment
+    GEOIP_CITY_DB = os.getenv("GEOIP_CITY_DB", "geoip/GeoLite2-City.mmdb")  # Location
+    GEOIP_ASN_DB = os.getenv("GEOIP_ASN_DB", "geoip/GeoLite2-ASN.mmdb")  # ISP; a GeoIP2-ISP database also works
+    ENRICH_ON_IMPORT = os.getenv("ENRICH_ON_IMPORT", "true").lower() == "true"  # Enrich new IPs in the background
+    ENRICH_DELAY = float(os.getenv("ENRICH_DELAY", "10"))  # Seconds to coalesce imports
+    ENRICH_BATCH = int(os.getenv("ENRICH_BATCH", "20000"))  # IPs read and updated per batch
+    ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "4"))  # Lookup threads
+
+    # DNS Resolution
+    DNS_BACKEND = os.getenv("DNS_BACKEND", "")  # dnspython or system; empty picks dnspython when installed
+    DNS_NAMESERVERS = os.getenv("DNS_NAMESERVERS", "")  # Comma-separated; empty uses the system configuration
+    DNS_PORT = int(os.getenv("DNS_PORT", "53"))
+    DNS_TIMEOUT = float(os.getenv("DNS_TIMEOUT", "3"))  # Seconds per query
+    DNS_RETRIES = int(os.getenv("DNS_RETRIES", "2"))  # Extra attempts after a timeout or server failure
+    DNS_CONCURRENCY = int(os.getenv("DNS_CONCURRENCY", "200"))  # Queries in flight
+    DNS_RECORD_TYPES = os.getenv("DNS_RECORD_TYPES", "A,AAAA,MX")
+    DNS_NEGATIVE_TTL = int(os.getenv("DNS_NEGATIVE_TTL", "300"))  # Seconds a missing record is remembered
+    DNS_MAX_TTL = int(os.getenv("DNS_MAX_TTL", "86400"))  # Cap on cached answers
+    DNS_BATCH = int(os.getenv("DNS_BATCH", "1000"))  # Domains resolved and written per batch
+    DNS_RESOLVE_ON_IMPORT = os.getenv("DNS_RESOLVE_ON_IMPORT", "false").lower() == "true"  # Uses the network
+    DNS_DELAY = float(os.getenv("DNS_DELAY", "10"))  # Seconds to coalesce imports
 
     # UI Settings
     THEME_MODE = os.getenv("THEME_MODE", "Dark")
+    CASE_PAGE_SIZE = int(os.getenv("CASE_PAGE_SIZE", "200"))  # Cases fetched per scroll page
+    SEARCH_DEBOUNCE_MS = int(os.getenv("SEARCH_DEBOUNCE_MS", "300"))
+    SEARCH_RESULT_LIMIT = int(os.getenv("SEARCH_RESULT_LIMIT", "50"))  # Per entity type
+    CASE_CACHE_MB = int(os.getenv("CASE_CACHE_MB", "64"))  # Opened cases kept in memory; 0 disables
+    PLAN_SEQ_SCAN_ROWS = int(os.getenv("PLAN_SEQ_SCAN_ROWS", "10000"))  # check-plans flags bigger scanned tables
+    CORRELATION_REFRESH_DELAY = float(os.getenv("CORRELATION_REFRESH_DELAY", "5"))  # Seconds to coalesce writes
+    ENTITY_GC_ENABLED = os.getenv("ENTITY_GC_ENABLED", "true").lower() == "true"  # Delete entities no case links
+    ENTITY_GC_DELAY = float(os.getenv("ENTITY_GC_DELAY", "60"))  # Seconds to coalesce unlinks
+    ENTITY_GC_BATCH = int(os.getenv("ENTITY_GC_BATCH", "5000"))  # Rows deleted per transaction
 
     @classmethod
     def update_setting(cls, key, value):
@@ -60,269 +169,3752 @@ class Config:
 # Database Connection
 DB_CONN = f"dbname={os.getenv('DB_NAME')} user={os.getenv('DB_USER')} password={os.getenv('DB_PASSWORD')} host={os.getenv('DB_HOST')} port={os.getenv('DB_PORT')}"
 # ----------------------LOGS------------------------------
-LOG_DIR = "logs"
-LOG_FILE = os.path.join(LOG_DIR, "user_activity.log")
-
 if not os.path.exists(os.path.dirname(Config.LOG_FILE_PATH)):
     os.makedirs(os.path.dirname(Config.LOG_FILE_PATH))
 
-# ✅ Now setup logging AFTER `Config` is defined
-log_level = getattr(logging, Config.LOG_LEVEL, logging.DEBUG)  # Convert string to log level
-logging.basicConfig(
-    filename=Config.LOG_FILE_PATH,
-    level=log_level,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per line; "time" comes first so the log index can date lines without parsing them."""
+
+    def format(self, record):
+        entry = {
+            "time": f"{self.formatTime(record, '%Y-%m-%d %H:%M:%S')}.{int(record.msecs):03d}",
+            "level": record.levelname,
+            "action": getattr(record, "action", record.getMessage()),
+            "details": getattr(record, "details", ""),
+        }
+        if getattr(record, "case_id", None) is not None:
+            entry["case_id"] = record.case_id
+        if getattr(record, "duration", None) is not None:
+            entry["duration"] = round(record.duration, 4)
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Passes at most `burst` identical messages per `window` seconds; events on different cases differ.
+
+    The first record let through after a quiet period carries a `suppressed` count of what was dropped.
+    Attached to the log file handler only: the audit trail must receive every event.
+    """
+
+    def __init__(self, window, burst):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._seen = {}  # (level, action, details, case_id) -> [window start, passed, dropped]
+
+    def filter(self, record):
+        key = (record.levelno, getattr(record, "action", None), str(getattr(record, "details", record.msg)),
+               getattr(record, "case_id", None))
+        now = time.monotonic()
+        with self._lock:
+            state = self._seen.get(key)
+            if state is None or now - state[0] >= self.window:
+                record.suppressed = state[2] if state else 0
+                self._seen[key] = [now, 1, 0]
+                if len(self._seen) > 10000:
+                    self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+class AuditHandler(logging.Handler):
+    """Write-behind handler that batches application events into the audit_events table.
+
+    emit() only appends to a buffer. A writer thread with its own connection inserts the buffer as
+    multi-row INSERTs every `flush_interval` seconds, or as soon as `batch_size` events are waiting.
+    A batch that fails stays buffered (up to `max_pending` events) and is retried on the next flush.
+    """
+
+    INSERT = """
+        INSERT INTO audit_events (occurred_at, level, username, host, action, details, case_id, duration)
+        VALUES %s
+    """
+    TEMPLATE = "(to_timestamp(%s), %s, %s, %s, %s, %s, %s, %s)"
+
+    def __init__(self, dsn, user, flush_interval=2.0, batch_size=500, max_pending=50000):
+        super().__init__(level=logging.INFO)
+        self.dsn = dsn
+        self.user = user
+        self.host = socket.gethostname()
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._failing = False
+        self._conn = None
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, record):
+        if not hasattr(record, "action"):
+            return  # Only events logged through log_* are audited
+        event = (record.created, record.levelname, self.user, self.host, record.action,
+                 str(record.details), record.case_id, record.duration)
+        with self._pending_lock:
+            self._pending.append(event)
+            del self._pending[:-self.max_pending]
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                if self._conn is None or self._conn.closed:
+                    self._conn = psycopg2.connect(self.dsn)
+                with self._conn.cursor() as cur:
+                    psycopg2.extras.execute_values(cur, self.INSERT, batch, template=self.TEMPLATE,
+                                                   page_size=self.batch_size)
+                self._conn.commit()
+                self._failing = False
+            except psycopg2.Error as e:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                with self._pending_lock:
+                    self._pending[:0] = batch
+                    del self._pending[:-self.max_pending]
+                if not self._failing:
+                    # Straight to stderr, like stdlib handlers: through the root logger it would be
+                    # queued for this same audit trail
+                    logging.lastResort.handle(logging.makeLogRecord({
+                        "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                        "msg": "Audit trail write failed, events kept for retry: %s", "args": (e,)}))
+                    self._failing = True
+
+    def close(self):
+        """Stops the writer and writes whatever is still buffered."""
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        super().close()
+
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+def setup_logging():
+    """Callers only enqueue records; a listener thread writes them to the rotated log file and the audit trail."""
+    if Config.LOG_ROTATE_WHEN:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            Config.LOG_FILE_PATH, when=Config.LOG_ROTATE_WHEN, backupCount=Config.LOG_BACKUP_COUNT, encoding="utf-8")
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            Config.LOG_FILE_PATH, maxBytes=Config.LOG_ROTATE_MB * 1024 * 1024,
+            backupCount=Config.LOG_BACKUP_COUNT, encoding="utf-8")
+    file_handler.namer = lambda name: name + ".gz"
+    file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(JsonLineFormatter())
+    file_handler.addFilter(RateLimitFilter(Config.LOG_RATE_WINDOW, Config.LOG_RATE_BURST))
+
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, Config.LOG_LEVEL, logging.DEBUG))  # Convert string to log level
+    root.addHandler(queue_handler)
+
+    handlers = [file_handler]
+    if Config.AUDIT_ENABLED:
+        handlers.append(AuditHandler(DB_CONN, Config.AUDIT_USER, Config.AUDIT_FLUSH_INTERVAL, Config.AUDIT_BATCH_SIZE))
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # Drains the queue before exit
+    return listener
+
+def init_worker_logging(log_queue):
+    """ProcessPoolExecutor initializer: a worker's records go to the parent's handlers through `log_queue`.
+
+    Spawned workers import this module but never run __main__, so they have no handlers of their own.
+    """
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, Config.LOG_LEVEL, logging.DEBUG))
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
 
 # Logging Functions
-def log_info(action, details=""):
+def _log(level, action, details, case_id, duration):
+    logging.log(level, "%s | %s", action, details,
+                extra={"action": action, "details": details, "case_id": case_id, "duration": duration})
+
+def log_info(action, details="", case_id=None, duration=None):
     """Log general user actions."""
-    message = f"INFO: {action} | Details: {details}"
-    logging.info(message)
+    _log(logging.INFO, action, details, case_id, duration)
 
-def log_warning(action, details=""):
+def log_warning(action, details="", case_id=None, duration=None):
     """Log potential issues (e.g., missing user input)."""
-    message = f"WARNING: {action} | Details: {details}"
-    logging.warning(message)
+    _log(logging.WARNING, action, details, case_id, duration)
 
-def log_error(action, error_message):
+def log_error(action, error_message, case_id=None, duration=None):
     """Log errors and exceptions."""
-    message = f"ERROR: {action} | Details: {error_message}"
-    logging.error(message)
+    _log(logging.ERROR, action, error_message, case_id, duration)
+# ----------------------------------------------------
+
+# ----------------------LOG INDEX------------------------------
+# JSON records (see JsonLineFormatter) and the older "date time - LEVEL - message" text lines
+LOG_DATE_PATTERN = re.compile(rb'(?:\{"time": ")?(\d{4}-\d{2}-\d{2}) ')
+LOG_LEVEL_PATTERN = re.compile(rb'\{"time": "[^"]*", "level": "(\w+)"|\S+ \S+ - (\w+) - ')
+LOG_INDEX_BLOCK = 1024 * 1024
+
+def log_line_date(line):
+    """The YYYY-MM-DD a log line starts with, or None for continuation lines such as tracebacks."""
+    match = LOG_DATE_PATTERN.match(line)
+    return match.group(1).decode() if match else None
+
+def log_line_level(line):
+    match = LOG_LEVEL_PATTERN.match(line)
+    return (match.group(1) or match.group(2)).decode() if match else None
+
+def format_log_line(line):
+    """Display text for a raw log line; JSON records are decoded, anything else is shown as is."""
+    text = line.decode("utf-8", "replace").rstrip("\r\n")
+    if not text.startswith("{"):
+        return text
+    try:
+        entry = json.loads(text)
+    except ValueError:
+        return text
+    text = f"{entry.get('time', '')} - {entry.get('level', '')} - {entry.get('action', '')}"
+    if entry.get("details"):
+        text += f" | {entry['details']}"
+    if entry.get("case_id") is not None:
+        text += f" [case {entry['case_id']}]"
+    if entry.get("duration") is not None:
+        text += f" ({entry['duration'] * 1000:.0f} ms)"
+    if entry.get("suppressed"):
+        text += f" (+{entry['suppressed']} repeats suppressed)"
+    if entry.get("exception"):
+        text += f"\n{entry['exception']}"
+    return text
+
+def open_log_segment(path):
+    """Opens a log segment for binary reading; rotated segments may be gzip-compressed."""
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+def log_segments(path):
+    """The log file and its rotated siblings (user_activity.log.1, user_activity.log.2025-03-05, ...), oldest first."""
+    segments = []
+    for candidate in glob.glob(glob.escape(path) + ".*"):
+        if candidate.endswith((".idx", ".tmp")):
+            continue
+        rotation = re.search(r"\.(\d+)(?:\.gz)?$", candidate)  # Higher numbers are older
+        try:
+            segments.append((os.path.getmtime(candidate), -int(rotation.group(1)) if rotation else 0, candidate))
+        except OSError:
+            continue  # Rotated away while listing
+    paths = [candidate for _, _, candidate in sorted(segments)]
+    if os.path.exists(path):
+        paths.append(path)
+    return paths
+
+
+class LogIndex:
+    """Date -> byte offset index over a log file and its rotated segments, kept in a JSON sidecar.
+
+    Segments are identified by a hash of their first line rather than by name, so entries survive
+    rotation renaming and compressing the file. Each update only scans bytes appended since the
+    last one, and since lines are written in time order, a block whose last dated line carries the
+    current date is skipped without splitting it into lines. Offsets in compressed segments refer
+    to the uncompressed data; those segments never change, so they are scanned at most once.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sidecar = path + ".idx"
+        self._lock = threading.Lock()
+        self._segments = self._load()  # Identity -> {"size": bytes indexed, "days": [[date, first offset], ...]}
+
+    def _load(self):
+        try:
+            with open(self.sidecar, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        temp_path = self.sidecar + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self._segments, f)
+        os.replace(temp_path, self.sidecar)
+
+    @staticmethod
+    def identity(f):
+        f.seek(0)
+        head = f.readline(256)
+        return hashlib.sha1(head).hexdigest() if head else None
+
+    def update(self):
+        """Indexes what was appended since the last call; returns [(path, identity, entry)], oldest first."""
+        with self._lock:
+            indexed = []
+            changed = False
+            for path in log_segments(self.path):
+                try:
+                    with open_log_segment(path) as f:
+                        identity = self.identity(f)
+                        if identity is None:
+                            continue
+                        entry = self._segments.get(identity)
+                        if path.endswith(".gz"):
+                            if entry is None or not entry.get("sealed"):
+                                entry = entry or {"size": 0, "days": []}
+                                self._scan(f, entry, None)
+                                entry["sealed"] = True
+                                changed = True
+                        else:
+                            size = os.fstat(f.fileno()).st_size
+                            if entry is None or entry["size"] > size:
+                                entry = {"size": 0, "days": []}  # New segment, or truncated and rewritten
+                            if entry["size"] < size:
+                                self._scan(f, entry, size)
+                                changed = True
+                except (OSError, EOFError):
+                    continue
+                self._segments[identity] = entry
+                indexed.append((path, identity, entry))
+
+            live = {identity for _, identity, _ in indexed}
+            for identity in [identity for identity in self._segments if identity not in live]:
+                del self._segments[identity]
+                changed = True
+            if changed:
+                self._save()
+            return indexed
+
+    def _scan(self, f, entry, size):
+        """Indexes from entry["size"] up to `size`, or to the end of the data when `size` is None."""
+        offset = entry["size"]
+        last_date = entry["days"][-1][0] if entry["days"] else None
+        f.seek(offset)
+        carry = b""  # Carried over rather than seeking back, which restarts decompression of gzip files
+        while True:
+            want = LOG_INDEX_BLOCK if size is None else min(LOG_INDEX_BLOCK, size - offset - len(carry))
+            chunk = f.read(want) if want > 0 else b""
+            if not chunk:
+                break  # Any unterminated last line is indexed once it is complete
+            block = carry + chunk
+            end = block.rfind(b"\n") + 1
+            if not end:
+                if len(block) < LOG_INDEX_BLOCK:
+                    carry = block
+                    continue
+                end = len(block)  # A single line longer than a block
+            carry = block[end:]
+            block = block[:end]
+
+            if self._last_date(block) != last_date:
+                start = 0
+                while start < end:
+                    line_end = block.find(b"\n", start)
+                    line_end = end if line_end < 0 else line_end + 1
+                    date = log_line_date(block[start:line_end])
+                    if date and date != last_date:
+                        entry["days"].append([date, offset + start])
+                        last_date = date
+                    start = line_end
+            offset += end
+        entry["size"] = offset
+
+    @staticmethod
+    def _last_date(block):
+        end = len(block) - 1
+        while end > 0:
+            start = block.rfind(b"\n", 0, end) + 1
+            date = log_line_date(block[start:end])
+            if date:
+                return date
+            end = start - 1
+        return None
+
+    def ranges(self, start_date, end_date):
+        """(path, start, end) byte ranges holding the lines dated start_date..end_date, oldest first,
+        plus the (identity, end) position of the live file for tailing."""
+        ranges = []
+        position = None
+        for path, identity, entry in self.update():
+            if path == self.path:
+                position = (identity, entry["size"])
+            start = next((offset for date, offset in entry["days"] if date >= start_date), None)
+            end = next((offset for date, offset in entry["days"] if date > end_date), entry["size"])
+            if start is not None and end > start:
+                ranges.append((path, start, end))
+        return ranges, position
+
+_log_index = None
+
+def get_log_index():
+    """Returns the index of Config.LOG_FILE_PATH, loading its sidecar on first use."""
+    global _log_index
+    if _log_index is None:
+        _log_index = LogIndex(Config.LOG_FILE_PATH)
+    return _log_index
+
+def scan_log_lines(ranges, level=None, stop=None, progress=None, chunk_size=5000):
+    """Finds the lines of `ranges` matching `level` and reports their offsets as progress(path, offsets).
+
+    Continuation lines (tracebacks) follow the level of the record they belong to.
+    """
+    for path, start, end in ranges:
+        offsets = array("Q")
+        keep = True
+        with open_log_segment(path) as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if offset >= end or (stop and stop.is_set()):
+                    break
+                if level:
+                    line_level = log_line_level(line)
+                    if line_level is not None:
+                        keep = line_level == level
+                if keep:
+                    offsets.append(offset)
+                    if len(offsets) >= chunk_size:
+                        progress(path, offsets)
+                        offsets = array("Q")
+                offset += len(line)
+        if offsets:
+            progress(path, offsets)
+        if stop and stop.is_set():
+            return
+
+def load_log_range(start_date, end_date, level=None, stop=None, progress=None):
+    """Seeks to the dates through the index and streams matching line offsets; returns the tail position."""
+    ranges, position = get_log_index().ranges(start_date, end_date)
+    scan_log_lines(ranges, level, stop, progress)
+    return position
+
+def tail_log(position, level=None, stop=None, progress=None):
+    """Streams lines appended to the live log since `position`, following it across a rotation."""
+    segments = get_log_index().update()
+    if not segments or segments[-1][0] != Config.LOG_FILE_PATH:
+        return position
+    path, identity, entry = segments[-1]
+    ranges = []
+    offset = 0
+    if position and position[0] == identity:
+        offset = position[1]
+    elif position:
+        # Rotated: finish the old file first
+        for old_path, old_identity, old_entry in segments[:-1]:
+            if old_identity == position[0] and old_entry["size"] > position[1]:
+                ranges.append((old_path, position[1], old_entry["size"]))
+    if entry["size"] > offset:
+        ranges.append((path, offset, entry["size"]))
+    scan_log_lines(ranges, level, stop, progress)
+    return identity, entry["size"]
+# ----------------------------------------------------
+
+# ----------------------DATABASE------------------------------
+class ConnectionPool:
+    """Thread-safe pool of PostgreSQL connections with health checks and reconnects."""
+
+    def __init__(self, dsn, minconn=1, maxconn=10, health_check_interval=30):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = max(maxconn, minconn, 1)
+        self.health_check_interval = health_check_interval
+        self._idle = []  # (connection, returned_at) pairs, most recently used last
+        self._in_use = 0
+        self._lock = threading.Condition()
+        self._prefilled = False
+
+        # Counters
+        self.checkouts = 0
+        self.connects = 0
+        self.reconnects = 0
+
+    @property
+    def connects_avoided(self):
+        """Number of checkouts served by an already open connection."""
+        return self.checkouts - self.connects
+
+    def stats(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "reconnects": self.reconnects,
+                "connects_avoided": self.connects_avoided,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+            }
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        with self._lock:
+            self.connects += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _is_healthy(self, conn, returned_at):
+        """Cheap checks first; only ping the server if the connection sat idle for a while."""
+        if conn.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _prefill(self):
+        for _ in range(self.minconn):
+            conn = self._connect()
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+
+    def getconn(self, timeout=None):
+        """Checks a connection out of the pool, waiting if all `maxconn` are in use."""
+        with self._lock:  # Reentrant: _prefill takes it again
+            if not self._prefilled:
+                try:
+                    self._prefill()
+                except psycopg2.Error as e:
+                    log_error("Database Pool", f"Could not open initial connections: {e}")
+                    raise
+                self._prefilled = True
+
+        with self._lock:
+            while not self._idle and self._in_use >= self.maxconn:
+                if not self._lock.wait(timeout):
+                    raise psycopg2.pool.PoolError("Timed out waiting for a database connection")
+            conn, returned_at = self._idle.pop() if self._idle else (None, None)
+            self._in_use += 1
+            self.checkouts += 1
+
+        try:
+            if conn is not None and not self._is_healthy(conn, returned_at):
+                log_warning("Database Pool", "Dropped a stale connection, reconnecting")
+                self._discard(conn)
+                conn = None
+                with self._lock:
+                    self.reconnects += 1
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Returns a connection to the pool, discarding it if it is broken."""
+        if not close and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        with self._lock:
+            self._in_use -= 1
+            if close or conn.closed or len(self._idle) >= self.maxconn:
+                keep = False
+            else:
+                self._idle.append((conn, time.monotonic()))
+                keep = True
+            self._lock.notify()
+
+        if not keep:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        """Checks out a connection for the duration of a `with` block.
+
+        The connection goes back on every exit, including a generator being closed part-way
+        (GeneratorExit) or KeyboardInterrupt; a broken one is closed instead of reused.
+        """
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, close=broken)
+
+    def closeall(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_db_pool = None
+
+def get_db_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _db_pool
+    if _db_pool is None:
+        _db_pool = ConnectionPool(DB_CONN, Config.DB_POOL_MIN, Config.DB_POOL_MAX, Config.DB_POOL_HEALTH_CHECK)
+    return _db_pool
+
+@contextmanager
+def db_cursor(commit=False):
+    """Yields a cursor on a pooled connection; commits on success when asked, rolls back on error."""
+    with get_db_pool().connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                yield cur
+            if commit:
+                conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+
+_cursor_ids = itertools.count(1)
+
+def stream_rows(query, params=None, chunk_size=1000):
+    """Yields lists of up to `chunk_size` rows from a server-side cursor, holding one pooled connection."""
+    with get_db_pool().connection() as conn:
+        yield from stream_cursor(conn, query, params, chunk_size)
+
+def stream_cursor(conn, query, params=None, chunk_size=1000):
+    """Like stream_rows, on a connection the caller holds, so several streams can share one snapshot."""
+    with conn.cursor(name=f"stream_{next(_cursor_ids)}") as cur:
+        cur.itersize = chunk_size
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+def close_db_pool():
+    """Closes pooled connections on shutdown and records how many connects the pool saved."""
+    if _db_pool is None:
+        return
+    stats = _db_pool.stats()
+    log_info("Database Pool", f"Checkouts: {stats['checkouts']}, Connects: {stats['connects']}, "
+                              f"Connects Avoided: {stats['connects_avoided']}, Reconnects: {stats['reconnects']}")
+    _db_pool.closeall()
+
+class CoalescingJob:
+    """Runs `fn` once `delay` seconds after the last request, so a burst of writes costs a single run."""
+
+    def __init__(self, fn, delay, name):
+        self.fn = fn
+        self.delay = delay
+        self.name = name
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def schedule(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.fn()
+        except Exception as e:
+            log_error(self.name, str(e))
 # ----------------------------------------------------
 
-def generate_report(self):
-    """Generate a PDF report for the case."""
-    options = QFileDialog.Option(0)
-
-    file_path, _ = QFileDialog.getSaveFileName(self, "Save Report", "", "PDF Files (*.pdf)", options=options)
-
-    if not file_path:
-        return  # User canceled
-
-    if not file_path.endswith(".pdf"):
-        file_path += ".pdf"
-
-    # Create a PDF file
-    c = canvas.Canvas(file_path, pagesize=letter)
-    width, height = letter
-
-    # Title
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(100, height - 50, f"Case Report: {self.case_data[0]}")
-
-    # Case Summary
-    c.setFont("Helvetica", 12)
-    y_position = height - 80
-    c.drawString(100, y_position, f"Subject: {self.case_data[1]}")
-    c.drawString(100, y_position - 20, f"Username: {self.case_data[2]}")
-    c.drawString(100, y_position - 40, f"Description: {self.case_data[3]}")
-    c.drawString(100, y_position - 60, f"Created At: {self.case_data[4]}")
-    c.drawString(100, y_position - 80, f"Last Updated: {self.case_data[5]}")
-
-    y_position -= 120  # Move further down
-
-    # IP Addresses
-    if self.case_ips:
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(100, y_position, "IP Addresses")
-        y_position -= 20
-        c.setFont("Helvetica", 12)
-        for ip in self.case_ips:
-            c.drawString(100, y_position, f"{ip[0]} - {ip[1]} ({ip[2]}) Last Seen: {ip[3]}")
-            y_position -= 20
-
-    # Domains
-    if self.case_domains:
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(100, y_position, "Domains")
-        y_position -= 20
-        c.setFont("Helvetica", 12)
-        for domain in self.case_domains:
-            c.drawString(100, y_position, f"{domain[0]} Last Seen: {domain[1]}")
-            y_position -= 20
-
-    # Social Profiles
-    if self.case_social_profiles:
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(100, y_position, "Social Profiles")
-        y_position -= 20
-        c.setFont("Helvetica", 12)
-        for profile in self.case_social_profiles:
-            c.drawString(100, y_position, f"{profile[0]} - {profile[1]}")
-            y_position -= 20
-
-    # Metadata
-    if self.case_metadata:
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(100, y_position, "Metadata")
-        y_position -= 20
-        c.setFont("Helvetica", 12)
-        for meta in self.case_metadata:
-            c.drawString(100, y_position, f"{meta[0]} (Source: {meta[1]}, Found: {meta[2]})")
-            y_position -= 20
-
-    # Notes
-    if self.case_notes:
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(100, y_position, "Notes")
-        y_position -= 20
-        c.setFont("Helvetica", 12)
-        for note in self.case_notes:
-            c.drawString(100, y_position, f"{note[0]} (Created: {note[1]})")
-            y_position -= 20
-
-    # Save PDF
-    c.save()
-
-    print(f"Report saved: {file_path}")
+# ----------------------BACKGROUND WORKER------------------------------
+_db_thread_pool = None
+
+def get_db_thread_pool():
+    """Thread pool for database tasks, sized so no task waits on a pooled connection."""
+    global _db_thread_pool
+    if _db_thread_pool is None:
+        _db_thread_pool = QThreadPool()
+        _db_thread_pool.setMaxThreadCount(Config.DB_POOL_MAX)
+    return _db_thread_pool
+
+
+class _TaskSignals(QObject):
+    done = pyqtSignal(int, bool, object)  # Task ID, succeeded, result or error message
+    progress = pyqtSignal(int, object)  # Task ID, progress update
+
+
+class DBTask(QRunnable):
+    """Runs a single database call off the GUI thread."""
+
+    def __init__(self, task_id, fn, args, kwargs):
+        super().__init__()
+        self.setAutoDelete(False)  # DBWorker keeps a reference so queued tasks can be taken back
+        self.task_id = task_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            log_error(f"Background Task: {getattr(self.fn, '__name__', self.fn)}", str(e))
+            self.signals.done.emit(self.task_id, False, str(e))
+        else:
+            self.signals.done.emit(self.task_id, True, result)
+
+
+class DBWorker(QObject):
+    """Runs database calls on a thread pool and hands results back to the GUI thread.
+
+    Requests submitted on the same `channel` replace each other: an older request that is
+    still queued is dropped, and the result of one that is already running is discarded.
+    """
+    busy_changed = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._next_id = 0
+        self._tasks = {}  # Task ID -> (task, channel, on_result, on_error)
+        self._latest = {}  # Channel -> ID of its newest task
+
+    def submit(self, fn, *args, channel=None, on_result=None, on_error=None, on_progress=None, **kwargs):
+        """Queues fn(*args, **kwargs); `on_result`/`on_error` are called on the GUI thread.
+
+        With `on_progress`, fn is also passed a `progress` callable; every call to it from the
+        worker thread invokes on_progress with the arguments as a tuple, on the GUI thread.
+        """
+        self._next_id += 1
+        task_id = self._next_id
+        if channel is not None:
+            self.cancel(channel)
+            self._latest[channel] = task_id
+
+        task = DBTask(task_id, fn, args, kwargs)
+        task.signals.done.connect(self._on_done)
+        if on_progress:
+            task.signals.progress.connect(self._on_progress)
+            kwargs["progress"] = lambda *update: task.signals.progress.emit(task_id, update)
+        was_idle = not self._tasks
+        self._tasks[task_id] = (task, channel, on_result, on_error, on_progress)
+        get_db_thread_pool().start(task)
+        if was_idle:
+            self.busy_changed.emit(True)
+        return task_id
+
+    def cancel(self, channel):
+        """Cancels the outstanding request on a channel."""
+        task_id = self._latest.pop(channel, None)
+        if task_id in self._tasks and get_db_thread_pool().tryTake(self._tasks[task_id][0]):
+            self._finish(task_id)
+
+    def is_busy(self):
+        return bool(self._tasks)
+
+    def _finish(self, task_id):
+        self._tasks.pop(task_id, None)
+        if not self._tasks:
+            self.busy_changed.emit(False)
+
+    @pyqtSlot(int, bool, object)
+    def _on_done(self, task_id, ok, payload):
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return
+        _, channel, on_result, on_error, _ = entry
+        self._finish(task_id)
+
+        if channel is not None:
+            if self._latest.get(channel) != task_id:
+                return  # Superseded by a newer request
+            del self._latest[channel]
+
+        if ok:
+            if on_result:
+                on_result(payload)
+        elif on_error:
+            on_error(payload)
+        else:
+            self.failed.emit(payload)
+
+    @pyqtSlot(int, object)
+    def _on_progress(self, task_id, update):
+        entry = self._tasks.get(task_id)
+        if entry is None or (entry[1] is not None and self._latest.get(entry[1]) != task_id):
+            return
+        entry[4](update)
+
+
+class ChangeBridge(QObject):
+    """Re-emits change feed notifications (see ChangeListener) as a signal delivered on the GUI thread."""
+    changed = pyqtSignal(object)
+
+_change_bridge = None
+
+def get_change_bridge():
+    """Returns the GUI's change bridge, starting the change feed on first use."""
+    global _change_bridge
+    if _change_bridge is None:
+        _change_bridge = ChangeBridge()
+        start_change_feed().subscribe(_change_bridge.changed.emit)
+    return _change_bridge
+
+def create_busy_indicator():
+    """Indeterminate progress bar shown while a DBWorker has requests in flight."""
+    indicator = QProgressBar()
+    indicator.setRange(0, 0)
+    indicator.setMaximumHeight(8)
+    indicator.setTextVisible(False)
+    indicator.hide()
+    return indicator
+# ----------------------------------------------------
 
 def get_osint_cases():
-    conn = psycopg2.connect(DB_CONN)
-    cur = conn.cursor()
-    cur.execute("SELECT id, case_name, subject_name, username FROM cases")
-    data = cur.fetchall()
-    cur.close()
-    conn.close()
-    return data
+    with db_cursor() as cur:
+        cur.execute("SELECT id, case_name, subject_name, username FROM cases")
+        return cur.fetchall()
+
+def get_osint_cases_by_ids(case_ids, name_filter=None):
+    """Returns those of `case_ids` that still exist and match `name_filter`, for patching the case list."""
+    query = "SELECT id, case_name, subject_name, username FROM cases WHERE id = ANY(%s)"
+    params = [list(case_ids)]
+    if name_filter:
+        query += " AND case_name ILIKE %s"
+        params.append(f"%{name_filter}%")
+    with db_cursor() as cur:
+        cur.execute(query, params)
+        return cur.fetchall()
+
+def case_page_query(filtered):
+    """Keyset page of the case list: params are after_id, [name pattern,] limit."""
+    query = "SELECT id, case_name, subject_name, username FROM cases WHERE id > %s"
+    if filtered:
+        query += " AND case_name ILIKE %s"
+    return query + " ORDER BY id LIMIT %s"
+
+def get_osint_cases_page(after_id=0, limit=200, name_filter=None):
+    """Returns up to `limit` cases with an id greater than `after_id` (keyset pagination)."""
+    params = [after_id] + ([f"%{name_filter}%"] if name_filter else []) + [limit]
+    with db_cursor() as cur:
+        cur.execute(case_page_query(bool(name_filter)), params)
+        return cur.fetchall()
+
+# ----------------------SEARCH------------------------------
+SEARCH_MIN_CHARS = 3  # Trigram indexes can only serve patterns of at least three characters
+
+SEARCH_INDEXES = {
+    "cases_case_name_trgm_idx": "ON cases USING gin (case_name gin_trgm_ops)",
+    "cases_subject_name_trgm_idx": "ON cases USING gin (subject_name gin_trgm_ops)",
+    "cases_username_trgm_idx": "ON cases USING gin (username gin_trgm_ops)",
+    "cases_description_fts_idx": "ON cases USING gin (to_tsvector('english', COALESCE(description, '')))",
+    "ips_ip_address_trgm_idx": "ON ips USING gin (ip_address gin_trgm_ops)",
+    "domains_domain_trgm_idx": "ON domains USING gin (domain gin_trgm_ops)",
+    "social_profiles_profile_url_trgm_idx": "ON social_profiles USING gin (profile_url gin_trgm_ops)",
+    "notes_note_trgm_idx": "ON notes USING gin (note gin_trgm_ops)",
+    "notes_note_fts_idx": "ON notes USING gin (to_tsvector('english', COALESCE(note, '')))",
+    "metadata_info_trgm_idx": "ON metadata USING gin (info gin_trgm_ops)",
+    "metadata_info_fts_idx": "ON metadata USING gin (to_tsvector('english', COALESCE(info, '')))",
+}
+
+# One ranked sub-query per entity type; results are grouped in this order
+SEARCH_QUERIES = [
+    ("Cases", """
+        SELECT c.id, c.case_name, c.case_name AS value,
+               GREATEST(similarity(c.case_name, %(q)s), similarity(c.subject_name, %(q)s),
+                        similarity(c.username, %(q)s),
+                        ts_rank(to_tsvector('english', COALESCE(c.description, '')), plainto_tsquery('english', %(q)s)))
+        FROM cases c
+        WHERE c.case_name ILIKE %(pattern)s OR c.subject_name ILIKE %(pattern)s OR c.username ILIKE %(pattern)s
+           OR to_tsvector('english', COALESCE(c.description, '')) @@ plainto_tsquery('english', %(q)s)
+    """),
+    ("IP Addresses", """
+        SELECT c.id, c.case_name, ip.ip_address, similarity(ip.ip_address, %(q)s)
+        FROM ips ip
+        JOIN case_ips cip ON cip.ip_id = ip.id
+        JOIN cases c ON c.id = cip.case_id
+        WHERE ip.ip_address ILIKE %(pattern)s
+    """),
+    ("Domains", """
+        SELECT c.id, c.case_name, d.domain, similarity(d.domain, %(q)s)
+        FROM domains d
+        JOIN case_domains cd ON cd.domain_id = d.id
+        JOIN cases c ON c.id = cd.case_id
+        WHERE d.domain ILIKE %(pattern)s
+    """),
+    ("Social Profiles", """
+        SELECT c.id, c.case_name, sp.profile_url, similarity(sp.profile_url, %(q)s)
+        FROM social_profiles sp
+        JOIN case_social_profiles csp ON csp.social_profile_id = sp.id
+        JOIN cases c ON c.id = csp.case_id
+        WHERE sp.profile_url ILIKE %(pattern)s
+    """),
+    ("Notes", """
+        SELECT c.id, c.case_name, n.note,
+               GREATEST(similarity(n.note, %(q)s),
+                        ts_rank(to_tsvector('english', COALESCE(n.note, '')), plainto_tsquery('english', %(q)s)))
+        FROM notes n
+        JOIN case_notes cn ON cn.note_id = n.id
+        JOIN cases c ON c.id = cn.case_id
+        WHERE n.note ILIKE %(pattern)s
+           OR to_tsvector('english', COALESCE(n.note, '')) @@ plainto_tsquery('english', %(q)s)
+    """),
+    ("Metadata", """
+        SELECT c.id, c.case_name, m.info,
+               GREATEST(similarity(m.info, %(q)s),
+                        ts_rank(to_tsvector('english', COALESCE(m.info, '')), plainto_tsquery('english', %(q)s)))
+        FROM metadata m
+        JOIN case_metadata cm ON cm.metadata_id = m.id
+        JOIN cases c ON c.id = cm.case_id
+        WHERE m.info ILIKE %(pattern)s
+           OR to_tsvector('english', COALESCE(m.info, '')) @@ plainto_tsquery('english', %(q)s)
+    """),
+]
+
+def ensure_search_indexes(cur):
+    """Creates the pg_trgm extension and any missing search index without blocking writers.
+
+    `cur` must be in autocommit mode: CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    """
+    cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    cur.execute("SELECT indexname FROM pg_indexes WHERE indexname = ANY(%s)", (list(SEARCH_INDEXES),))
+    existing = {row[0] for row in cur.fetchall()}
+    for name, definition in SEARCH_INDEXES.items():
+        if name not in existing:
+            cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+            log_info("Created Search Index", name)
+
+def search_entities(query, limit=50):
+    """Searches cases and every linked entity type; returns {entity type: [(case_id, case_name, value, rank)]}."""
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    params = {"q": query, "pattern": f"%{escaped}%", "limit": limit}
+    statement = " UNION ALL ".join(
+        f"(SELECT %(kind_{i})s, sub.* FROM ({sql}) AS sub ORDER BY 5 DESC LIMIT %(limit)s)"
+        for i, (_, sql) in enumerate(SEARCH_QUERIES)
+    )
+    params.update({f"kind_{i}": kind for i, (kind, _) in enumerate(SEARCH_QUERIES)})
+
+    with db_cursor() as cur:
+        cur.execute(statement, params)
+        rows = cur.fetchall()
+
+    results = {kind: [] for kind, _ in SEARCH_QUERIES}
+    for kind, case_id, case_name, value, rank in rows:
+        results[kind].append((case_id, case_name, value, rank))
+    return {kind: matches for kind, matches in results.items() if matches}
+# ----------------------------------------------------
+
+# ----------------------ENTITIES------------------------------
+# Mapping of main tables to their linking tables and correct identifier columns
+LINK_TABLE_MAP = {
+    "ips": ("case_ips", "ip_id", "ip_address"),  # Match by ip_address
+    "domains": ("case_domains", "domain_id", "domain"),  # Match by domain
+    "social_profiles": ("case_social_profiles", "social_profile_id", "profile_url"),  # Match by profile_url
+    "metadata": ("case_metadata", "metadata_id", "info"),  # Match by info (data field)
+    "notes": ("case_notes", "note_id", "note")  # Match by note content
+}
+
+# Entities shared between cases: one row per normalize_entity_value() result, linked to any number of cases
+SHARED_ENTITIES = {
+    "IP Address": "ips",
+    "Domain": "domains",
+    "Social Profile": "social_profiles",
+}
+
+def normalize_entity_value(category, value):
+    """Canonical form of a value, used as the unique key of shared entities."""
+    value = value.strip()
+    if category == "IP Address":
+        try:
+            return str(ipaddress.ip_address(value))
+        except ValueError:
+            return value.lower()
+    if category == "Domain":
+        return value.lower().rstrip(".")
+    if category == "Social Profile":
+        parts = urlsplit(value)
+        if parts.scheme and parts.netloc:
+            value = parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower()).geturl()
+        return value.rstrip("/")
+    return value
+
+def canonicalize_shared_entities(cur, category):
+    """Rewrites stored values of one shared entity type with normalize_entity_value and merges the duplicates.
+
+    Existing rows are normalized in Python, with the same rules new values go through, so a legacy
+    "2001:0DB8::1" or "HTTPS://Twitter.com/x" ends up on the row a new insert of the canonical value
+    would find. Links move to the lowest id of each group; the other rows are deleted. Returns rows removed.
+    """
+    table = SHARED_ENTITIES[category]
+    link_table, link_column, column = LINK_TABLE_MAP[table]
+    cur.execute(f"LOCK TABLE {table}, {link_table} IN SHARE ROW EXCLUSIVE MODE")
+
+    keep = {}  # Canonical value -> id of the row kept for it
+    remap = []  # (duplicate id, kept id)
+    renames = {}  # Kept id -> canonical value, where the stored text differs
+    with cur.connection.cursor(name=f"canonicalize_{table}") as rows:
+        rows.itersize = 10000
+        rows.execute(f"SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY id")
+        for entity_id, value in rows:
+            canonical = normalize_entity_value(category, value)
+            if canonical in keep:
+                remap.append((entity_id, keep[canonical]))
+                continue
+            keep[canonical] = entity_id
+            if canonical != value:
+                renames[entity_id] = canonical
+
+    if remap:
+        cur.execute("CREATE TEMP TABLE entity_remap (id integer PRIMARY KEY, keep_id integer) ON COMMIT DROP")
+        psycopg2.extras.execute_values(cur, "INSERT INTO entity_remap (id, keep_id) VALUES %s", remap, page_size=10000)
+        # Link the kept row wherever a duplicate was linked, then drop the duplicates and their links
+        cur.execute(f"""
+            INSERT INTO {link_table} (case_id, {link_column})
+            SELECT DISTINCT l.case_id, r.keep_id FROM {link_table} l JOIN entity_remap r ON r.id = l.{link_column}
+            WHERE NOT EXISTS (SELECT 1 FROM {link_table} k WHERE k.case_id = l.case_id AND k.{link_column} = r.keep_id)
+            ON CONFLICT DO NOTHING
+        """)
+        cur.execute(f"DELETE FROM {link_table} l USING entity_remap r WHERE l.{link_column} = r.id")
+        cur.execute(f"DELETE FROM {table} t USING entity_remap r WHERE t.id = r.id")
+        cur.execute("DROP TABLE entity_remap")
+    if renames:
+        psycopg2.extras.execute_values(cur, f"UPDATE {table} t SET {column} = v.value FROM (VALUES %s) AS v (id, value) WHERE t.id = v.id",
+                                       list(renames.items()), page_size=10000)
+    if remap or renames:
+        log_info("Merged Duplicate Entities", f"Table: {table}, Rows Removed: {len(remap)}, Rewritten: {len(renames)}")
+    return len(remap)
+
+def canonicalize_all_shared_entities(cur):
+    """Migration step for databases merged before the SQL and Python normalization rules were unified."""
+    for category in SHARED_ENTITIES:
+        canonicalize_shared_entities(cur, category)
+
+def ensure_entity_constraints(cur):
+    """Merges duplicate entities and adds the unique indexes the upserts rely on (a no-op once done)."""
+    entity_indexes = {f"{table}_{LINK_TABLE_MAP[table][2]}_key": table for table in SHARED_ENTITIES.values()}
+    link_indexes = {f"{link_table}_case_id_{link_column}_key": (link_table, link_column)
+                    for link_table, link_column, _ in LINK_TABLE_MAP.values()}
+
+    cur.execute("SELECT indexname FROM pg_indexes WHERE indexname = ANY(%s)",
+                (list(entity_indexes) + list(link_indexes),))
+    existing = {row[0] for row in cur.fetchall()}
+
+    for category, table in SHARED_ENTITIES.items():
+        index_name = f"{table}_{LINK_TABLE_MAP[table][2]}_key"
+        if index_name in existing:
+            continue
+        canonicalize_shared_entities(cur, category)
+        cur.execute(f"CREATE UNIQUE INDEX {index_name} ON {table} ({LINK_TABLE_MAP[table][2]})")
+
+    for index_name, (link_table, link_column) in link_indexes.items():
+        if index_name in existing:
+            continue
+        cur.execute(f"""
+            DELETE FROM {link_table} a USING {link_table} b
+            WHERE a.case_id = b.case_id AND a.{link_column} = b.{link_column} AND a.ctid > b.ctid
+        """)
+        cur.execute(f"CREATE UNIQUE INDEX {index_name} ON {link_table} (case_id, {link_column})")
+
+    # Entity-side lookups on the links: shared-entity touches and the orphan sweep
+    for link_table, link_column, _ in LINK_TABLE_MAP.values():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {link_table}_{link_column}_idx ON {link_table} ({link_column})")
+
+def _upsert_entity(cur, table, column, value, extra=None):
+    """Returns the id of the entity with this value, inserting it if it does not exist yet.
+
+    An existing row is locked FOR KEY SHARE until the transaction ends, so collect_orphaned_entities
+    cannot delete it before the caller links it to a case.
+    """
+    extra = extra or {}
+    columns = [column] + list(extra)
+    placeholders = ", ".join(["%s"] * len(columns))
+    while True:
+        cur.execute(f"SELECT id FROM {table} WHERE {column} = %s FOR KEY SHARE", (value,))
+        row = cur.fetchone()
+        if row is not None:
+            return row[0]
+        cur.execute(f"""
+            INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders})
+            ON CONFLICT ({column}) DO NOTHING
+            RETURNING id
+        """, [value] + list(extra.values()))
+        row = cur.fetchone()
+        if row is not None:
+            return row[0]
+        # Inserted by a concurrent transaction since the SELECT, or deleted as an orphan while it waited: look again
+
+def lock_existing_entities(cur, table_name, values_query, params=None):
+    """Locks FOR KEY SHARE the `table_name` rows whose key is among the values `values_query` selects.
+
+    Run before an INSERT ... ON CONFLICT DO NOTHING that reuses existing entities, for the same reason
+    as in _upsert_entity: collect_orphaned_entities skips locked rows.
+    """
+    column = LINK_TABLE_MAP[table_name][2]
+    cur.execute(f"SELECT id FROM {table_name} WHERE {column} IN ({values_query}) FOR KEY SHARE", params)
+
+def touch_cases(cur, case_ids):
+    """Bumps last_updated so cached reports of these cases are seen as stale."""
+    cur.execute("UPDATE cases SET last_updated = NOW() WHERE id = ANY(%s)", (list(case_ids),))
+
+def touch_entity_cases(cur, table_name, entity_ids):
+    """Bumps last_updated on every case linked to any of these `table_name` rows; returns the case ids."""
+    link_table, link_column, _ = LINK_TABLE_MAP[table_name]
+    cur.execute(f"""
+        UPDATE cases SET last_updated = NOW()
+        WHERE id IN (SELECT case_id FROM {link_table} WHERE {link_column} = ANY(%s))
+        RETURNING id
+    """, (list(entity_ids),))
+    return [row[0] for row in cur.fetchall()]
 
 def add_case_info(case_id, category, value):
-    conn = psycopg2.connect(DB_CONN)
-    cur = conn.cursor()
-    
+    value = normalize_entity_value(category, value)
+    with db_cursor(commit=True) as cur:
+        touch_cases(cur, [case_id])
+        if category == "IP Address":
+            item_id = _upsert_entity(cur, "ips", "ip_address", value)
+            cur.execute("INSERT INTO case_ips (case_id, ip_id) VALUES (%s, %s) ON CONFLICT DO NOTHING", (case_id, item_id))
+        elif category == "Domain":
+            item_id = _upsert_entity(cur, "domains", "domain", value)
+            cur.execute("INSERT INTO case_domains (case_id, domain_id) VALUES (%s, %s) ON CONFLICT DO NOTHING", (case_id, item_id))
+        elif category == "Social Profile":
+            item_id = _upsert_entity(cur, "social_profiles", "profile_url", value, {"platform": social_platform(value)})
+            cur.execute("INSERT INTO case_social_profiles (case_id, social_profile_id) VALUES (%s, %s) ON CONFLICT DO NOTHING", (case_id, item_id))
+        elif category == "Note":
+            cur.execute("INSERT INTO notes (case_id, note) VALUES (%s, %s) RETURNING id", (case_id, value))
+            note_id = cur.fetchone()[0]
+            cur.execute("INSERT INTO case_notes (case_id, note_id) VALUES (%s, %s)", (case_id, note_id))
+    invalidate_cached_case(case_id)
+    if category in SHARED_ENTITIES:
+        correlation_refresher.schedule()
     if category == "IP Address":
-        cur.execute("INSERT INTO ips (ip_address) VALUES (%s) RETURNING id", (value,))
-        item_id = cur.fetchone()[0]
-        cur.execute("INSERT INTO case_ips (case_id, ip_id) VALUES (%s, %s)", (case_id, item_id))
+        schedule_ip_enrichment()
     elif category == "Domain":
-        cur.execute("INSERT INTO domains (domain) VALUES (%s) RETURNING id", (value,))
-        item_id = cur.fetchone()[0]
-        cur.execute("INSERT INTO case_domains (case_id, domain_id) VALUES (%s, %s)", (case_id, item_id))
-    elif category == "Social Profile":
-        cur.execute("INSERT INTO social_profiles (profile_url) VALUES (%s) RETURNING id", (value,))
-        item_id = cur.fetchone()[0]
-        cur.execute("INSERT INTO case_social_profiles (case_id, social_profile_id) VALUES (%s, %s)", (case_id, item_id))
-    elif category == "Note":
-        cur.execute("INSERT INTO notes (case_id, note) VALUES (%s, %s) RETURNING id", (case_id, value))
-        note_id = cur.fetchone()[0]
-        cur.execute("INSERT INTO case_notes (case_id, note_id) VALUES (%s, %s)", (case_id, note_id))
-    
-    conn.commit()
-    cur.close()
-    conn.close()
-
-def get_case_details(case_id):
-    conn = psycopg2.connect(DB_CONN)
-    cur = conn.cursor()
-
-    # Fetch main case details (Fix: Use NULL-safe approach for timestamps)
-    cur.execute("""
-        SELECT c.case_name, c.subject_name, c.username, c.description, 
-               COALESCE(TO_CHAR(c.created_at, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown'),
-               COALESCE(TO_CHAR(c.last_updated, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
-        FROM cases c
-        WHERE c.id = %s;
-    """, (case_id,))
-    case_info = cur.fetchone()
+        schedule_domain_resolution()
+# ----------------------------------------------------
 
-    if not case_info:
-        print(f"Error: No case found for ID {case_id}")
-        cur.close()
-        conn.close()
-        return None
+# ----------------------AUDIT------------------------------
+# Filled by AuditHandler; every filter the log viewer offers is served by one of these indexes
+AUDIT_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS audit_events (
+        id BIGSERIAL PRIMARY KEY,
+        occurred_at TIMESTAMPTZ NOT NULL,
+        level TEXT NOT NULL,
+        username TEXT NOT NULL,
+        host TEXT,
+        action TEXT NOT NULL,
+        details TEXT,
+        case_id INTEGER,
+        duration DOUBLE PRECISION
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS audit_events_time_idx ON audit_events (occurred_at, id)",
+    "CREATE INDEX IF NOT EXISTS audit_events_case_idx ON audit_events (case_id, occurred_at)",
+    "CREATE INDEX IF NOT EXISTS audit_events_user_idx ON audit_events (username, occurred_at)",
+    "CREATE INDEX IF NOT EXISTS audit_events_action_idx ON audit_events (action, occurred_at)",
+]
+
+def ensure_audit_table(cur):
+    for statement in AUDIT_DDL:
+        cur.execute(statement)
+
+def query_audit_events(start_date, end_date, level=None, case_id=None, username=None, action=None,
+                       before=None, limit=500):
+    """Audit events between two dates (inclusive), newest first, matching every filter given.
+
+    Pass the (occurred_at, id) of the last row returned as `before` to fetch the next page.
+    Rows are (id, occurred_at, level, username, host, action, details, case_id, duration).
+    """
+    params = [start_date, end_date]
+    filters = []
+    for column, value in (("level", level), ("case_id", case_id), ("username", username), ("action", action)):
+        if value is not None:
+            filters.append(column)
+            params.append(value)
+    if before is not None:
+        params.extend(before)
+    with db_cursor() as cur:
+        cur.execute(audit_events_query(filters, before is not None), params + [limit])
+        return cur.fetchall()
+
+def audit_events_query(filters, paged):
+    """Query behind query_audit_events: params are the two dates, one per filter column, [before,] limit."""
+    conditions = ["occurred_at >= %s::date", "occurred_at < %s::date + 1"] + [f"{column} = %s" for column in filters]
+    if paged:
+        conditions.append("(occurred_at, id) < (%s, %s)")
+    return f"""
+        SELECT id, occurred_at, level, username, host, action, details, case_id, duration
+        FROM audit_events
+        WHERE {" AND ".join(conditions)}
+        ORDER BY occurred_at DESC, id DESC
+        LIMIT %s
+    """
+# ----------------------------------------------------
 
-    # Fetch related IPs
-    cur.execute("""
-        SELECT COALESCE(ip.ip_address, 'N/A'), 
-               COALESCE(ip.location, 'N/A'), 
-               COALESCE(ip.isp, 'N/A'), 
-               COALESCE(TO_CHAR(ip.last_seen, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
+# ----------------------CORRELATION------------------------------
+# entity_case_index lists every (shared entity, case) pair; hot_entities precomputes how many
+# cases share each entity, so pivots only probe entities that are shared at all.
+CORRELATION_DDL = [
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS entity_case_index AS
+        SELECT 'IP Address'::text AS entity_type, ip_id AS entity_id, case_id FROM case_ips
+        UNION ALL
+        SELECT 'Domain', domain_id, case_id FROM case_domains
+        UNION ALL
+        SELECT 'Social Profile', social_profile_id, case_id FROM case_social_profiles
+        UNION ALL
+        SELECT 'Metadata', metadata_id, case_id FROM case_metadata
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS entity_case_index_key ON entity_case_index (entity_type, entity_id, case_id)",
+    "CREATE INDEX IF NOT EXISTS entity_case_index_case_idx ON entity_case_index (case_id)",
+    """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS hot_entities AS
+        SELECT entity_type, entity_id, count(*) AS case_count
+        FROM entity_case_index
+        GROUP BY entity_type, entity_id
+        HAVING count(*) > 1
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS hot_entities_key ON hot_entities (entity_type, entity_id)",
+    "CREATE INDEX IF NOT EXISTS hot_entities_case_count_idx ON hot_entities (case_count DESC)",
+]
+
+def ensure_correlation_index(cur):
+    for statement in CORRELATION_DDL:
+        cur.execute(statement)
+
+def refresh_correlation_index():
+    """Rebuilds the correlation views without blocking readers."""
+    started = time.perf_counter()
+    with get_db_pool().connection() as conn:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY entity_case_index")
+                cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY hot_entities")
+        finally:
+            conn.autocommit = False
+    log_info("Refreshed Correlation Index", duration=time.perf_counter() - started)
+
+
+correlation_refresher = CoalescingJob(refresh_correlation_index, Config.CORRELATION_REFRESH_DELAY,
+                                      "Refresh Correlation Index")
+
+RELATED_CASES_QUERY = """
+    SELECT o.case_id, c.case_name, count(*) AS shared,
+           string_agg(DISTINCT o.entity_type, ', ') AS entity_types
+    FROM entity_case_index m
+    JOIN hot_entities h ON h.entity_type = m.entity_type AND h.entity_id = m.entity_id
+    JOIN entity_case_index o ON o.entity_type = m.entity_type AND o.entity_id = m.entity_id
+                            AND o.case_id <> m.case_id
+    JOIN cases c ON c.id = o.case_id
+    WHERE m.case_id = %s
+    GROUP BY o.case_id, c.case_name
+    ORDER BY shared DESC, o.case_id
+    LIMIT %s
+"""
+
+def get_related_cases(case_id, limit=50):
+    """Other cases sharing entities with this one, ranked by how many entities they share."""
+    with db_cursor() as cur:
+        cur.execute(RELATED_CASES_QUERY, (case_id, limit))
+        return cur.fetchall()
+
+HOT_ENTITIES_QUERY = """
+    SELECT h.entity_type, h.entity_id,
+           COALESCE(ip.ip_address, d.domain, sp.profile_url, m.info, 'N/A'), h.case_count
+    FROM hot_entities h
+    LEFT JOIN ips ip ON h.entity_type = 'IP Address' AND ip.id = h.entity_id
+    LEFT JOIN domains d ON h.entity_type = 'Domain' AND d.id = h.entity_id
+    LEFT JOIN social_profiles sp ON h.entity_type = 'Social Profile' AND sp.id = h.entity_id
+    LEFT JOIN metadata m ON h.entity_type = 'Metadata' AND m.id = h.entity_id
+    WHERE h.case_count >= %s
+    ORDER BY h.case_count DESC, h.entity_type, h.entity_id
+    LIMIT %s
+"""
+
+def get_hot_entities(min_cases=3, limit=200):
+    """Entities shared by at least `min_cases` cases: (entity_type, entity_id, value, case_count)."""
+    with db_cursor() as cur:
+        cur.execute(HOT_ENTITIES_QUERY, (min_cases, limit))
+        return cur.fetchall()
+
+ENTITY_CASES_QUERY = """
+    SELECT c.id, c.case_name
+    FROM entity_case_index e
+    JOIN cases c ON c.id = e.case_id
+    WHERE e.entity_type = %s AND e.entity_id = %s
+    ORDER BY c.id
+"""
+
+def get_entity_cases(entity_type, entity_id):
+    """Cases linked to one entity: (case_id, case_name)."""
+    with db_cursor() as cur:
+        cur.execute(ENTITY_CASES_QUERY, (entity_type, entity_id))
+        return cur.fetchall()
+# ----------------------------------------------------
+
+# ----------------------CASE CACHE------------------------------
+CHANGE_CHANNEL = "case_changes"
+CHANGE_ID_LIMIT = 200  # Bigger statements are announced without row ids
+
+# Watched tables -> trigger arguments: the column holding the case id ("" if none) and the row id column
+CHANGE_SOURCES = {
+    "cases": ("id", "id"),
+    "notes": ("case_id", "id"),
+    **{table: ("", "id") for table in ("ips", "domains", "social_profiles", "metadata")},
+    **{link_table: ("case_id", link_column) for link_table, link_column, _ in LINK_TABLE_MAP.values()},
+}
+# Watched table -> the entity table whose rows it changes in an open case
+CHANGE_ENTITY_TABLES = {
+    **{table_name: table_name for table_name in LINK_TABLE_MAP},
+    **{link_table: table_name for table_name, (link_table, _, _) in LINK_TABLE_MAP.items()},
+}
+LIVE_PATCH_DELAY_MS = 250  # Changes arriving within this window are read back together
+
+# Statement-level, so a bulk import sends one notification per case instead of one per row
+CHANGE_FUNCTION_DDL = f"""
+    CREATE OR REPLACE FUNCTION notify_case_change() RETURNS trigger AS $$
+    DECLARE
+        change record;
+    BEGIN
+        FOR change IN
+            SELECT (r ->> TG_ARGV[0])::bigint AS case_id, count(*) AS n, json_agg((r ->> TG_ARGV[1])::bigint) AS ids
+            FROM (SELECT to_jsonb(c) AS r FROM changed_rows c) s
+            GROUP BY 1
+        LOOP
+            PERFORM pg_notify('{CHANGE_CHANNEL}', json_build_object(
+                'table', TG_TABLE_NAME, 'op', TG_OP, 'case_id', change.case_id,
+                'ids', CASE WHEN change.n <= {CHANGE_ID_LIMIT} THEN change.ids END)::text);
+        END LOOP;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+def ensure_change_triggers(cur):
+    """Installs the triggers that announce changes on CHANGE_CHANNEL (a no-op once done)."""
+    triggers = {f"{table}_notify_{op.lower()}": (table, op)
+                for table in CHANGE_SOURCES for op in ("INSERT", "UPDATE", "DELETE")}
+    cur.execute("SELECT tgname FROM pg_trigger WHERE tgname = ANY(%s)", (list(triggers),))
+    existing = {row[0] for row in cur.fetchall()}
+    if len(existing) == len(triggers):
+        return
+    cur.execute(CHANGE_FUNCTION_DDL)
+    for trigger_name, (table, op) in triggers.items():
+        if trigger_name in existing:
+            continue
+        case_column, id_column = CHANGE_SOURCES[table]
+        cur.execute(f"""
+            CREATE TRIGGER {trigger_name} AFTER {op} ON {table}
+            REFERENCING {"OLD" if op == "DELETE" else "NEW"} TABLE AS changed_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_case_change('{case_column}', '{id_column}')
+        """)
+
+class ChangeListener:
+    """Follows CHANGE_CHANNEL on a dedicated connection and passes each change to the subscribers.
+
+    A change is {"table", "op", "case_id", "ids"}: case_id is None for the shared entity tables, and ids
+    is None when the statement changed more than CHANGE_ID_LIMIT rows. Notifications sent while
+    disconnected are lost, so every reconnect is announced as {"table": None, "op": "RESYNC", ...}.
+    """
+
+    def __init__(self, dsn, reconnect_delay=5.0):
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self.connected = threading.Event()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """`callback(change)` runs on the listener thread."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _publish(self, change):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(change)
+            except Exception as e:
+                log_error("Change Listener", f"Subscriber failed: {e}")
+
+    def _run(self):
+        failing = False
+        connects = 0
+        while not self._stop.is_set():
+            conn = None
+            try:
+                # Keepalives notice a dead server even though this connection never sends queries
+                conn = psycopg2.connect(self.dsn, keepalives=1, keepalives_idle=30,
+                                        keepalives_interval=10, keepalives_count=3)
+                conn.set_session(autocommit=True)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CHANGE_CHANNEL}")
+                self.connected.set()
+                connects += 1
+                if connects > 1:
+                    self._publish({"table": None, "op": "RESYNC", "case_id": None, "ids": None})
+                if failing:
+                    log_info("Change Listener", "Reconnected")
+                    failing = False
+                while not self._stop.is_set():
+                    if not select.select([conn], [], [], 1.0)[0]:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            change = json.loads(notify.payload)
+                        except ValueError:
+                            log_warning("Change Listener", f"Ignored malformed notification: {notify.payload[:200]}")
+                            continue
+                        self._publish(change)
+            except (psycopg2.Error, OSError) as e:
+                if not failing:
+                    log_warning("Change Listener", f"Lost the change feed, retrying: {e}")
+                    failing = True
+            finally:
+                self.connected.clear()
+                if conn is not None:
+                    conn.close()
+            self._stop.wait(self.reconnect_delay)
+
+def _approx_size(value):
+    """Approximate bytes held by a cached value of nested tuples, lists, dicts and scalars."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(_approx_size(item) for item in value)
+    return size
+
+class CaseCache:
+    """Size-bounded LRU of case reads, invalidated by the change feed.
+
+    Each case can hold several parts - get_case_details() results, overviews, pages of entity rows -
+    and any change to the case drops all of them. Entries are only served while the listener is
+    connected. A load takes a token() first, and put() drops the result if a change that could
+    affect it arrived meanwhile.
+    """
+
+    def __init__(self, max_bytes, listener):
+        self.max_bytes = max_bytes
+        self.listener = listener
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (case_id, part) -> (value, {table: entity ids}, size)
+        self._parts = {}  # case_id -> cached parts
+        self._versions = {}  # case_id -> invalidations seen
+        self._epoch = 0  # Bumped by changes that may touch any case
+        self._lock = threading.Lock()
+        listener.subscribe(self.apply_change)
+
+    def token(self, case_id):
+        with self._lock:
+            return self._epoch, self._versions.get(case_id, 0)
+
+    def get(self, case_id, part="details"):
+        if not self.listener.connected.is_set():
+            return None
+        with self._lock:
+            entry = self._entries.get((case_id, part))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((case_id, part))
+            self.hits += 1
+            return entry[0]
+
+    def put(self, case_id, value, token, part="details", entity_ids=None):
+        """Caches `value`; `entity_ids` ({table: ids}) lists the shared entities it shows, so their changes drop it."""
+        if not self.listener.connected.is_set():
+            return
+        size = _approx_size(value) + 100 * sum(len(ids) for ids in (entity_ids or {}).values())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if token != (self._epoch, self._versions.get(case_id, 0)):
+                return  # Changed while loading
+            self._drop((case_id, part))
+            self._entries[(case_id, part)] = (value, entity_ids or {}, size)
+            self._parts.setdefault(case_id, set()).add(part)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+            parts = self._parts.get(key[0])
+            parts.discard(key[1])
+            if not parts:
+                del self._parts[key[0]]
+
+    def invalidate(self, case_id):
+        with self._lock:
+            self._versions[case_id] = self._versions.get(case_id, 0) + 1
+            for part in list(self._parts.get(case_id, ())):
+                self._drop((case_id, part))
+
+    def apply_change(self, change):
+        if change.get("case_id") is not None:
+            self.invalidate(change["case_id"])
+            return
+        table, ids = change.get("table"), change.get("ids")
+        ids = set(ids) if ids is not None else None
+        with self._lock:
+            self._epoch += 1  # Loads in flight may include the changed rows
+            for key, (_, entity_ids, _) in list(self._entries.items()):
+                linked = entity_ids.get(table) if table is not None else True
+                if linked and (ids is None or table is None or linked & ids):
+                    self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            return {"cases": len(self._parts), "entries": len(self._entries), "bytes": self.size,
+                    "hits": self.hits, "misses": self.misses}
+
+_change_listener = None
+_case_cache = None
+
+def start_change_feed():
+    """Starts the change listener and, unless CASE_CACHE_MB is 0, the case cache it keeps fresh."""
+    global _change_listener, _case_cache
+    if _change_listener is None:
+        _change_listener = ChangeListener(DB_CONN)
+        if Config.CASE_CACHE_MB > 0:
+            _case_cache = CaseCache(Config.CASE_CACHE_MB * 1024 * 1024, _change_listener)
+        _change_listener.start()
+    return _change_listener
+
+def change_feed_connected():
+    return _change_listener is not None and _change_listener.connected.is_set()
+
+def stop_change_feed():
+    if _change_listener is not None:
+        _change_listener.stop()
+
+def get_case_cache():
+    """The case cache, or None outside the GUI (the CLI never starts the change feed)."""
+    return _case_cache
+
+def invalidate_cached_case(case_id):
+    """Drops a case right after a local write instead of waiting for its notification."""
+    if _case_cache is not None:
+        _case_cache.invalidate(case_id)
+# ----------------------------------------------------
+# ----------------------SCHEMA------------------------------
+# Fresh installs get the whole schema here; on existing databases every statement is a no-op and the
+# later migrations bring the tables up to date. Unique constraint names match ensure_entity_constraints.
+BASE_SCHEMA_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS persons (
+        id SERIAL PRIMARY KEY,
+        full_name TEXT,
+        username TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cases (
+        id SERIAL PRIMARY KEY,
+        case_name TEXT NOT NULL,
+        subject_name TEXT,
+        username TEXT,
+        description TEXT,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        last_updated TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ips (
+        id SERIAL PRIMARY KEY,
+        ip_address TEXT NOT NULL CONSTRAINT ips_ip_address_key UNIQUE,
+        location TEXT,
+        isp TEXT,
+        last_seen TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS domains (
+        id SERIAL PRIMARY KEY,
+        domain TEXT NOT NULL CONSTRAINT domains_domain_key UNIQUE,
+        last_seen TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS social_profiles (
+        id SERIAL PRIMARY KEY,
+        platform TEXT,
+        profile_url TEXT NOT NULL CONSTRAINT social_profiles_profile_url_key UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS metadata (
+        id SERIAL PRIMARY KEY,
+        info TEXT,
+        source TEXT,
+        date_found TIMESTAMP DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS notes (
+        id SERIAL PRIMARY KEY,
+        case_id INTEGER CONSTRAINT notes_case_id_fkey REFERENCES cases (id) ON DELETE CASCADE,
+        note TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+    """,
+] + [f"""
+    CREATE TABLE IF NOT EXISTS {link_table} (
+        case_id INTEGER NOT NULL CONSTRAINT {link_table}_case_id_fkey REFERENCES cases (id) ON DELETE CASCADE,
+        {link_column} INTEGER NOT NULL
+            CONSTRAINT {link_table}_{link_column}_fkey REFERENCES {table_name} (id) ON DELETE CASCADE,
+        CONSTRAINT {link_table}_case_id_{link_column}_key UNIQUE (case_id, {link_column})
+    )
+    """ for table_name, (link_table, link_column, _) in LINK_TABLE_MAP.items()]
+
+# Foreign keys that must cascade, so deleting a case or an entity never leaves dangling links:
+# constraint name -> (table, column, referenced table)
+CASCADING_FOREIGN_KEYS = {
+    "notes_case_id_fkey": ("notes", "case_id", "cases"),
+    **{f"{link_table}_case_id_fkey": (link_table, "case_id", "cases")
+       for link_table, _, _ in LINK_TABLE_MAP.values()},
+    **{f"{link_table}_{link_column}_fkey": (link_table, link_column, table_name)
+       for table_name, (link_table, link_column, _) in LINK_TABLE_MAP.items()},
+}
+
+# Lookups the shipped queries filter or sort on, beyond the keys above
+SCHEMA_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS notes_case_id_idx ON notes (case_id)",
+    "CREATE INDEX IF NOT EXISTS cases_last_updated_idx ON cases (last_updated)",
+    "CREATE INDEX IF NOT EXISTS cases_created_at_idx ON cases (created_at)",
+    "CREATE INDEX IF NOT EXISTS ips_last_seen_idx ON ips (last_seen)",
+    "CREATE INDEX IF NOT EXISTS domains_last_seen_idx ON domains (last_seen)",
+    "CREATE INDEX IF NOT EXISTS notes_created_at_idx ON notes (created_at)",
+    "CREATE INDEX IF NOT EXISTS metadata_date_found_idx ON metadata (date_found)",
+]
+
+def create_base_tables(cur):
+    for statement in BASE_SCHEMA_DDL:
+        cur.execute(statement)
+
+def ensure_cascading_foreign_keys(cur):
+    """Adds the CASCADING_FOREIGN_KEYS that are missing and replaces those that do not cascade.
+
+    Rows already pointing at a deleted case or entity are removed first, since the constraint
+    would reject them; with cascading keys in place they would have been deleted anyway.
+    """
+    cur.execute("SELECT conname, confdeltype FROM pg_constraint WHERE conname = ANY(%s)",
+                (list(CASCADING_FOREIGN_KEYS),))
+    existing = dict(cur.fetchall())
+    for constraint_name, (table, column, referenced) in CASCADING_FOREIGN_KEYS.items():
+        if existing.get(constraint_name) == "c":
+            continue
+        if constraint_name in existing:
+            cur.execute(f"ALTER TABLE {table} DROP CONSTRAINT {constraint_name}")
+        cur.execute(f"""
+            DELETE FROM {table} t
+            WHERE t.{column} IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {referenced} r WHERE r.id = t.{column})
+        """)
+        if cur.rowcount:
+            log_warning("Removed Dangling Rows", f"{table}.{column}: {cur.rowcount}")
+        cur.execute(f"""
+            ALTER TABLE {table} ADD CONSTRAINT {constraint_name}
+            FOREIGN KEY ({column}) REFERENCES {referenced} (id) ON DELETE CASCADE
+        """)
+
+def ensure_person_username_key(cur):
+    """Merges persons sharing a username and adds the unique key bundle import upserts on (a no-op once done).
+
+    Databases created before the schema was managed here have no such key. Cases refer to persons by
+    username, so dropping all but the oldest row per username loses no links.
+    """
+    cur.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'persons_username_key'")
+    if cur.fetchone():
+        return
+    cur.execute("DELETE FROM persons p USING persons k WHERE k.username = p.username AND k.id < p.id")
+    if cur.rowcount:
+        log_info("Merged Duplicate Persons", f"Rows Removed: {cur.rowcount}")
+    cur.execute("ALTER TABLE persons ADD CONSTRAINT persons_username_key UNIQUE (username)")
+
+def create_schema_indexes(cur):
+    for statement in SCHEMA_INDEXES:
+        cur.execute(statement)
+
+ENRICHMENT_DDL = [
+    "ALTER TABLE ips ADD COLUMN IF NOT EXISTS enriched_at TIMESTAMP",
+    "CREATE INDEX IF NOT EXISTS ips_unenriched_idx ON ips (id) WHERE enriched_at IS NULL",
+]
+
+DNS_RESOLUTION_DDL = [
+    "ALTER TABLE domains ADD COLUMN IF NOT EXISTS resolved_at TIMESTAMP",
+    "CREATE INDEX IF NOT EXISTS domains_unresolved_idx ON domains (id) WHERE resolved_at IS NULL",
+]
+
+def add_domain_resolution_column(cur):
+    """domains.resolved_at, set once resolve_domains has looked a domain up, and an index over domains still waiting."""
+    for statement in DNS_RESOLUTION_DDL:
+        cur.execute(statement)
+
+def add_ip_enrichment_column(cur):
+    """ips.enriched_at, set once enrich_ips has looked a row up, and an index over rows still waiting."""
+    for statement in ENRICHMENT_DDL:
+        cur.execute(statement)
+
+# (version, name, step, transactional). Versions are applied once, in order, and never renumbered;
+# schema changes go in a new entry. Steps take a cursor; a non-transactional step gets an autocommit
+# one and must be safe to re-run, since it is only recorded once it has finished.
+MIGRATIONS = [
+    (1, "Base tables", create_base_tables, True),
+    (2, "Merge duplicate entities and add unique keys", ensure_entity_constraints, True),
+    (3, "Cascading foreign keys", ensure_cascading_foreign_keys, True),
+    (4, "Lookup and timestamp indexes", create_schema_indexes, True),
+    (5, "Audit trail", ensure_audit_table, True),
+    (6, "Change notification triggers", ensure_change_triggers, True),
+    (7, "Correlation index", ensure_correlation_index, True),
+    (8, "Search indexes", ensure_search_indexes, False),
+    (9, "IP enrichment marker", add_ip_enrichment_column, True),
+    (10, "Domain resolution marker", add_domain_resolution_column, True),
+    (11, "Canonicalize shared entity values", canonicalize_all_shared_entities, True),
+    (12, "Unique person usernames", ensure_person_username_key, True),
+]
+
+MIGRATION_LOCK_ID = 0x5175616E  # pg_advisory_lock key, so concurrent starts migrate one at a time
+
+def run_migrations():
+    """Applies every migration not yet recorded in schema_migrations; returns the versions applied."""
+    applied = []
+    with get_db_pool().connection() as conn:
+        conn.autocommit = True  # The advisory lock and bookkeeping run outside the migrations' transactions
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+                try:
+                    cur.execute("""
+                        CREATE TABLE IF NOT EXISTS schema_migrations (
+                            version INTEGER PRIMARY KEY,
+                            name TEXT NOT NULL,
+                            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                            duration DOUBLE PRECISION
+                        )
+                    """)
+                    cur.execute("SELECT version FROM schema_migrations")
+                    done = {row[0] for row in cur.fetchall()}
+                    for version, name, step, transactional in MIGRATIONS:
+                        if version in done:
+                            continue
+                        started = time.perf_counter()
+                        # A transactional step runs in a psycopg2-managed transaction, which named cursors need
+                        conn.autocommit = not transactional
+                        try:
+                            step(cur)
+                            cur.execute("INSERT INTO schema_migrations (version, name, duration) VALUES (%s, %s, %s)",
+                                        (version, name, time.perf_counter() - started))
+                            if transactional:
+                                conn.commit()
+                        except Exception:
+                            if transactional:
+                                conn.rollback()
+                            raise
+                        finally:
+                            conn.autocommit = True
+                        log_info("Applied Migration", f"{version}: {name}", duration=time.perf_counter() - started)
+                        applied.append(version)
+                finally:
+                    cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        finally:
+            conn.autocommit = False
+    return applied
+
+def get_migration_status():
+    """[(version, name, applied_at or None)] for every known migration."""
+    with db_cursor() as cur:
+        cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+        applied = {}
+        if cur.fetchone()[0]:
+            cur.execute("SELECT version, applied_at FROM schema_migrations")
+            applied = dict(cur.fetchall())
+    return [(version, name, applied.get(version)) for version, name, _, _ in MIGRATIONS]
+
+def pending_migrations():
+    """[(version, name)] of the migrations run_migrations would still apply."""
+    return [(version, name) for version, name, applied_at in get_migration_status() if applied_at is None]
+
+def prepare_database():
+    """Startup maintenance: brings the schema up to date and enriches IPs and domains added while the app was closed."""
+    applied = run_migrations()
+    schedule_ip_enrichment()
+    schedule_domain_resolution()
+    return applied
+
+def plan_checks(case_id):
+    """(name, query, params) for every shipped read query, with sample parameters for EXPLAIN."""
+    search = {"q": "example", "pattern": "%example%"}
+    checks = [
+        ("Case details", CASE_DETAILS_QUERY, (case_id,)),
+        ("Case list page", case_page_query(False), (0, Config.CASE_PAGE_SIZE)),
+        ("Case list page (filtered)", case_page_query(True), (0, "%example%", Config.CASE_PAGE_SIZE)),
+        ("Report notes", REPORT_NOTES_QUERY, (case_id,)),
+        ("Related cases", RELATED_CASES_QUERY, (case_id, 50)),
+        ("Hot entities", HOT_ENTITIES_QUERY, (3, 200)),
+        ("Entity cases", ENTITY_CASES_QUERY, ("IP Address", 1)),
+        ("Audit trail page", audit_events_query(["case_id"], True),
+         ("2000-01-01", "2100-01-01", case_id, "2100-01-01", 0, Config.AUDIT_PAGE_SIZE)),
+    ]
+    checks += [(f"Report section {heading.title()}", query, (case_id,)) for heading, _, query in REPORT_SECTIONS]
+    checks += [(f"Search {kind}", query, search) for kind, query in SEARCH_QUERIES]
+    checks += [(f"Case rows {table_name}", case_rows_query(table_name, list(EDITABLE_COLUMNS[table_name]), True),
+                (case_id, [1])) for table_name in LINK_TABLE_MAP]
+    checks += [(f"Case rows page {table_name}", case_rows_query(table_name, list(EDITABLE_COLUMNS[table_name]), False, True),
+                (case_id, 0, Config.CASE_PAGE_SIZE)) for table_name in LINK_TABLE_MAP]
+    checks.append(("Case overview", case_overview_query(), (case_id,)))
+    checks.append(("Unenriched IPs", ENRICH_PENDING_QUERY, (0, Config.ENRICH_BATCH)))
+    checks.append(("Unresolved domains", DNS_PENDING_QUERY, (0, Config.DNS_BATCH)))
+    return checks
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+def check_query_plans(case_id=None, threshold=None):
+    """EXPLAINs every query in plan_checks() and reports sequential scans of tables above `threshold` rows.
+
+    Returns [(check name, table, estimated table rows)]. The planner rightly scans small tables,
+    so table size (pg_class.reltuples, which needs ANALYZE to be current) decides what is flagged.
+    """
+    threshold = Config.PLAN_SEQ_SCAN_ROWS if threshold is None else threshold
+    scans = []
+    with db_cursor() as cur:
+        if case_id is None:
+            cur.execute("SELECT COALESCE(max(id), 0) FROM cases")
+            case_id = cur.fetchone()[0]
+        for name, query, params in plan_checks(case_id):
+            cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            plan = cur.fetchone()[0][0]["Plan"]
+            scans.extend((name, node["Relation Name"]) for node in _plan_nodes(plan) if node["Node Type"] == "Seq Scan")
+        cur.execute("SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(%s) AND relkind IN ('r', 'm')",
+                    (list({table for _, table in scans}),))
+        sizes = dict(cur.fetchall())
+    return [(name, table, sizes.get(table, 0)) for name, table in scans if sizes.get(table, 0) > threshold]
+# ----------------------------------------------------
+
+CASE_DETAILS_QUERY = """
+    SELECT c.case_name, c.subject_name, c.username, c.description,
+           COALESCE(TO_CHAR(c.created_at, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown'),
+           COALESCE(TO_CHAR(c.last_updated, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown'),
+           COALESCE(ips.rows, '[]'::json),
+           COALESCE(domains.rows, '[]'::json),
+           COALESCE(social_profiles.rows, '[]'::json),
+           COALESCE(metadata.rows, '[]'::json),
+           COALESCE(notes.rows, '[]'::json),
+           COALESCE(ips.keys, '[]'::json),
+           COALESCE(domains.keys, '[]'::json),
+           COALESCE(social_profiles.keys, '[]'::json),
+           COALESCE(metadata.keys, '[]'::json),
+           COALESCE(notes.keys, '[]'::json)
+    FROM cases c
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_array(
+                   COALESCE(ip.ip_address, 'N/A'),
+                   COALESCE(ip.location, 'N/A'),
+                   COALESCE(ip.isp, 'N/A'),
+                   COALESCE(TO_CHAR(ip.last_seen, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')) ORDER BY cip.ip_id) AS rows,
+               json_agg(json_build_array(ip.id, ip.xmin::text) ORDER BY cip.ip_id) AS keys
         FROM case_ips cip
         LEFT JOIN ips ip ON cip.ip_id = ip.id
-        WHERE cip.case_id = %s;
-    """, (case_id,))
-    ips = cur.fetchall()
-
-    # Fetch related Domains
-    cur.execute("""
-        SELECT COALESCE(d.domain, 'N/A'), 
-               COALESCE(TO_CHAR(d.last_seen, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
+        WHERE cip.case_id = c.id
+    ) ips ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_array(
+                   COALESCE(d.domain, 'N/A'),
+                   COALESCE(TO_CHAR(d.last_seen, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')) ORDER BY cd.domain_id) AS rows,
+               json_agg(json_build_array(d.id, d.xmin::text) ORDER BY cd.domain_id) AS keys
         FROM case_domains cd
         LEFT JOIN domains d ON cd.domain_id = d.id
-        WHERE cd.case_id = %s;
-    """, (case_id,))
-    domains = cur.fetchall()
-
-    # Fetch related Social Profiles
-    cur.execute("""
-        SELECT COALESCE(sp.platform, 'N/A'), 
-               COALESCE(sp.profile_url, 'N/A')
+        WHERE cd.case_id = c.id
+    ) domains ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_array(
+                   COALESCE(sp.platform, 'N/A'),
+                   COALESCE(sp.profile_url, 'N/A')) ORDER BY csp.social_profile_id) AS rows,
+               json_agg(json_build_array(sp.id, sp.xmin::text) ORDER BY csp.social_profile_id) AS keys
         FROM case_social_profiles csp
         LEFT JOIN social_profiles sp ON csp.social_profile_id = sp.id
-        WHERE csp.case_id = %s;
-    """, (case_id,))
-    social_profiles = cur.fetchall()
-
-    # Fetch Metadata
-    cur.execute("""
-        SELECT COALESCE(m.info, 'N/A'), 
-               COALESCE(m.source, 'N/A'), 
-               COALESCE(TO_CHAR(m.date_found, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
+        WHERE csp.case_id = c.id
+    ) social_profiles ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_array(
+                   COALESCE(m.info, 'N/A'),
+                   COALESCE(m.source, 'N/A'),
+                   COALESCE(TO_CHAR(m.date_found, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')) ORDER BY cm.metadata_id) AS rows,
+               json_agg(json_build_array(m.id, m.xmin::text) ORDER BY cm.metadata_id) AS keys
         FROM case_metadata cm
         LEFT JOIN metadata m ON cm.metadata_id = m.id
-        WHERE cm.case_id = %s;
-    """, (case_id,))
-    metadata = cur.fetchall()
-
-    # Fetch Notes
-    cur.execute("""
-        SELECT COALESCE(n.note, 'N/A'), 
-               COALESCE(TO_CHAR(n.created_at, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
+        WHERE cm.case_id = c.id
+    ) metadata ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_array(
+                   COALESCE(n.note, 'N/A'),
+                   COALESCE(TO_CHAR(n.created_at, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')) ORDER BY cn.note_id) AS rows,
+               json_agg(json_build_array(n.id, n.xmin::text) ORDER BY cn.note_id) AS keys
         FROM case_notes cn
         LEFT JOIN notes n ON cn.note_id = n.id
-        WHERE cn.case_id = %s;
-    """, (case_id,))
-    notes = cur.fetchall()
+        WHERE cn.case_id = c.id
+    ) notes ON TRUE
+    WHERE c.id = %s;
+"""
+
+# Columns the case details editor may change, with the type their edited text is cast to
+EDITABLE_COLUMNS = {
+    "ips": {"ip_address": "text", "location": "text", "isp": "text", "last_seen": "timestamp"},
+    "domains": {"domain": "text"},
+    "social_profiles": {"platform": "text", "profile_url": "text"},
+    "metadata": {"info": "text", "source": "text"},
+    "notes": {"note": "text"},
+}
+
+# Shared-entity key columns: (table, column) -> category for normalize_entity_value
+SHARED_KEY_COLUMNS = {(table, LINK_TABLE_MAP[table][2]): category for category, table in SHARED_ENTITIES.items()}
+UNKNOWN_TIMESTAMPS = {"", "unknown", "n/a"}  # Shown for NULL timestamps; saved back as NULL
+
+def clean_edit_value(table_name, column, value):
+    """The value save_case_edits stores for an edited cell; raises ValueError with a message for the user."""
+    value = value.strip()
+    category = SHARED_KEY_COLUMNS.get((table_name, column))
+    if category:
+        if not value:
+            raise ValueError(f"{column} cannot be empty")
+        return normalize_entity_value(category, value)
+    if EDITABLE_COLUMNS[table_name][column] == "timestamp":
+        if value.lower() in UNKNOWN_TIMESTAMPS:
+            return None
+        try:
+            return datetime.datetime.fromisoformat(value.replace("T", " ")).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            raise ValueError(f"{value!r} is not a date and time (use YYYY-MM-DD HH:MM:SS)")
+    return value
+
+def save_case_edits(case_id, edits, deletes):
+    """Applies the case details edit buffer in one transaction.
+
+    `edits` is a list of (table_name, entity_id, xmin, {column: new value}); rows changing the same
+    columns share one multi-row UPDATE keyed by primary key. Each row must still have the xmin it was
+    loaded with, so a concurrent edit is detected without reading it back; if any row fails that check
+    nothing is saved. `deletes` maps table name to entity ids to unlink from this case, one statement
+    per table; entities left without any case are removed later by collect_orphaned_entities.
+
+    Values go through clean_edit_value first: IPs, domains and profile URLs are normalized like new
+    entities, and timestamps are validated. A value that is invalid, or that would duplicate another
+    entity, rejects the whole save with a message per row instead of a database error.
+
+    Returns {"updated": {(table_name, entity_id): new xmin}, "saved": {(table_name, entity_id): {column: value}},
+    "unlinked": count, "conflicts": [(table_name, entity_id)], "rejected": [(table_name, entity_id, message)]}.
+    """
+    result = {"updated": {}, "saved": {}, "unlinked": 0, "conflicts": [], "rejected": []}
+    groups = {}
+    keys = {}  # (table_name, key column) -> {canonical value: [entity ids taking it]}
+    for table_name, entity_id, xmin, changes in edits:
+        columns = tuple(sorted(changes))
+        if any(column not in EDITABLE_COLUMNS.get(table_name, {}) for column in columns):
+            raise ValueError(f"Columns {columns} of {table_name} are not editable")
+        try:
+            changes = {column: clean_edit_value(table_name, column, changes[column]) for column in columns}
+        except ValueError as e:
+            result["rejected"].append((table_name, entity_id, str(e)))
+            continue
+        result["saved"][(table_name, entity_id)] = changes
+        for column in columns:
+            if (table_name, column) in SHARED_KEY_COLUMNS:
+                keys.setdefault((table_name, column), {}).setdefault(changes[column], []).append(entity_id)
+        groups.setdefault((table_name, columns), []).append((entity_id, xmin) + tuple(changes[c] for c in columns))
+    for (table_name, column), values in keys.items():
+        for value, entity_ids in values.items():
+            if len(entity_ids) > 1:
+                result["rejected"].extend((table_name, entity_id, f"{value} is entered on more than one row")
+                                          for entity_id in entity_ids)
+    if result["rejected"]:
+        result["saved"] = {}
+        return result
+
+    with db_cursor(commit=True) as cur:
+        for (table_name, column), values in keys.items():
+            # Another entity already holding the value would fail the UPDATE on the unique key
+            cur.execute(f"SELECT id, {column} FROM {table_name} WHERE {column} = ANY(%s)", (list(values),))
+            for other_id, value in cur.fetchall():
+                result["rejected"].extend((table_name, entity_id, f"{value} already exists as another entry")
+                                          for entity_id in values[value] if entity_id != other_id)
+        if result["rejected"]:
+            result["saved"] = {}
+            return result
+
+        for (table_name, columns), rows in groups.items():
+            link_table, link_column, _ = LINK_TABLE_MAP[table_name]
+            assignments = ", ".join(f"{column} = v.{column}::{EDITABLE_COLUMNS[table_name][column]}" for column in columns)
+            try:
+                updated = psycopg2.extras.execute_values(cur, f"""
+                    UPDATE {table_name} t SET {assignments}
+                    FROM (VALUES %s) AS v (id, xmin, {", ".join(columns)})
+                    JOIN {link_table} l ON l.{link_column} = v.id AND l.case_id = {int(case_id)}
+                    WHERE t.id = v.id AND t.xmin::text = v.xmin
+                    RETURNING t.id, t.xmin::text
+                """, rows, page_size=len(rows), fetch=True)
+            except psycopg2.errors.UniqueViolation:
+                # Taken by a concurrent insert since the check above
+                cur.connection.rollback()
+                result["rejected"] = [(table_name, row[0], "the new value already exists as another entry")
+                                      for row in rows]
+                result["updated"] = {}
+                result["saved"] = {}
+                return result
+            for entity_id, new_xmin in updated:
+                result["updated"][(table_name, entity_id)] = new_xmin
+            result["conflicts"].extend((table_name, row[0]) for row in rows
+                                       if (table_name, row[0]) not in result["updated"])
+
+        if result["conflicts"]:
+            cur.connection.rollback()
+            log_warning("Save Conflict", f"Changed since loaded: {result['conflicts']}", case_id=case_id)
+            result["updated"] = {}
+            result["saved"] = {}
+            invalidate_cached_case(case_id)  # The reload that follows must see the other edits
+            return result
+
+        for table_name, entity_ids in {table_name: [key[1] for key in result["updated"] if key[0] == table_name]
+                                       for table_name, _ in groups}.items():
+            # Edited entries may be shared, so every case showing them changes
+            touch_entity_cases(cur, table_name, entity_ids)
+
+        for table_name, entity_ids in deletes.items():
+            link_table, link_column, _ = LINK_TABLE_MAP[table_name]
+            # Scoped to this case: other cases linking the same entity keep it
+            cur.execute(f"DELETE FROM {link_table} WHERE case_id = %s AND {link_column} = ANY(%s)",
+                        (case_id, list(entity_ids)))
+            result["unlinked"] += cur.rowcount
+        if result["unlinked"]:
+            touch_cases(cur, [case_id])
+    invalidate_cached_case(case_id)
+
+    shared_tables = set(SHARED_ENTITIES.values())
+    if any(table_name in shared_tables for table_name, _ in groups) or any(t in shared_tables for t in deletes):
+        correlation_refresher.schedule()
+    if result["unlinked"] and Config.ENTITY_GC_ENABLED:
+        orphan_collector.schedule()
+    log_info("Saved Case Edits", f"Updated: {len(result['updated'])}, Unlinked: {result['unlinked']}", case_id=case_id)
+    return result
+
+def collect_orphaned_entities(batch_size=None):
+    """Deletes entities that no case links to any more; returns {table_name: rows deleted}.
+
+    Runs in committed batches of `batch_size` so a large cleanup never holds locks for long. Each batch
+    locks its candidates FOR UPDATE SKIP LOCKED, passing over entities a writer holds (see _upsert_entity),
+    then deletes them in a second statement whose fresh snapshot rechecks for links committed meanwhile.
+    """
+    batch_size = batch_size or Config.ENTITY_GC_BATCH
+    started = time.perf_counter()
+    removed = {}
+    for table_name, (link_table, link_column, _) in LINK_TABLE_MAP.items():
+        orphaned = f"NOT EXISTS (SELECT 1 FROM {link_table} l WHERE l.{link_column} = t.id)"
+        removed[table_name] = 0
+        while True:
+            with db_cursor(commit=True) as cur:
+                cur.execute(f"SELECT id FROM {table_name} t WHERE {orphaned} LIMIT %s FOR UPDATE SKIP LOCKED",
+                            (batch_size,))
+                candidates = [row[0] for row in cur.fetchall()]
+                if candidates:
+                    cur.execute(f"DELETE FROM {table_name} t WHERE t.id = ANY(%s) AND {orphaned}", (candidates,))
+                    removed[table_name] += cur.rowcount
+            if len(candidates) < batch_size:
+                break
+    log_info("Collected Orphaned Entities", ", ".join(f"{table}: {count}" for table, count in removed.items()),
+             duration=time.perf_counter() - started)
+    return removed
+
+orphan_collector = CoalescingJob(collect_orphaned_entities, Config.ENTITY_GC_DELAY, "Collect Orphaned Entities")
+
+def get_case_info(case_id):
+    """Loads only the case row, in the same shape as get_case_details()["case_info"]."""
+    with db_cursor() as cur:
+        cur.execute("""
+            SELECT case_name, subject_name, username, description,
+                   COALESCE(TO_CHAR(created_at, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown'),
+                   COALESCE(TO_CHAR(last_updated, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
+            FROM cases
+            WHERE id = %s
+        """, (case_id,))
+        return cur.fetchone()
+
+def get_case_stamps(case_ids):
+    """Cheap freshness check: {case_id: (case_name, exact last_updated text)} without loading entities."""
+    with db_cursor() as cur:
+        cur.execute("SELECT id, case_name, last_updated::text FROM cases WHERE id = ANY(%s)", (list(case_ids),))
+        return {case_id: (case_name, stamp) for case_id, case_name, stamp in cur.fetchall()}
+
+def get_case_details(case_id, use_cache=True):
+    """Loads a case and every linked entity in a single round trip, or from the case cache.
+
+    "keys" holds, per section, the (entity id, xmin) of each row in the same order as the rows,
+    for editing by primary key with optimistic concurrency (see save_case_edits).
+    """
+    cache = get_case_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(case_id)
+        if cached is not None:
+            return cached
+        token = cache.token(case_id)
+
+    with db_cursor() as cur:
+        cur.execute(CASE_DETAILS_QUERY, (case_id,))
+        row = cur.fetchone()
+
+    if not row:
+        print(f"Error: No case found for ID {case_id}")
+        return None
 
-    cur.close()
-    conn.close()
+    # Each section arrives as a JSON array of arrays; keep the tuple rows callers expect
+    ips, domains, social_profiles, metadata, notes = ([tuple(r) for r in rows] for rows in row[6:11])
+    keys = dict(zip(["ips", "domains", "social_profiles", "metadata", "notes"],
+                    ([tuple(k) for k in section] for section in row[11:16])))
 
-    return {
-        "case_info": case_info,
+    details = {
+        "case_info": tuple(row[:6]),
         "ips": ips,
         "domains": domains,
         "social_profiles": social_profiles,
         "metadata": metadata,
-        "notes": notes
+        "notes": notes,
+        "keys": keys
     }
+    if cache is not None:
+        cache.put(case_id, details, token,
+                  entity_ids={table: {key[0] for key in section} for table, section in keys.items()})
+    return details
+
+
+
+# Display expressions for case_rows(); other columns are shown as text, or N/A when null
+CASE_ROW_EXPRESSIONS = {
+    "last_seen": "COALESCE(TO_CHAR(e.last_seen, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')",
+}
+
+def case_rows_query(table_name, columns, by_ids, paged=False):
+    """Query behind get_case_rows and get_case_rows_page: params are case_id [, entity ids] [, after id, limit]."""
+    link_table, link_column, _ = LINK_TABLE_MAP[table_name]
+    expressions = ", ".join(CASE_ROW_EXPRESSIONS.get(column, f"COALESCE(e.{column}::text, 'N/A')") for column in columns)
+    return f"""
+        SELECT e.id, e.xmin::text, {expressions}
+        FROM {link_table} l JOIN {table_name} e ON e.id = l.{link_column}
+        WHERE l.case_id = %s {f"AND l.{link_column} = ANY(%s)" if by_ids else ""}
+              {f"AND l.{link_column} > %s" if paged else ""}
+        ORDER BY l.{link_column}
+        {"LIMIT %s" if paged else ""}
+    """
+
+def get_case_rows(case_id, table_name, columns, entity_ids=None):
+    """(entity id, xmin, *column texts) of the `table_name` entities linked to a case, optionally only `entity_ids`."""
+    params = [case_id] if entity_ids is None else [case_id, list(entity_ids)]
+    with db_cursor() as cur:
+        cur.execute(case_rows_query(table_name, columns, entity_ids is not None), params)
+        return cur.fetchall()
+
+def get_case_rows_page(case_id, table_name, columns, after_id=0, limit=500, use_cache=True):
+    """The next `limit` rows of get_case_rows() with an entity id above `after_id`.
+
+    Keyset pagination on the link table's (case_id, entity id) key, so a page deep into a large case
+    costs the same as the first. Pages are cached per case like get_case_details().
+    """
+    cache = get_case_cache() if use_cache else None
+    part = ("rows", table_name, tuple(columns), after_id, limit)
+    if cache is not None:
+        cached = cache.get(case_id, part)
+        if cached is not None:
+            return cached
+        token = cache.token(case_id)
+
+    with db_cursor() as cur:
+        cur.execute(case_rows_query(table_name, columns, False, paged=True), (case_id, after_id, limit))
+        rows = cur.fetchall()
+
+    if cache is not None:
+        cache.put(case_id, rows, token, part, entity_ids={table_name: {row[0] for row in rows}})
+    return rows
+
+def case_overview_query():
+    """The case row plus one linked-row count per entity table: params are case_id."""
+    counts = ",\n".join(f"(SELECT COUNT(*) FROM {link_table} WHERE case_id = c.id)"
+                         for link_table, _, _ in LINK_TABLE_MAP.values())
+    return f"""
+        SELECT case_name, subject_name, username, description,
+               COALESCE(TO_CHAR(created_at, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown'),
+               COALESCE(TO_CHAR(last_updated, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown'),
+               {counts}
+        FROM cases c
+        WHERE id = %s
+    """
+
+def get_case_overview(case_id, use_cache=True):
+    """The case row and how many entries each entity table links to it, without loading any of them.
+
+    Returns {"case_info": (same shape as get_case_info()), "counts": {table_name: rows}}, or None if
+    the case does not exist.
+    """
+    cache = get_case_cache() if use_cache else None
+    if cache is not None:
+        cached = cache.get(case_id, "overview")
+        if cached is not None:
+            return cached
+        token = cache.token(case_id)
+
+    with db_cursor() as cur:
+        cur.execute(case_overview_query(), (case_id,))
+        row = cur.fetchone()
+    if not row:
+        return None
 
+    overview = {"case_info": tuple(row[:6]), "counts": dict(zip(LINK_TABLE_MAP, row[6:]))}
+    if cache is not None:
+        cache.put(case_id, overview, token, "overview")
+    return overview
 
+def load_case_patch(case_id, tables, include_info):
+    """Re-reads the parts of an open case that changed elsewhere.
 
-def add_case(case_name, subject_name, username, description):
-    conn = psycopg2.connect(DB_CONN)
-    cur = conn.cursor()
-
-    # Check if the username exists in persons table
-    cur.execute("SELECT username FROM persons WHERE username = %s", (username,))
-    result = cur.fetchone()
+    `tables` maps table name to (columns, entity ids or None for the whole table). Returns
+    {"rows": {table_name: get_case_rows(...)}} plus "overview" (None if the case is gone) when asked for.
+    """
+    patch = {"rows": {table_name: get_case_rows(case_id, table_name, columns, entity_ids)
+                      for table_name, (columns, entity_ids) in tables.items()}}
+    if include_info:
+        patch["overview"] = get_case_overview(case_id, use_cache=False)
+    return patch
 
-    if not result:
-        # If the username does not exist, insert it into persons table
-        cur.execute("INSERT INTO persons (full_name, username) VALUES (%s, %s)", (subject_name, username))
-        conn.commit()  # Commit to ensure username exists before inserting case
+def add_case(case_name, subject_name, username, description):
+    with db_cursor(commit=True) as cur:
+        # Check if the username exists in persons table
+        cur.execute("SELECT username FROM persons WHERE username = %s", (username,))
+        result = cur.fetchone()
+
+        if not result:
+            # If the username does not exist, insert it into persons table
+            cur.execute("INSERT INTO persons (full_name, username) VALUES (%s, %s)", (subject_name, username))
+            cur.connection.commit()  # Commit to ensure username exists before inserting case
+
+        # Now insert the case
+        cur.execute("INSERT INTO cases (case_name, subject_name, username, description) VALUES (%s, %s, %s, %s) RETURNING id",
+                    (case_name, subject_name, username, description))
+        return cur.fetchone()[0]
+
+
+# ----------------------BULK IMPORT------------------------------
+IOC_CATEGORIES = ["IP Address", "Domain", "Social Profile", "Note"]
+
+CATEGORY_ALIASES = {
+    "ip": "IP Address", "ips": "IP Address", "ip address": "IP Address", "ip_address": "IP Address",
+    "domain": "Domain", "domains": "Domain",
+    "social profile": "Social Profile", "social_profile": "Social Profile", "social_profiles": "Social Profile",
+    "profile": "Social Profile", "profile_url": "Social Profile",
+    "note": "Note", "notes": "Note",
+}
+
+SOCIAL_PLATFORMS = {
+    "twitter.com": "Twitter", "x.com": "X", "facebook.com": "Facebook", "instagram.com": "Instagram",
+    "linkedin.com": "LinkedIn", "github.com": "GitHub", "reddit.com": "Reddit", "t.me": "Telegram",
+    "tiktok.com": "TikTok", "youtube.com": "YouTube", "mastodon.social": "Mastodon",
+}
+
+DOMAIN_PATTERN = re.compile(r"^(?=.{1,253}$)(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}$", re.IGNORECASE)
+
+def social_platform(url):
+    """Returns the platform name for a profile URL, or None if the host is not a known platform."""
+    host = (urlsplit(url).hostname or "").lower()
+    for prefix in ("www.", "m.", "mobile."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return SOCIAL_PLATFORMS.get(host)
+
+def detect_ioc_type(value):
+    """Classifies a raw value as one of IOC_CATEGORIES."""
+    try:
+        ipaddress.ip_address(value)
+        return "IP Address"
+    except ValueError:
+        pass
+    if "://" in value:
+        return "Social Profile" if social_platform(value) else "Note"
+    if DOMAIN_PATTERN.match(value):
+        return "Domain"
+    return "Note"
+
+def read_ioc_file(path, fmt="auto"):
+    """Yields (category or None, value) pairs from a newline list, CSV or JSON file."""
+    if fmt == "auto":
+        fmt = {".csv": "csv", ".json": "json"}.get(os.path.splitext(path)[1].lower(), "lines")
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "json":
+            data = json.load(f)
+            if isinstance(data, dict):  # {"ips": [...], "domains": "example.com", ...}
+                for key, values in data.items():
+                    if isinstance(values, str):
+                        values = [values]
+                    elif not isinstance(values, list):
+                        raise ValueError(f"{path}: the value of {key!r} must be a string or a list of strings, "
+                                         f"not {type(values).__name__}")
+                    for value in values:
+                        yield CATEGORY_ALIASES.get(key.lower()), str(value)
+            else:  # ["1.2.3.4", ...] or [{"type": "ip", "value": "1.2.3.4"}, ...]
+                for entry in data:
+                    if isinstance(entry, dict):
+                        category = entry.get("type") or entry.get("category") or ""
+                        yield CATEGORY_ALIASES.get(category.lower()), str(entry.get("value", ""))
+                    else:
+                        yield None, str(entry)
+        elif fmt == "csv":
+            reader = csv.reader(f)
+            header = next(reader, [])
+            lowered = [h.strip().lower() for h in header]
+            if "value" in lowered:
+                value_col = lowered.index("value")
+                type_col = next((lowered.index(k) for k in ("type", "category") if k in lowered), None)
+                for row in reader:
+                    if len(row) > value_col:
+                        category = row[type_col].strip().lower() if type_col is not None and len(row) > type_col else ""
+                        yield CATEGORY_ALIASES.get(category), row[value_col]
+            else:  # No header: every cell is a value
+                for row in [header] + list(reader):
+                    for cell in row:
+                        yield None, cell
+        else:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield None, line
+
+COPY_NULL = "\\N"
+
+def _copy_escape(value):
+    """Escapes a value for PostgreSQL's COPY text format."""
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+IMPORT_STATEMENTS = [
+    ("IP Address", "ips", """
+        INSERT INTO ips (ip_address)
+        SELECT DISTINCT s.value FROM ioc_stage s WHERE s.category = 'IP Address'
+        ON CONFLICT (ip_address) DO NOTHING
+    """, """
+        INSERT INTO case_ips (case_id, ip_id)
+        SELECT DISTINCT %(case_id)s, e.id FROM ioc_stage s JOIN ips e ON e.ip_address = s.value
+        WHERE s.category = 'IP Address'
+        ON CONFLICT DO NOTHING
+    """),
+    ("Domain", "domains", """
+        INSERT INTO domains (domain)
+        SELECT DISTINCT s.value FROM ioc_stage s WHERE s.category = 'Domain'
+        ON CONFLICT (domain) DO NOTHING
+    """, """
+        INSERT INTO case_domains (case_id, domain_id)
+        SELECT DISTINCT %(case_id)s, e.id FROM ioc_stage s JOIN domains e ON e.domain = s.value
+        WHERE s.category = 'Domain'
+        ON CONFLICT DO NOTHING
+    """),
+    ("Social Profile", "social_profiles", """
+        INSERT INTO social_profiles (profile_url, platform)
+        SELECT DISTINCT ON (s.value) s.value, s.platform FROM ioc_stage s WHERE s.category = 'Social Profile'
+        ON CONFLICT (profile_url) DO NOTHING
+    """, """
+        INSERT INTO case_social_profiles (case_id, social_profile_id)
+        SELECT DISTINCT %(case_id)s, e.id FROM ioc_stage s JOIN social_profiles e ON e.profile_url = s.value
+        WHERE s.category = 'Social Profile'
+        ON CONFLICT DO NOTHING
+    """),
+    ("Note", "notes", None, """
+        WITH new_notes AS (
+            INSERT INTO notes (case_id, note)
+            SELECT DISTINCT %(case_id)s, s.value FROM ioc_stage s
+            WHERE s.category = 'Note'
+              AND NOT EXISTS (SELECT 1 FROM notes e WHERE e.case_id = %(case_id)s AND e.note = s.value)
+            RETURNING id
+        )
+        INSERT INTO case_notes (case_id, note_id) SELECT %(case_id)s, id FROM new_notes
+    """),
+]
+
+def bulk_import_iocs(case_id, records):
+    """Stages (category or None, value) records with COPY and merges them into the case in one transaction.
+
+    Values without a category are classified with detect_ioc_type and normalized like add_case_info.
+    Entities that already exist are upserted and only linked, and duplicate input values are collapsed.
+    """
+    started = time.perf_counter()
+    buffer = io.StringIO()
+    staged = {category: 0 for category in IOC_CATEGORIES}
+    seen = set()
+    for category, value in records:
+        value = value.strip()
+        if not value:
+            continue
+        category = category or detect_ioc_type(value)
+        value = normalize_entity_value(category, value)
+        if (category, value) in seen:
+            continue
+        seen.add((category, value))
+        platform = social_platform(value) if category == "Social Profile" else None
+        platform = _copy_escape(platform) if platform else COPY_NULL
+        buffer.write(f"{category}\t{_copy_escape(value)}\t{platform}\n")
+        staged[category] += 1
+    buffer.seek(0)
+
+    stats = {"rows": sum(staged.values()), "staged": staged, "created": {}, "linked": {}}
+    with db_cursor(commit=True) as cur:
+        cur.execute("CREATE TEMP TABLE ioc_stage (category text, value text, platform text) ON COMMIT DROP")
+        cur.copy_expert("COPY ioc_stage (category, value, platform) FROM STDIN", buffer)
+        cur.execute("ANALYZE ioc_stage")
+        touch_cases(cur, [case_id])
+
+        for category, table_name, insert_entities, insert_links in IMPORT_STATEMENTS:
+            if not staged[category]:
+                continue
+            if insert_entities:
+                if category in SHARED_ENTITIES:
+                    lock_existing_entities(cur, table_name, "SELECT value FROM ioc_stage WHERE category = %s",
+                                           (category,))
+                cur.execute(insert_entities)
+                stats["created"][category] = cur.rowcount
+            cur.execute(insert_links, {"case_id": case_id})
+            stats["linked"][category] = cur.rowcount
+    invalidate_cached_case(case_id)
+
+    if any(staged[category] for category in SHARED_ENTITIES):
+        correlation_refresher.schedule()
+    if staged["IP Address"]:
+        schedule_ip_enrichment()
+    if staged["Domain"]:
+        schedule_domain_resolution()
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    log_info("Bulk Import", f"Rows: {stats['rows']}, Linked: {stats['linked']}, {stats['rows_per_second']:.0f} rows/s",
+             case_id=case_id, duration=stats["seconds"])
+    return stats
+
+def import_ioc_file(case_id, path, fmt="auto"):
+    """Reads an IOC file and bulk imports it into the case."""
+    return bulk_import_iocs(case_id, read_ioc_file(path, fmt))
+
+def format_import_stats(stats):
+    lines = [f"Imported {stats['rows']} unique values in {stats['seconds']:.2f}s "
+             f"({stats['rows_per_second']:.0f} rows/s)"]
+    for category in IOC_CATEGORIES:
+        if stats["staged"][category]:
+            lines.append(f"  {category}: {stats['staged'][category]} staged, "
+                         f"{stats['created'].get(category, stats['linked'].get(category, 0))} new, "
+                         f"{stats['linked'].get(category, 0)} linked")
+    return "\n".join(lines)
+# ----------------------IP ENRICHMENT------------------------------
+# Fills ips.location and ips.isp from local MaxMind-format databases; nothing leaves the machine.
+# ips.enriched_at (migration 9) marks rows already looked up, so each address is processed once.
+ENRICH_PENDING_QUERY = "SELECT id, ip_address FROM ips WHERE enriched_at IS NULL AND id > %s ORDER BY id LIMIT %s"
+
+ENRICH_UPDATE = """
+    UPDATE ips SET location = COALESCE(ips.location, v.location), isp = COALESCE(ips.isp, v.isp), enriched_at = NOW()
+    FROM (VALUES %s) AS v (id, location, isp)
+    WHERE ips.id = v.id
+    RETURNING ips.id, v.location IS NOT NULL OR v.isp IS NOT NULL
+"""
+
+def enrichment_available():
+    return maxminddb is not None and any(os.path.exists(path) for path in (Config.GEOIP_CITY_DB, Config.GEOIP_ASN_DB) if path)
+
+def _geo_location(record):
+    """'City, Region, Country' from a City or Country record, skipping missing parts."""
+    if not record:
+        return None
+    parts = [record.get("city", {}).get("names", {}).get("en")]
+    parts += [(record.get("subdivisions") or [{}])[0].get("names", {}).get("en")]
+    parts += [(record.get("country") or record.get("registered_country") or {}).get("names", {}).get("en")]
+    return ", ".join(part for part in parts if part) or None
+
+def _geo_isp(record):
+    """ISP name from an ISP database, else 'AS<number> <organization>' from an ASN database."""
+    if not record:
+        return None
+    if record.get("isp"):
+        return record["isp"]
+    number, organization = record.get("autonomous_system_number"), record.get("autonomous_system_organization")
+    return " ".join(part for part in (f"AS{number}" if number else None, organization) if part) or None
+
+class GeoIPLookup:
+    """Looks up addresses in memory-mapped City and ASN databases, caching results per /24 (/48 for IPv6).
+
+    A cached answer is reused for the whole prefix only when both databases returned a network at least
+    that wide; addresses in smaller networks are always looked up. Safe to share between threads.
+    """
+    CACHE_PREFIX = {4: 24, 6: 48}
+
+    def __init__(self, city_path=None, asn_path=None, cache_size=65536):
+        if maxminddb is None:
+            raise RuntimeError("IP enrichment needs maxminddb (pip install maxminddb)")
+        sources = [(city_path, "location", _geo_location), (asn_path, "isp", _geo_isp)]
+        self.readers = [(maxminddb.open_database(path, maxminddb.MODE_MMAP), field, extract)
+                        for path, field, extract in sources if path and os.path.exists(path)]
+        if not self.readers:
+            raise RuntimeError("No GeoIP database found; set GEOIP_CITY_DB and/or GEOIP_ASN_DB")
+        self.cache_size = cache_size
+        self.hits = 0
+        self.lookups = 0
+        self._cache = OrderedDict()  # Prefix network -> (location, isp)
+        self._lock = threading.Lock()
+
+    def lookup(self, value):
+        """(location, isp) for an address; (None, None) when it is invalid or not in the databases."""
+        try:
+            address = ipaddress.ip_address(value)
+        except ValueError:
+            return None, None
+        prefix = ipaddress.ip_network((address, self.CACHE_PREFIX[address.version]), strict=False)
+        with self._lock:
+            cached = self._cache.get(prefix)
+            if cached is not None:
+                self._cache.move_to_end(prefix)
+                self.hits += 1
+                return cached
+            self.lookups += 1
+
+        result = {"location": None, "isp": None}
+        shared = True  # Whether every database's answer covers the whole cache prefix
+        for reader, field, extract in self.readers:
+            record, prefix_len = reader.get_with_prefix_len(address)
+            result[field] = extract(record)
+            shared = shared and prefix_len <= prefix.prefixlen
+        answer = (result["location"], result["isp"])
+        if shared:
+            with self._lock:
+                self._cache[prefix] = answer
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return answer
+
+    def lookup_batch(self, rows):
+        """[(id, location, isp)] for (id, ip_address) rows."""
+        return [(entity_id,) + self.lookup(value) for entity_id, value in rows]
+
+    def close(self):
+        for reader, _, _ in self.readers:
+            reader.close()
+
+def enrich_ips(batch_size=None, workers=None, progress=None):
+    """Looks up every IP not enriched yet and writes location and ISP back; returns statistics.
+
+    Unenriched rows are read in keyset batches of `batch_size`, looked up on a pool of `workers`
+    threads sharing one memory-mapped reader, and written back with one multi-row UPDATE per batch.
+    Values an analyst already entered are kept. `progress` is called with (rows done, rows found).
+    """
+    batch_size = batch_size or Config.ENRICH_BATCH
+    workers = workers or Config.ENRICH_WORKERS
+    started = time.perf_counter()
+    stats = {"rows": 0, "found": 0}
+    geoip = GeoIPLookup(Config.GEOIP_CITY_DB, Config.GEOIP_ASN_DB)
+
+    def write(results):
+        with db_cursor(commit=True) as cur:
+            written = psycopg2.extras.execute_values(cur, ENRICH_UPDATE, results, template="(%s, %s::text, %s::text)",
+                                                     page_size=len(results), fetch=True)
+            found = [entity_id for entity_id, filled in written if filled]
+            if found:
+                touch_entity_cases(cur, "ips", found)  # Their reports now show the new values
+        stats["rows"] += len(results)
+        stats["found"] += len(found)
+        if progress:
+            progress(stats["rows"], stats["found"])
 
-    # Now insert the case
-    cur.execute("INSERT INTO cases (case_name, subject_name, username, description) VALUES (%s, %s, %s, %s) RETURNING id",
-                (case_name, subject_name, username, description))
-    case_id = cur.fetchone()[0]
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ip-enrich") as executor:
+            pending = []
+            after_id = 0
+            while True:
+                with db_cursor() as cur:
+                    cur.execute(ENRICH_PENDING_QUERY, (after_id, batch_size))
+                    rows = cur.fetchall()
+                if not rows:
+                    break
+                after_id = rows[-1][0]
+                # Split each batch across the pool; at most two batches are in memory at once
+                step = max(1, len(rows) // workers)
+                pending.append([executor.submit(geoip.lookup_batch, rows[i:i + step]) for i in range(0, len(rows), step)])
+                if len(pending) > 1:
+                    write([row for future in pending.pop(0) for row in future.result()])
+            for futures in pending:
+                write([row for future in futures for row in future.result()])
+    finally:
+        geoip.close()
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["cache_hits"] = geoip.hits
+    stats["lookups"] = geoip.lookups
+    if stats["rows"]:
+        log_info("Enriched IPs", f"Rows: {stats['rows']}, Found: {stats['found']}, "
+                                 f"Cache Hits: {geoip.hits}, Lookups: {geoip.lookups}", duration=stats["seconds"])
+    return stats
+
+def schedule_ip_enrichment():
+    """Queues a background enrichment run after new IPs arrive, when enabled and a database is present."""
+    if Config.ENRICH_ON_IMPORT and enrichment_available():
+        ip_enricher.schedule()
+
+def format_enrichment_stats(stats):
+    rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return (f"{stats['rows']} IPs enriched ({stats['found']} found in the databases) in {stats['seconds']:.2f}s, "
+            f"{rate:,.0f} rows/s; {stats['cache_hits']} answered from the prefix cache, {stats['lookups']} looked up")
+
+ip_enricher = CoalescingJob(enrich_ips, Config.ENRICH_DELAY, "Enrich IPs")
+# ----------------------------------------------------
 
-    conn.commit()
-    cur.close()
-    conn.close()
-    return case_id
+# ----------------------DNS RESOLUTION------------------------------
+# Resolves domains to A/AAAA/MX records on an asyncio event loop and links the answers to every case
+# the domain belongs to: addresses as ips/case_ips, mail exchangers as domains/case_domains.
+# domains.resolved_at (migration 10) marks domains already resolved.
+DNS_PENDING_QUERY = "SELECT id, domain FROM domains WHERE resolved_at IS NULL AND id > %s ORDER BY id LIMIT %s"
+DNS_ALL_QUERY = "SELECT id, domain FROM domains WHERE id > %s ORDER BY id LIMIT %s"
+
+DNS_LINK_STATEMENTS = [
+    ("ips", """
+        INSERT INTO ips (ip_address, last_seen)
+        SELECT DISTINCT value, NOW() FROM dns_stage WHERE kind = 'ip'
+        ON CONFLICT (ip_address) DO UPDATE SET last_seen = GREATEST(ips.last_seen, EXCLUDED.last_seen)
+        RETURNING id
+    """, """
+        INSERT INTO case_ips (case_id, ip_id)
+        SELECT DISTINCT cd.case_id, e.id
+        FROM dns_stage s JOIN case_domains cd ON cd.domain_id = s.domain_id JOIN ips e ON e.ip_address = s.value
+        WHERE s.kind = 'ip'
+        ON CONFLICT DO NOTHING
+    """),
+    ("domains", """
+        INSERT INTO domains (domain)
+        SELECT DISTINCT value FROM dns_stage WHERE kind = 'mx'
+        ON CONFLICT (domain) DO NOTHING
+    """, """
+        INSERT INTO case_domains (case_id, domain_id)
+        SELECT DISTINCT cd.case_id, e.id
+        FROM dns_stage s JOIN case_domains cd ON cd.domain_id = s.domain_id JOIN domains e ON e.domain = s.value
+        WHERE s.kind = 'mx'
+        ON CONFLICT DO NOTHING
+    """),
+]
+
+DNS_MARK_RESOLVED = """
+    UPDATE domains SET resolved_at = NOW(), last_seen = CASE WHEN v.answered THEN NOW() ELSE domains.last_seen END
+    FROM (VALUES %s) AS v (id, answered)
+    WHERE domains.id = v.id
+"""
+
+class DnsNoRecords(Exception):
+    """The name does not exist or has no records of the type asked for; the answer is cached negatively."""
+
+class DnsPythonBackend:
+    """Queries DNS servers directly with dnspython; `nameservers` and `port` default to the system resolver's."""
+
+    def __init__(self, nameservers=None, port=None, timeout=3.0):
+        if dns is None:
+            raise RuntimeError("The dnspython backend needs dnspython (pip install dnspython)")
+        self.resolver = dns.asyncresolver.Resolver(configure=not nameservers)
+        if nameservers:
+            self.resolver.nameservers = list(nameservers)
+        if port:
+            self.resolver.port = port
+        self.resolver.lifetime = timeout
+
+    async def query(self, name, rdtype):
+        """([values], ttl) for one record type; raises DnsNoRecords, or anything else for a retryable failure."""
+        try:
+            answer = await self.resolver.resolve(name, rdtype, search=False)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            raise DnsNoRecords(name)
+        if rdtype == "MX":
+            values = [record.exchange.to_text(omit_final_dot=True) for record in answer]
+        else:
+            values = [record.address for record in answer]
+        return values, answer.rrset.ttl
+
+class SystemBackend:
+    """Resolves A and AAAA through the operating system (getaddrinfo), which reports no TTL or MX records."""
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+
+    async def query(self, name, rdtype):
+        if rdtype == "MX":
+            return [], self.ttl
+        family = socket.AF_INET if rdtype == "A" else socket.AF_INET6
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(name, None, family=family, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)):
+                raise DnsNoRecords(name)
+            raise
+        return sorted({info[4][0] for info in infos}), self.ttl
+
+DNS_BACKENDS = {"dnspython": DnsPythonBackend, "system": SystemBackend}
+
+def create_dns_backend(name=None, nameservers=None, port=None):
+    """The configured backend; anything with an async query(name, rdtype) method can be passed instead."""
+    name = name or Config.DNS_BACKEND or ("dnspython" if dns is not None else "system")
+    if name not in DNS_BACKENDS:
+        raise ValueError(f"Unknown DNS backend {name!r}; use one of {', '.join(DNS_BACKENDS)}")
+    if name == "system":
+        return SystemBackend(Config.DNS_NEGATIVE_TTL)
+    nameservers = nameservers or [server.strip() for server in Config.DNS_NAMESERVERS.split(",") if server.strip()]
+    return DnsPythonBackend(nameservers, port or Config.DNS_PORT, Config.DNS_TIMEOUT)
+
+class DnsCache:
+    """Answers keyed by (name, record type), kept until their TTL runs out; empty answers are negative entries."""
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (name, rdtype) -> (expires at, values)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, values, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, values)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+_dns_cache = DnsCache()  # Shared by every run in this process, so repeated names are not asked again
+
+class AsyncResolver:
+    """Bounded-concurrency lookups through a backend, with caching, in-flight deduplication and retries.
+
+    Create one per event loop. Failures that survive every retry return None and are not cached, so the
+    domain is tried again on the next run.
+    """
+
+    def __init__(self, backend, concurrency=None, retries=None, cache=None):
+        self.backend = backend
+        self.retries = Config.DNS_RETRIES if retries is None else retries
+        self.cache = cache or _dns_cache
+        self.stats = {"queries": 0, "cached": 0, "negative": 0, "failed": 0}
+        self._semaphore = asyncio.Semaphore(concurrency or Config.DNS_CONCURRENCY)
+        self._inflight = {}
+
+    async def resolve(self, name, rdtype):
+        """Values of one record type ([] when there are none), or None when the lookup failed."""
+        key = (name, rdtype)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["cached"] += 1
+            return cached
+        if key not in self._inflight:
+            self._inflight[key] = asyncio.ensure_future(self._lookup(key))
+            self._inflight[key].add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await self._inflight[key]
+
+    async def _lookup(self, key):
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    self.stats["queries"] += 1
+                    values, ttl = await self.backend.query(*key)
+            except DnsNoRecords:
+                self.stats["negative"] += 1
+                self.cache.put(key, [], Config.DNS_NEGATIVE_TTL)
+                return []
+            except Exception as e:
+                if attempt == self.retries:
+                    self.stats["failed"] += 1
+                    log_warning("DNS Lookup Failed", f"{key[1]} {key[0]}: {e!r}")
+                    return None
+                await asyncio.sleep(0.25 * 2 ** attempt)
+            else:
+                self.cache.put(key, values, max(0, min(ttl, Config.DNS_MAX_TTL)))
+                return values
+
+    async def resolve_domain(self, name, rdtypes):
+        """{"ips": addresses, "mx": exchangers} for a domain, or None if any record type could not be looked up."""
+        answers = await asyncio.gather(*(self.resolve(name, rdtype) for rdtype in rdtypes))
+        if any(answer is None for answer in answers):
+            return None
+        found = {"ips": set(), "mx": set()}
+        for rdtype, values in zip(rdtypes, answers):
+            if rdtype == "MX":
+                found["mx"].update(normalize_entity_value("Domain", value) for value in values if value)
+            else:
+                found["ips"].update(normalize_entity_value("IP Address", value) for value in values)
+        found["mx"].discard(normalize_entity_value("Domain", name))
+        return found
+
+def write_dns_results(results):
+    """Links one batch of answers to the cases of each domain and marks the domains resolved, in one transaction.
+
+    `results` is [(domain id, resolve_domain() result)]; failed lookups stay unresolved. Returns
+    {"ips": new case_ips links, "domains": new case_domains links}.
+    """
+    buffer = io.StringIO()
+    for domain_id, found in results:
+        if found:
+            for kind, values in (("ip", found["ips"]), ("mx", found["mx"])):
+                for value in values:
+                    buffer.write(f"{domain_id}\t{kind}\t{_copy_escape(value)}\n")
+    buffer.seek(0)
+    resolved = [(domain_id, bool(found["ips"] or found["mx"])) for domain_id, found in results if found is not None]
+
+    linked = {}
+    seen_ips = []  # Inserted, or last_seen bumped
+    with db_cursor(commit=True) as cur:
+        cur.execute("CREATE TEMP TABLE dns_stage (domain_id integer, kind text, value text) ON COMMIT DROP")
+        cur.copy_expert("COPY dns_stage (domain_id, kind, value) FROM STDIN", buffer)
+        for table_name, insert_entities, insert_links in DNS_LINK_STATEMENTS:
+            # New IPs upsert with DO UPDATE, which locks existing rows itself
+            if table_name == "domains":
+                lock_existing_entities(cur, table_name, "SELECT value FROM dns_stage WHERE kind = 'mx'")
+            cur.execute(insert_entities)
+            if table_name == "ips":
+                seen_ips = [row[0] for row in cur.fetchall()]
+            cur.execute(insert_links)
+            linked[table_name] = cur.rowcount
+        if resolved:
+            psycopg2.extras.execute_values(cur, DNS_MARK_RESOLVED, resolved, page_size=len(resolved))
+        # Every case showing an answered domain or one of its addresses now shows a newer last_seen,
+        # including cases that gained no links; this also covers the cases that did
+        answered = [domain_id for domain_id, found in resolved if found]
+        cases = set(touch_entity_cases(cur, "domains", answered)) if answered else set()
+        if seen_ips:
+            cases.update(touch_entity_cases(cur, "ips", seen_ips))
+    for case_id in cases:
+        invalidate_cached_case(case_id)
+    return linked
+
+def resolve_domains(refresh=False, batch_size=None, backend=None, concurrency=None, rdtypes=None, progress=None):
+    """Resolves every unresolved domain (every domain with `refresh`) and links the answers; returns statistics.
+
+    Domains are read in keyset batches; each batch is resolved concurrently on one event loop while the
+    previous batch is written back on a worker thread. `progress` is called with (domains done, ips linked).
+    """
+    batch_size = batch_size or Config.DNS_BATCH
+    backend = backend or create_dns_backend()
+    rdtypes = rdtypes or [rdtype.strip().upper() for rdtype in Config.DNS_RECORD_TYPES.split(",") if rdtype.strip()]
+    query = DNS_ALL_QUERY if refresh else DNS_PENDING_QUERY
+    started = time.perf_counter()
+    stats = {"domains": 0, "answered": 0, "failed": 0, "linked": {"ips": 0, "domains": 0}}
+
+    def fetch(after_id):
+        with db_cursor() as cur:
+            cur.execute(query, (after_id, batch_size))
+            return cur.fetchall()
+
+    def write(results):
+        linked = write_dns_results(results)
+        for table_name, count in linked.items():
+            stats["linked"][table_name] += count
+        if progress:
+            progress(stats["domains"], stats["linked"]["ips"])
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        resolver = AsyncResolver(backend, concurrency)
+        writing = None
+        after_id = 0
+        while True:
+            rows = await loop.run_in_executor(None, fetch, after_id)
+            if not rows:
+                break
+            after_id = rows[-1][0]
+            answers = await asyncio.gather(*(resolver.resolve_domain(name, rdtypes) for _, name in rows))
+            results = [(domain_id, found) for (domain_id, _), found in zip(rows, answers)]
+            stats["domains"] += len(results)
+            stats["answered"] += sum(1 for _, found in results if found and (found["ips"] or found["mx"]))
+            stats["failed"] += sum(1 for _, found in results if found is None)
+            if writing is not None:
+                await writing
+            writing = loop.run_in_executor(None, write, results)
+        if writing is not None:
+            await writing
+        return resolver.stats
+
+    stats["lookups"] = asyncio.run(run())
+    stats["seconds"] = time.perf_counter() - started
+    if stats["linked"]["ips"]:
+        schedule_ip_enrichment()
+    if stats["domains"]:
+        log_info("Resolved Domains", f"Domains: {stats['domains']}, Answered: {stats['answered']}, "
+                                     f"Failed: {stats['failed']}, Linked: {stats['linked']}, Lookups: {stats['lookups']}",
+                 duration=stats["seconds"])
+    return stats
+
+def schedule_domain_resolution():
+    """Queues a background resolution run after new domains arrive, when enabled."""
+    if Config.DNS_RESOLVE_ON_IMPORT:
+        domain_resolver.schedule()
+
+def format_resolution_stats(stats):
+    lookups = stats["lookups"]
+    rate = stats["domains"] / stats["seconds"] if stats["seconds"] else 0.0
+    return (f"{stats['domains']} domains resolved in {stats['seconds']:.2f}s ({rate:,.0f}/s): {stats['answered']} answered, "
+            f"{stats['failed']} failed (retried next run); linked {stats['linked']['ips']} IPs and "
+            f"{stats['linked']['domains']} mail exchangers; {lookups['queries']} queries, {lookups['cached']} cached, "
+            f"{lookups['negative']} negative")
+
+domain_resolver = CoalescingJob(resolve_domains, Config.DNS_DELAY, "Resolve Domains")
+# ----------------------------------------------------
 
+# ----------------------REPORTS------------------------------
+def report_filename(case_name):
+    """Default report file name for a case, built from the configured report title."""
+    # **Sanitize the case name for filename usage**
+    case_name_clean = case_name.replace(" ", "_").replace("/", "_")
+    return f"{Config.REPORT_TITLE.replace(' ', '_')}_{case_name_clean}.pdf"
+
+# (heading, column headers, query) for each tabular report section, in report order
+REPORT_SECTIONS = [
+    ("IP ADDRESSES", ["IP Address", "Location", "ISP", "Last Seen"], """
+        SELECT COALESCE(ip.ip_address, 'N/A'), COALESCE(ip.location, 'N/A'), COALESCE(ip.isp, 'N/A'),
+               COALESCE(TO_CHAR(ip.last_seen, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
+        FROM case_ips cip
+        LEFT JOIN ips ip ON cip.ip_id = ip.id
+        WHERE cip.case_id = %s
+        ORDER BY cip.ip_id
+    """),
+    ("DOMAINS", ["Domain", "Last Seen"], """
+        SELECT COALESCE(d.domain, 'N/A'), COALESCE(TO_CHAR(d.last_seen, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
+        FROM case_domains cd
+        LEFT JOIN domains d ON cd.domain_id = d.id
+        WHERE cd.case_id = %s
+        ORDER BY cd.domain_id
+    """),
+    ("SOCIAL PROFILES", ["Platform", "Profile URL"], """
+        SELECT COALESCE(sp.platform, 'N/A'), COALESCE(sp.profile_url, 'N/A')
+        FROM case_social_profiles csp
+        LEFT JOIN social_profiles sp ON csp.social_profile_id = sp.id
+        WHERE csp.case_id = %s
+        ORDER BY csp.social_profile_id
+    """),
+    ("METADATA", ["Info", "Source", "Date Found"], """
+        SELECT COALESCE(m.info, 'N/A'), COALESCE(m.source, 'N/A'),
+               COALESCE(TO_CHAR(m.date_found, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
+        FROM case_metadata cm
+        LEFT JOIN metadata m ON cm.metadata_id = m.id
+        WHERE cm.case_id = %s
+        ORDER BY cm.metadata_id
+    """),
+]
+
+REPORT_NOTES_QUERY = """
+    SELECT COALESCE(n.note, 'N/A'), COALESCE(TO_CHAR(n.created_at, 'YYYY-MM-DD HH24:MI:SS'), 'Unknown')
+    FROM case_notes cn
+    LEFT JOIN notes n ON cn.note_id = n.id
+    WHERE cn.case_id = %s
+    ORDER BY cn.note_id
+"""
+
+@functools.lru_cache(maxsize=None)
+def report_styles(font):
+    """Paragraph styles for reports, built once per font instead of on every call."""
+    styles = getSampleStyleSheet()
+    # **Use the configured font**
+    styles["Title"].fontName = font
+    return styles
+
+@functools.lru_cache(maxsize=None)
+def report_table_style(font):
+    """Shared style for every report table."""
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), font),  # **Use Config Font**
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.whitesmoke),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+    ])
+
+
+class StreamingDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that takes its flowables from an iterator instead of a prepared list.
+
+    reportlab consumes, splits and groups (keepWithNext) flowables at the head of its list inside
+    handle_flowable(), so topping the list up to `lookahead` entries around each call is all it
+    ever sees; finished tables are freed while later rows are still unread.
+    """
+
+    def __init__(self, filename, lookahead=4, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.lookahead = lookahead
+        self._source = iter(())
+        self._stream = None
+
+    def _top_up(self, flowables):
+        for flowable in itertools.islice(self._source, max(self.lookahead - len(flowables), 0)):
+            flowables.append(flowable)
+
+    def handle_flowable(self, flowables):
+        # clean_hanging() also routes reportlab's own page-begin actions through here
+        streaming = flowables is self._stream
+        if streaming:
+            self._top_up(flowables)
+        super().handle_flowable(flowables)
+        if streaming:
+            self._top_up(flowables)  # The build loop stops once the list is empty
+
+    def build_stream(self, source, **kwargs):
+        """build() over the flowables `source` yields."""
+        self._source = iter(source)
+        self._stream = []
+        self._top_up(self._stream)
+        try:
+            self.build(self._stream, **kwargs)
+        finally:
+            self._source = iter(())
+            self._stream = None
+
+
+def _report_flowables(case_id, case_info, width):
+    """Yields the report's flowables, streaming each section from a server-side cursor in chunks."""
+    styles = report_styles(Config.REPORT_FONT)
+
+    # **Report Title Section**
+    yield Paragraph(f"<b>{escape(Config.REPORT_TITLE)}</b>", styles["Title"])
+    yield Spacer(1, 0.3 * inch)
+
+    # **Case Header Section**
+    yield create_styled_table([
+        ["Case ID:", case_id],
+        ["Person of Interest:", case_info[1]],
+        ["Username:", case_info[2]],
+        ["Created At:", case_info[4]],
+        ["Last Updated:", case_info[5]],
+    ], [width / 2] * 2)
+    yield Spacer(1, 0.3 * inch)
+
+    # **Entity Sections** - one page-splitting table per chunk, header repeated on every page
+    for heading, headers, query in REPORT_SECTIONS:
+        col_widths = [width / len(headers)] * len(headers)
+        has_rows = False
+        for rows in stream_rows(query, (case_id,), Config.REPORT_TABLE_CHUNK):
+            if not has_rows:
+                yield Paragraph(f"<b>{heading}</b>", styles["Heading2"])
+                has_rows = True
+            yield create_styled_table([headers] + rows, col_widths)
+        if has_rows:
+            yield Spacer(1, 0.3 * inch)
+
+    # **Case Notes Section**
+    has_notes = False
+    for rows in stream_rows(REPORT_NOTES_QUERY, (case_id,), Config.REPORT_TABLE_CHUNK):
+        if not has_notes:
+            yield Paragraph("<b>CASE NOTES</b>", styles["Heading2"])
+            has_notes = True
+        for note in rows:
+            # Paragraph text is markup: a note holding "<" or "&" must not be parsed as tags
+            yield Paragraph(f"📝 <i>{escape(note[0])}</i> (Created: {escape(note[1])})", styles["Normal"])
+            yield Spacer(1, 0.1 * inch)
+
+def build_case_report(case_id, file_path, case_info=None):
+    """Renders a professionally styled case report PDF using settings from Config."""
+    if case_info is None:
+        case_info = get_case_info(case_id)
+        if not case_info:
+            raise LookupError(f"No case details found for Case ID {case_id}")
+
+    # **Create the PDF document**
+    doc = StreamingDocTemplate(file_path, pagesize=letter)
+
+    # **Build and Save PDF**
+    doc.build_stream(_report_flowables(case_id, case_info, doc.width))
+
+def create_styled_table(data, col_widths=None):
+    """Creates a professional-style table for the report using Config settings."""
+    if not data:
+        return Paragraph("<i>No data available</i>", report_styles(Config.REPORT_FONT)["Normal"])
+
+    col_widths = col_widths or [120] * len(data[0])
+    return LongTable(data, colWidths=col_widths, repeatRows=1, style=report_table_style(Config.REPORT_FONT))
+
+def report_settings_digest():
+    """Digest of the settings that change a rendered report without changing the case."""
+    return hashlib.sha256(json.dumps([Config.REPORT_TITLE, Config.REPORT_FONT]).encode()).hexdigest()
+
+def case_report_digest(case_id, case_info):
+    """sha256 over everything the report shows plus the report settings.
+
+    Hashes the same values get_case_details returns, but streams them section by section
+    so large cases are never held in memory just to compute their key.
+    """
+    digest = hashlib.sha256(report_settings_digest().encode())
+    digest.update(json.dumps([case_id, list(case_info)]).encode())
+    for query in [section[2] for section in REPORT_SECTIONS] + [REPORT_NOTES_QUERY]:
+        digest.update(b"\x1e")
+        for rows in stream_rows(query, (case_id,), Config.REPORT_TABLE_CHUNK):
+            for row in rows:
+                digest.update(json.dumps(row).encode() + b"\n")
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """Rendered report PDFs stored by content digest, with a per-case index of the last render.
+
+    Each index entry is a small JSON file per case, replaced atomically, so batch worker processes
+    can record their renders without coordinating. PDFs are evicted by age and then oldest-first
+    until the cache fits its size budget; a hit refreshes a PDF's age.
+    """
+
+    def __init__(self, directory, max_bytes, max_age):
+        self.directory = directory
+        self.index_dir = os.path.join(directory, "index")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def _pdf_path(self, digest):
+        return os.path.join(self.directory, f"{digest}.pdf")
+
+    def _index_path(self, case_id):
+        return os.path.join(self.index_dir, f"{case_id}.json")
+
+    def get(self, digest):
+        """Path of the cached PDF for `digest`, or None."""
+        path = self._pdf_path(digest)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
 
+    def lookup(self, case_id, stamp):
+        """Cached PDF of the case if it was last rendered at this `last_updated` with the current settings."""
+        try:
+            with open(self._index_path(case_id), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("last_updated") != stamp or entry.get("settings") != report_settings_digest():
+            return None
+        return self.get(entry["digest"])
+
+    def put(self, digest, source_path):
+        """Copies a freshly rendered PDF into the cache."""
+        path = self._pdf_path(digest)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, path)
+
+    def record(self, case_id, stamp, digest):
+        """Remembers which digest the case had at `last_updated` = `stamp`."""
+        path = self._index_path(case_id)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"case_id": case_id, "last_updated": stamp, "digest": digest,
+                       "settings": report_settings_digest()}, f)
+        os.replace(temp_path, path)
+
+    def evict(self):
+        """Drops expired PDFs and index entries, then the least recently used PDFs over the size budget."""
+        now = time.time()
+        removed = 0
+        pdfs = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not entry.name.endswith(".pdf"):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime > self.max_age:
+                removed += self._remove(entry.path)
+            else:
+                pdfs.append((stat.st_mtime, stat.st_size, entry.path))
+        for entry in os.scandir(self.index_dir):
+            if now - entry.stat().st_mtime > self.max_age:
+                self._remove(entry.path)
+
+        total = sum(size for _, size, _ in pdfs)
+        for _, size, path in sorted(pdfs):
+            if total <= self.max_bytes:
+                break
+            removed += self._remove(path)
+            total -= size
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+_report_cache = None
+
+def get_report_cache():
+    """Returns the process-wide report cache, creating it on first use."""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ReportCache(Config.REPORT_CACHE_PATH, Config.REPORT_CACHE_MAX_MB * 1024 * 1024,
+                                    Config.REPORT_CACHE_MAX_DAYS * 86400)
+    return _report_cache
+
+def write_case_report(case_id, file_path, case_info=None, stamp=None, use_cache=True, evict=True):
+    """Writes the case's report to `file_path`, copying it from the report cache when nothing changed.
+
+    A new render is added to the cache, which is then evicted back to its budget unless `evict` is False
+    (generate_reports_batch evicts once at the end instead). Returns True when the PDF came from the cache.
+    """
+    cache = get_report_cache() if use_cache else None
+    if cache and stamp is None:
+        # Read before the content, so a concurrent edit leaves the recorded stamp stale, never too new
+        stamp = get_case_stamps([case_id]).get(case_id, (None, None))[1]
+    if cache and stamp is not None:
+        cached = cache.lookup(case_id, stamp)
+        if cached:
+            shutil.copyfile(cached, file_path)
+            return True
+
+    if case_info is None:
+        case_info = get_case_info(case_id)
+        if not case_info:
+            raise LookupError(f"No case details found for Case ID {case_id}")
+    if cache is None:
+        build_case_report(case_id, file_path, case_info)
+        return False
+
+    digest = case_report_digest(case_id, case_info)
+    cached = cache.get(digest)
+    if cached:
+        shutil.copyfile(cached, file_path)
+    else:
+        build_case_report(case_id, file_path, case_info)
+        cache.put(digest, file_path)
+    if stamp is not None:
+        cache.record(case_id, stamp, digest)
+    if cached is None and evict:
+        cache.evict()
+    return cached is not None
+
+def render_case_report(case_id, output_dir, case_name, stamp, use_cache=True):
+    """Writes one case's report into `output_dir`; runs inside a worker process."""
+    started = time.perf_counter()
+    file_path = os.path.join(output_dir, report_filename(case_name))
+    cached = write_case_report(case_id, file_path, stamp=stamp, use_cache=use_cache, evict=False)
+    return {"case_id": case_id, "path": file_path, "seconds": time.perf_counter() - started, "cached": cached}
+
+def generate_reports_batch(case_ids, output_dir=None, workers=None, progress=None, should_cancel=None,
+                           use_cache=True):
+    """Renders reports for many cases across a process pool.
+
+    Cases whose last_updated still matches the report cache are copied from it without being loaded.
+    `progress` is called with (done, total, result) as each case finishes; `should_cancel` is polled
+    between completions and drops the cases that have not started yet. Returns one result dict per case.
+    """
+    output_dir = output_dir or Config.REPORT_SAVE_PATH
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    results = []
+
+    def finish(result):
+        results.append(result)
+        if progress:
+            progress(len(results), len(case_ids), result)
+
+    stamps = get_case_stamps(case_ids)
+    cache = get_report_cache() if use_cache else None
+    pending = []
+    for case_id in case_ids:
+        if case_id not in stamps:
+            finish({"case_id": case_id, "error": "No case details found"})
+            continue
+        case_name, stamp = stamps[case_id]
+        cached = cache.lookup(case_id, stamp) if cache else None
+        if not cached:
+            pending.append(case_id)
+            continue
+        file_path = os.path.join(output_dir, report_filename(case_name))
+        shutil.copyfile(cached, file_path)
+        finish({"case_id": case_id, "path": file_path, "seconds": 0.0, "cached": True})
+
+    if pending and not (should_cancel and should_cancel()):
+        # Spawned rather than forked: the parent holds Qt threads and open database connections
+        spawn = multiprocessing.get_context("spawn")
+        log_queue = spawn.Queue()
+        # The root logger stands in for a handler: worker records join this process's log file and audit trail
+        worker_logs = logging.handlers.QueueListener(log_queue, logging.getLogger())
+        worker_logs.start()
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=spawn,
+                                     initializer=init_worker_logging, initargs=(log_queue,)) as executor:
+                futures = {executor.submit(render_case_report, case_id, output_dir, *stamps[case_id], use_cache): case_id
+                           for case_id in pending}
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"case_id": futures[future], "error": str(e)}
+                        log_error("Batch Reports", str(e), case_id=futures[future])
+                    finish(result)
+                    if should_cancel and should_cancel():
+                        for other in futures:
+                            other.cancel()
+        finally:
+            worker_logs.stop()  # Once the workers have exited, so their last records are written
+
+    if cache:
+        cache.evict()
+    elapsed = time.perf_counter() - started
+    failed = sum(1 for result in results if "error" in result)
+    cached = sum(1 for result in results if result.get("cached"))
+    log_info("Batch Reports", f"{len(results) - failed} reports ({cached} cached), {failed} failed, {workers} workers",
+             duration=elapsed)
+    return results
+
+def format_batch_summary(results):
+    done = [r for r in results if "error" not in r]
+    rendered = [r for r in done if not r.get("cached")]
+    lines = [f"{len(done)} reports generated ({len(done) - len(rendered)} unchanged, served from cache), "
+             f"{len(results) - len(done)} failed."]
+    if rendered:
+        lines.append(f"Average render time: {sum(r['seconds'] for r in rendered) / len(rendered):.2f}s per case")
+    lines.extend(f"Case {r['case_id']}: {r['error']}" for r in results if "error" in r)
+    return "\n".join(lines)
+
+# ----------------------EXPORT------------------------------
+# Columns written for each dataset, with their Parquet types. Entity rows carry the case linking them,
+# so a shared entity appears once per case.
+EXPORT_DATASETS = {
+    "cases": [("id", "int"), ("case_name", "text"), ("subject_name", "text"), ("username", "text"),
+              ("description", "text"), ("created_at", "timestamp"), ("last_updated", "timestamp")],
+    "ips": [("case_id", "int"), ("id", "int"), ("ip_address", "text"), ("location", "text"), ("isp", "text"),
+            ("last_seen", "timestamp")],
+    "domains": [("case_id", "int"), ("id", "int"), ("domain", "text"), ("last_seen", "timestamp")],
+    "social_profiles": [("case_id", "int"), ("id", "int"), ("platform", "text"), ("profile_url", "text")],
+    "metadata": [("case_id", "int"), ("id", "int"), ("info", "text"), ("source", "text"), ("date_found", "timestamp")],
+    "notes": [("case_id", "int"), ("id", "int"), ("note", "text"), ("created_at", "timestamp")],
+}
+EXPORT_FORMATS = {"jsonl": ".jsonl", "csv": ".csv", "parquet": ".parquet"}
+EXPORT_COMPRESSION = {"jsonl": ["none", "gzip"], "csv": ["none", "gzip"], "parquet": ["none", "snappy", "gzip", "zstd"]}
+
+def export_query(dataset, scoped):
+    """Query streaming one dataset in key order: params are (case ids,) when `scoped`, else none."""
+    if dataset == "cases":
+        columns = ", ".join(f"c.{name}" for name, _ in EXPORT_DATASETS[dataset])
+        return f"SELECT {columns} FROM cases c {'WHERE c.id = ANY(%s)' if scoped else ''} ORDER BY c.id"
+    link_table, link_column, _ = LINK_TABLE_MAP[dataset]
+    columns = ", ".join(f"e.{name}" for name, _ in EXPORT_DATASETS[dataset][1:])
+    return f"""
+        SELECT l.case_id, {columns}
+        FROM {link_table} l JOIN {dataset} e ON e.id = l.{link_column}
+        {'WHERE l.case_id = ANY(%s)' if scoped else ''}
+        ORDER BY l.case_id, l.{link_column}
+    """
+
+def _export_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+class _JsonLinesWriter:
+    """One JSON object per row."""
+
+    def __init__(self, path, columns, compression):
+        self.names = [name for name, _ in columns]
+        self.file = gzip.open(path, "wt", encoding="utf-8") if compression == "gzip" else open(path, "w", encoding="utf-8")
+
+    def write(self, rows):
+        self.file.write("".join(json.dumps(dict(zip(self.names, row)), default=_export_value) + "\n" for row in rows))
+
+    def close(self):
+        self.file.close()
+
+class _CsvWriter:
+    """A header row, then one line per row; nulls are written as empty fields."""
+
+    def __init__(self, path, columns, compression):
+        self.file = (gzip.open(path, "wt", encoding="utf-8", newline="") if compression == "gzip"
+                     else open(path, "w", encoding="utf-8", newline=""))
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+class _ParquetWriter:
+    """One row group per fetch, with a fixed schema so batches of nulls keep their column types."""
+
+    def __init__(self, path, columns, compression):
+        types = {"int": pyarrow.int64(), "text": pyarrow.string(), "timestamp": pyarrow.timestamp("us")}
+        self.schema = pyarrow.schema([(name, types[kind]) for name, kind in columns])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression=compression)
+
+    def write(self, rows):
+        arrays = [pyarrow.array([row[i] for row in rows], type=field.type) for i, field in enumerate(self.schema)]
+        self.writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+EXPORT_WRITERS = {"jsonl": _JsonLinesWriter, "csv": _CsvWriter, "parquet": _ParquetWriter}
+
+def export_data(case_ids=None, output_dir=None, fmt=None, compression=None, fetch_size=None, progress=None,
+                should_cancel=None):
+    """Streams cases and their entities into one file per dataset under a new directory.
+
+    `case_ids` limits the export to those cases; None exports the whole database (entities no case links
+    any more are left out). Every dataset is read through a server-side cursor `fetch_size` rows at a time
+    and written before the next fetch, and all of them share one repeatable-read snapshot, so memory stays
+    constant and the files agree with each other. `progress` is called with (dataset, rows written so far)
+    after each fetch; `should_cancel` is polled between fetches and removes the partial export.
+
+    Returns {"path", "datasets": {dataset: {"path", "rows", "bytes", "seconds"}}, "rows", "bytes", "seconds",
+    "cancelled"}.
+    """
+    fmt = (fmt or Config.EXPORT_FORMAT).lower()
+    compression = (compression or Config.EXPORT_COMPRESSION).lower()
+    fetch_size = fetch_size or Config.EXPORT_FETCH_SIZE
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; use one of {', '.join(EXPORT_FORMATS)}")
+    if compression not in EXPORT_COMPRESSION[fmt]:
+        raise ValueError(f"{fmt} exports support {', '.join(EXPORT_COMPRESSION[fmt])} compression, not {compression!r}")
+    if fmt == "parquet" and pyarrow is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    scope = "all" if case_ids is None else ("case_" + "_".join(map(str, case_ids)) if len(case_ids) <= 5
+                                            else f"{len(case_ids)}_cases")
+    export_dir = os.path.join(output_dir or Config.EXPORT_PATH, f"export_{scope}_{time.strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(export_dir, exist_ok=True)
+    suffix = EXPORT_FORMATS[fmt] + (".gz" if compression == "gzip" and fmt != "parquet" else "")
+    codec = None if compression == "none" else compression
+    params = None if case_ids is None else (list(case_ids),)
+    result = {"path": export_dir, "datasets": {}, "rows": 0, "bytes": 0, "seconds": 0.0, "cancelled": False}
+    started = time.perf_counter()
+
+    with get_db_pool().connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+            for dataset, columns in EXPORT_DATASETS.items():
+                path = os.path.join(export_dir, dataset + suffix)
+                dataset_started = time.perf_counter()
+                rows = 0
+                writer = EXPORT_WRITERS[fmt](path, columns, codec)
+                try:
+                    for chunk in stream_cursor(conn, export_query(dataset, case_ids is not None), params, fetch_size):
+                        writer.write(chunk)
+                        rows += len(chunk)
+                        if progress:
+                            progress(dataset, rows)
+                        if should_cancel and should_cancel():
+                            result["cancelled"] = True
+                            break
+                finally:
+                    writer.close()
+                size = os.path.getsize(path)
+                result["datasets"][dataset] = {"path": path, "rows": rows, "bytes": size,
+                                               "seconds": time.perf_counter() - dataset_started}
+                result["rows"] += rows
+                result["bytes"] += size
+                if result["cancelled"]:
+                    break
+        finally:
+            conn.rollback()
+
+    result["seconds"] = time.perf_counter() - started
+    if result["cancelled"]:
+        shutil.rmtree(export_dir, ignore_errors=True)
+        log_warning("Export Cancelled", f"{export_dir} removed after {result['rows']} rows")
+        return result
+    log_info("Export", f"{result['rows']} rows, {result['bytes']} bytes as {fmt} ({compression}) to {export_dir}",
+             duration=result["seconds"])
+    return result
+
+def format_export_stats(result):
+    if result["cancelled"]:
+        return f"Export cancelled after {result['rows']} rows; the partial files were removed."
+    seconds = max(result["seconds"], 1e-6)
+    lines = [f"{dataset}: {stats['rows']} rows, {stats['bytes'] / 1024:.1f} KB in {stats['seconds']:.2f}s"
+             for dataset, stats in result["datasets"].items()]
+    lines.append(f"Total: {result['rows']} rows, {result['bytes'] / 1048576:.2f} MB in {result['seconds']:.2f}s "
+                 f"({result['rows'] / seconds:,.0f} rows/s, {result['bytes'] / 1048576 / seconds:.2f} MB/s)")
+    lines.append(f"Written to {result['path']}")
+    return "\n".join(lines)
+
+# ----------------------CASE BUNDLES------------------------------
+# A bundle is a gzipped tar holding manifest.json and one COPY text file per part of the case. Ids are
+# not carried over: the importing database creates a new case and matches shared entities by value.
+BUNDLE_FORMAT = "quantalyze-case-bundle"
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".qcase"
+
+# (file, table, columns) in import order
+BUNDLE_FILES = [
+    ("person", "persons", ["full_name", "username"]),
+    ("case", "cases", ["case_name", "subject_name", "username", "description", "created_at", "last_updated"]),
+    ("ips", "ips", ["ip_address", "location", "isp", "last_seen"]),
+    ("domains", "domains", ["domain", "last_seen"]),
+    ("social_profiles", "social_profiles", ["platform", "profile_url"]),
+    ("metadata", "metadata", ["info", "source", "date_found"]),
+    ("notes", "notes", ["note", "created_at"]),
+]
+
+# Shared entities are upserted on their unique value. Attributes the receiving row lacks are filled in
+# from the bundle, and last_seen keeps the later of the two.
+BUNDLE_UPSERT_KEYS = {"ips": "ip_address", "domains": "domain", "social_profiles": "profile_url"}
+
+def bundle_export_query(name, table_name, columns, case_id):
+    case_id = int(case_id)
+    if name == "person":
+        return f"SELECT p.full_name, p.username FROM persons p JOIN cases c ON c.username = p.username WHERE c.id = {case_id}"
+    if name == "case":
+        return f"SELECT {', '.join(columns)} FROM cases WHERE id = {case_id}"
+    link_table, link_column, _ = LINK_TABLE_MAP[table_name]
+    return f"""
+        SELECT {', '.join(f'e.{column}' for column in columns)}
+        FROM {link_table} l JOIN {table_name} e ON e.id = l.{link_column}
+        WHERE l.case_id = {case_id}
+        ORDER BY l.{link_column}
+    """
+
+def bundle_upsert_statement(table_name, columns):
+    """Merges bundle_{table_name} into the table; returns (id, inserted) for every new or changed row."""
+    key = BUNDLE_UPSERT_KEYS[table_name]
+    merged = {column: f"GREATEST(t.{column}, EXCLUDED.{column})" if column == "last_seen"
+              else f"COALESCE(t.{column}, EXCLUDED.{column})"
+              for column in columns if column != key}
+    return f"""
+        INSERT INTO {table_name} AS t ({', '.join(columns)})
+        SELECT DISTINCT ON ({key}) {', '.join(columns)} FROM bundle_{table_name}
+        ON CONFLICT ({key}) DO UPDATE SET {', '.join(f'{column} = {expr}' for column, expr in merged.items())}
+        WHERE {' OR '.join(f't.{column} IS DISTINCT FROM {expr}' for column, expr in merged.items())}
+        RETURNING t.id, t.xmax = 0
+    """
+
+class _HashingFile:
+    """Wraps a binary file so COPY data passing through it is counted and hashed."""
+
+    def __init__(self, file):
+        self.file = file
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self.file.write(data)
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return data
+
+def bundle_case_name(case_file):
+    """The case name from a COPY dump of the case row."""
+    with open(case_file, "rb") as file:
+        return file.readline().decode("utf-8").split("\t", 1)[0] or "case"
+
+def export_case_bundle(case_id, path=None):
+    """Writes one case, its person, entities and notes to a bundle file; returns the manifest plus "path" and "seconds".
+
+    Every part is dumped with COPY TO from one repeatable-read snapshot and hashed on the way to disk.
+    """
+    started = time.perf_counter()
+    manifest = {"format": BUNDLE_FORMAT, "version": BUNDLE_VERSION, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "source": socket.gethostname(), "schema_version": MIGRATIONS[-1][0], "case_id": case_id, "files": {}}
+    with tempfile.TemporaryDirectory() as staging:
+        with get_db_pool().connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                    cur.execute("SET LOCAL DateStyle = 'ISO'")
+                    for name, table_name, columns in BUNDLE_FILES:
+                        with open(os.path.join(staging, name), "wb") as file:
+                            hashing = _HashingFile(file)
+                            cur.copy_expert(f"COPY ({bundle_export_query(name, table_name, columns, case_id)}) TO STDOUT",
+                                            hashing)
+                        if name == "case" and cur.rowcount == 0:
+                            raise ValueError(f"No case found for ID {case_id}")
+                        manifest["files"][name] = {"table": table_name, "columns": columns, "rows": cur.rowcount,
+                                                   "bytes": hashing.bytes, "sha256": hashing.sha256.hexdigest()}
+            finally:
+                conn.rollback()
+
+        if path is None:
+            case_name = re.sub(r"[^\w-]+", "_", bundle_case_name(os.path.join(staging, "case")))
+            path = os.path.join(Config.BUNDLE_PATH, f"{case_name}_{case_id}{BUNDLE_SUFFIX}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        manifest_bytes = json.dumps(manifest, indent=2).encode("utf-8")
+        with tarfile.open(path + ".part", "w:gz", compresslevel=6) as tar:
+            info = tarfile.TarInfo("manifest.json")
+            info.size = len(manifest_bytes)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(manifest_bytes))
+            for name, _, _ in BUNDLE_FILES:
+                tar.add(os.path.join(staging, name), arcname=name)
+        os.replace(path + ".part", path)
+
+    manifest["path"] = path
+    manifest["seconds"] = time.perf_counter() - started
+    rows = sum(entry["rows"] for entry in manifest["files"].values())
+    log_info("Export Bundle", f"{rows} rows to {path} ({os.path.getsize(path)} bytes)", case_id=case_id,
+             duration=manifest["seconds"])
+    return manifest
+
+def read_bundle_manifest(tar):
+    try:
+        manifest = json.load(tar.extractfile("manifest.json"))
+    except KeyError:
+        raise ValueError("Not a case bundle: manifest.json is missing")
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError("Not a case bundle")
+    if manifest.get("version", 0) > BUNDLE_VERSION:
+        raise ValueError(f"Bundle version {manifest['version']} is newer than this application supports")
+    missing = [name for name, _, _ in BUNDLE_FILES if name not in manifest["files"]]
+    if missing:
+        raise ValueError(f"Bundle is missing {', '.join(missing)}")
+    return manifest
+
+def import_case_bundle(path):
+    """Loads a bundle as a new case in one transaction and returns import statistics.
+
+    Each file is streamed from the archive straight into a temporary table with COPY and checked against
+    the manifest's row count and SHA-256 before anything is merged; a mismatch rolls the import back.
+    IPs, domains and profiles that already exist are merged and linked instead of duplicated.
+    """
+    started = time.perf_counter()
+    stats = {"rows": {}, "created": {}, "merged": {}, "linked": {}}
+    with tarfile.open(path, "r:gz") as tar:
+        manifest = read_bundle_manifest(tar)
+        with db_cursor(commit=True) as cur:
+            for name, table_name, columns in BUNDLE_FILES:
+                entry = manifest["files"][name]
+                stage = f"bundle_{table_name}"
+                cur.execute(f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS SELECT {', '.join(columns)} FROM {table_name} WITH NO DATA")
+                hashing = _HashingFile(tar.extractfile(name))
+                cur.copy_expert(f"COPY {stage} ({', '.join(columns)}) FROM STDIN", hashing)
+                if cur.rowcount != entry["rows"] or hashing.sha256.hexdigest() != entry["sha256"]:
+                    raise ValueError(f"Bundle file {name} is corrupt (checksum or row count mismatch)")
+                stats["rows"][name] = entry["rows"]
+                cur.execute(f"ANALYZE {stage}")
+
+            cur.execute("INSERT INTO persons (full_name, username) SELECT full_name, username FROM bundle_persons "
+                        "ON CONFLICT (username) DO NOTHING")
+            cur.execute("""
+                INSERT INTO cases (case_name, subject_name, username, description, created_at)
+                SELECT case_name, subject_name, username, description, created_at FROM bundle_cases
+                RETURNING id
+            """)
+            case_id = cur.fetchone()[0]
+
+            for table_name, key in BUNDLE_UPSERT_KEYS.items():
+                columns = next(columns for _, table, columns in BUNDLE_FILES if table == table_name)
+                link_table, link_column, _ = LINK_TABLE_MAP[table_name]
+                cur.execute(bundle_upsert_statement(table_name, columns))
+                changed = cur.fetchall()
+                stats["created"][table_name] = sum(1 for _, inserted in changed if inserted)
+                merged = [entity_id for entity_id, inserted in changed if not inserted]
+                stats["merged"][table_name] = len(merged)
+                if merged:
+                    touch_entity_cases(cur, table_name, merged)  # Their reports now show the merged values
+                cur.execute(f"""
+                    INSERT INTO {link_table} (case_id, {link_column})
+                    SELECT DISTINCT %s, e.id FROM bundle_{table_name} s JOIN {table_name} e ON e.{key} = s.{key}
+                    ON CONFLICT DO NOTHING
+                """, (case_id,))
+                stats["linked"][table_name] = cur.rowcount
+
+            cur.execute("""
+                WITH new_metadata AS (
+                    INSERT INTO metadata (info, source, date_found)
+                    SELECT info, source, date_found FROM bundle_metadata
+                    RETURNING id
+                )
+                INSERT INTO case_metadata (case_id, metadata_id) SELECT %s, id FROM new_metadata
+            """, (case_id,))
+            stats["created"]["metadata"] = stats["linked"]["metadata"] = cur.rowcount
+            cur.execute("""
+                WITH new_notes AS (
+                    INSERT INTO notes (case_id, note, created_at)
+                    SELECT %(case_id)s, note, created_at FROM bundle_notes
+                    RETURNING id
+                )
+                INSERT INTO case_notes (case_id, note_id) SELECT %(case_id)s, id FROM new_notes
+            """, {"case_id": case_id})
+            stats["created"]["notes"] = stats["linked"]["notes"] = cur.rowcount
+
+    correlation_refresher.schedule()
+    if stats["created"]["ips"]:
+        schedule_ip_enrichment()
+    if stats["created"]["domains"]:
+        schedule_domain_resolution()
+    stats["case_id"] = case_id
+    stats["source_case_id"] = manifest.get("case_id")
+    stats["seconds"] = time.perf_counter() - started
+    log_info("Import Bundle", f"{path} (case {manifest.get('case_id')} from {manifest.get('source')}), "
+                              f"Created: {stats['created']}, Merged: {stats['merged']}",
+             case_id=case_id, duration=stats["seconds"])
+    return stats
+
+def format_bundle_stats(stats):
+    lines = [f"Imported as case {stats['case_id']} in {stats['seconds']:.2f}s"]
+    for table_name in LINK_TABLE_MAP:
+        if table_name in stats["linked"]:
+            merged = stats["merged"].get(table_name)
+            lines.append(f"{table_name}: {stats['linked'][table_name]} linked, {stats['created'][table_name]} new"
+                         + (f", {merged} merged" if merged else ""))
+    return "\n".join(lines)
+# ----------------------------------------------------
 
 
 
@@ -347,6 +3939,7 @@ class AddCaseDialog(QDialog):
         layout.addWidget(self.save_button)
 
         self.setLayout(layout)
+        self.worker = DBWorker(self)
         log_info("Opened Add Case Dialog")
 
 
@@ -362,9 +3955,17 @@ class AddCaseDialog(QDialog):
                 log_warning("Failed Case Creation", "Missing required fields: Case Name, Subject Name, or Username")
                 return
 
-            case_id = add_case(case_name, subject_name, username, description)
-            log_info("Created New Case", f"Case ID: {case_id}, Name: {case_name}, Subject: {subject_name}, Username: {username}")
-            self.accept()
+            def created(case_id):
+                log_info("Created New Case", f"Case ID: {case_id}, Name: {case_name}, Subject: {subject_name}, Username: {username}")
+                self.accept()
+
+            def failed(message):
+                log_error("Error Creating Case", message)
+                self.save_button.setEnabled(True)
+
+            self.save_button.setEnabled(False)
+            self.worker.submit(add_case, case_name, subject_name, username, description,
+                               on_result=created, on_error=failed)
 
         except Exception as e:
             log_error("Error Creating Case", str(e))
@@ -393,18 +3994,319 @@ class AddInfoDialog(QDialog):
         layout.addWidget(self.save_button)
 
         self.setLayout(layout)
+        self.worker = DBWorker(self)
 
     def save_info(self):
         category = self.category_input.currentText().strip()  # Use currentText() to get selected category
         value = self.value_input.toPlainText().strip()
         if category and value:
-            add_case_info(self.case_id, category, value)  # Save to database
-            self.accept()
-            if self.parent_dialog:  # Refresh parent CaseDetailsDialog if exists
-                self.parent_dialog.refresh_data()
+            # Save to database; the parent CaseDetailsDialog refreshes once this dialog is accepted
+            self.save_button.setEnabled(False)
+            self.worker.submit(add_case_info, self.case_id, category, value,
+                               on_result=lambda _: self.accept(), on_error=self.save_failed)
+
+    def save_failed(self, message):
+        self.save_button.setEnabled(True)
+        QMessageBox.warning(self, "Save Failed", f"Could not add information:\n{message}")
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Paints a button labelled with the cell text in each cell instead of creating a widget per row."""
+    clicked = pyqtSignal(int)  # Row of the pressed button
+
+    def __init__(self, color="#007ACC", parent=None):
+        super().__init__(parent)
+        self.color = QColor(color)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        painter.setBrush(self.color)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.drawRoundedRect(rect, 3, 3)
+        painter.setPen(QColor("white"))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, index.data())
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and option.rect.contains(event.position().toPoint())):
+            self.clicked.emit(index.row())
+            return True
+        return False
+
+
+class EntityTableModel(QAbstractTableModel):
+    """One entity tab of CaseDetailsDialog, fetched in keyset pages once the tab is first shown.
+
+    Loaded rows are kept as parallel, id-sorted columns: entity ids in an array, xmins and value
+    tuples in lists. Edits and removals are buffered by entity id until the dialog saves them.
+    """
+    DIRTY_COLOR = QColor("#665500")
+    DELETED_COLOR = QColor("#662222")
+    ACTIONS = ["❌", "🗑️"]  # Revert, Remove - painted by ButtonDelegate
+    pending_changed = pyqtSignal()
+
+    def __init__(self, worker, case_id, table_name, headers, columns, page_size=500, parent=None):
+        super().__init__(parent)
+        self.worker = worker
+        self.case_id = case_id
+        self.table_name = table_name
+        self.headers = headers + ["Revert", "Remove"]
+        self.columns = columns
+        self.page_size = page_size
+        self.revert_column = len(columns)
+        self.remove_column = len(columns) + 1
+        self.total = None  # Rows linked to the case, from get_case_overview
+        self.edits = {}  # Entity id -> {column index: edited text}
+        self.deleted = set()  # Entity ids marked for removal from the case
+        self.stale = False  # Reload once the buffered changes are saved or discarded
+        self._ids = array("q")
+        self._xmins = []
+        self._values = []
+        self._active = False
+        self._exhausted = False
+        self._loading = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.isValid() and index.column() < len(self.columns):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        entity_id = self._ids[row]
+        if column >= len(self.columns):
+            return self.ACTIONS[column - len(self.columns)] if role == Qt.ItemDataRole.DisplayRole else None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self.edits.get(entity_id, {}).get(column, self._values[row][column])
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if entity_id in self.deleted:
+                return self.DELETED_COLOR
+            if column in self.edits.get(entity_id, ()):
+                return self.DIRTY_COLOR
+        if role == Qt.ItemDataRole.FontRole and entity_id in self.deleted:
+            font = QFont()
+            font.setStrikeOut(True)
+            return font
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or not index.isValid() or index.column() >= len(self.columns):
+            return False
+        row, column = index.row(), index.column()
+        entity_id = self._ids[row]
+        changes = self.edits.setdefault(entity_id, {})
+        if value == self._values[row][column]:
+            changes.pop(column, None)
+        else:
+            changes[column] = value
+        if not changes:
+            del self.edits[entity_id]
+        self.dataChanged.emit(index, index)
+        self.pending_changed.emit()
+        return True
+
+    # Paging
+
+    def activate(self):
+        """Called when the tab is first shown; until then nothing is fetched."""
+        if not self._active:
+            self._active = True
+            self.fetchMore()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._active and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._loading = True
+        after_id = self._ids[-1] if self._ids else 0
+        self.worker.submit(get_case_rows_page, self.case_id, self.table_name, self.columns, after_id, self.page_size,
+                           channel=("rows", self.table_name), on_result=self._append_page, on_error=self._page_failed)
+
+    def _append_page(self, page):
+        self._loading = False
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if self._ids:
+            page = [entity for entity in page if entity[0] > self._ids[-1]]  # Already patched in
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self._ids), len(self._ids) + len(page) - 1)
+            for entity in page:
+                self._ids.append(entity[0])
+                self._xmins.append(entity[1])
+                self._values.append(tuple(entity[2:]))
+            self.endInsertRows()
+
+    def _page_failed(self, message):
+        self._loading = False
+        self._exhausted = True  # Stop the view from retrying on every scroll; reload() tries again
+        self.worker.failed.emit(message)
+
+    def reload(self):
+        """Drops the loaded pages and starts over, unless there are buffered changes to keep."""
+        if self.pending_count():
+            self.stale = True
+            return
+        self.stale = False
+        self.worker.cancel(("rows", self.table_name))
+        self.beginResetModel()
+        self._ids = array("q")
+        self._xmins = []
+        self._values = []
+        self._exhausted = False
+        self._loading = False
+        self.endResetModel()
+        self.fetchMore()
+
+    # Live patching
+
+    def _position(self, entity_id):
+        """Row of a loaded entity, or None."""
+        position = bisect.bisect_left(self._ids, entity_id)
+        return position if position < len(self._ids) and self._ids[position] == entity_id else None
+
+    def has(self, entity_id):
+        return self._position(entity_id) is not None
+
+    def apply_rows(self, entity_ids, rows):
+        """Updates, inserts or removes `entity_ids` from freshly read rows; rows with unsaved edits keep them."""
+        fresh = {entity[0]: entity for entity in rows}
+        for entity_id in sorted(entity_ids):
+            position = bisect.bisect_left(self._ids, entity_id)
+            present = position < len(self._ids) and self._ids[position] == entity_id
+            entity = fresh.get(entity_id)
+            if entity is None:
+                if present:
+                    self.beginRemoveRows(QModelIndex(), position, position)
+                    self._remove(position)
+                    self.endRemoveRows()
+                    self.edits.pop(entity_id, None)
+                    self.deleted.discard(entity_id)
+            elif present:
+                if entity[1] != self._xmins[position] and entity_id not in self.edits:
+                    self._xmins[position] = entity[1]
+                    self._values[position] = tuple(entity[2:])
+                    self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.columns) - 1))
+            elif self._exhausted or position < len(self._ids):
+                # Beyond the last loaded page it arrives with the next fetchMore instead
+                self.beginInsertRows(QModelIndex(), position, position)
+                self._ids.insert(position, entity_id)
+                self._xmins.insert(position, entity[1])
+                self._values.insert(position, tuple(entity[2:]))
+                self.endInsertRows()
+        self.pending_changed.emit()
+
+    def _remove(self, position):
+        del self._ids[position]
+        del self._xmins[position]
+        del self._values[position]
+
+    # Edit buffer
+
+    def pending_count(self):
+        return len(self.edits.keys() | self.deleted)
+
+    def pending_edits(self):
+        """(table name, entity id, xmin, {column: new text}) for save_case_edits."""
+        return [(self.table_name, entity_id, self._xmins[self._position(entity_id)],
+                 {self.columns[column]: text for column, text in changes.items()})
+                for entity_id, changes in self.edits.items() if entity_id not in self.deleted]
+
+    def revert_row(self, row):
+        """Restores the loaded values of a row and unmarks it (❌)."""
+        entity_id = self._ids[row]
+        self.edits.pop(entity_id, None)
+        self.deleted.discard(entity_id)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+        self.pending_changed.emit()
+
+    def toggle_removed(self, row):
+        """Marks or unmarks a row for removal from the case on the next save (🗑️)."""
+        self.deleted.symmetric_difference_update({self._ids[row]})
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+        self.pending_changed.emit()
+
+    def mark_removed(self, rows):
+        for row in rows:
+            self.deleted.add(self._ids[row])
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+        self.pending_changed.emit()
+
+    def saved(self, updated, saved=None):
+        """Makes saved edits the loaded state and drops removed rows.
+
+        `updated` maps (table, id) to the new xmin; `saved` maps it to the values actually stored, which
+        may be normalized versions of what was typed.
+        """
+        saved = saved or {}
+        for entity_id, changes in list(self.edits.items()):
+            xmin = updated.get((self.table_name, entity_id))
+            position = self._position(entity_id)
+            if xmin is None or position is None:
+                continue
+            stored = saved.get((self.table_name, entity_id), {})
+            values = list(self._values[position])
+            for column, text in changes.items():
+                name = self.columns[column]
+                if name in stored:
+                    text = stored[name] if stored[name] is not None else ("Unknown" if name == "last_seen" else "N/A")
+                values[column] = text
+            self._values[position] = tuple(values)
+            self._xmins[position] = xmin
+            del self.edits[entity_id]
+        for entity_id in self.deleted:
+            position = self._position(entity_id)
+            if position is not None:
+                self.beginRemoveRows(QModelIndex(), position, position)
+                self._remove(position)
+                self.endRemoveRows()
+        if self.total is not None:
+            self.total -= len(self.deleted)
+        self.deleted = set()
+        self._refresh_all()
+
+    def discard(self):
+        self.edits = {}
+        self.deleted = set()
+        self._refresh_all()
+
+    def _refresh_all(self):
+        if self._ids:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._ids) - 1, len(self.columns) - 1))
+        self.pending_changed.emit()
+        if self.stale:
+            self.reload()
 
 
 class CaseDetailsDialog(QDialog):
+    # (table name, tab title, headers, database column behind each header)
+    TABS = [
+        ("notes", "Notes", ["Notes"], ["note"]),
+        ("social_profiles", "Social Profiles", ["Platform", "Profile URL"], ["platform", "profile_url"]),
+        ("domains", "Domains", ["Domain"], ["domain"]),
+        ("ips", "IP Addresses", ["IP Address", "Location", "ISP", "Last Seen"],
+         ["ip_address", "location", "isp", "last_seen"]),
+    ]
+
     def __init__(self, case_id, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Case Details - OSINT Profiler")
@@ -412,34 +4314,58 @@ class CaseDetailsDialog(QDialog):
         self.setStyleSheet("background-color: #2E2E2E; color: white; font-size: 12pt;")
         self.case_id = case_id
 
-        # Fetch case data from DB
-        case_details = get_case_details(self.case_id)
-        self.case_data = case_details["case_info"]
-        self.case_ips = case_details["ips"]
-        self.case_domains = case_details["domains"]
-        self.case_social_profiles = case_details["social_profiles"]
-        self.case_metadata = case_details["metadata"]
-        self.case_notes = case_details["notes"]
+        # The summary is loaded by refresh_data(); each tab loads its own rows when first shown
+        self.case_data = None
 
-
-        if not self.case_data:
-            self.close()
-            return
+        self.worker = DBWorker(self)
+        self.worker.failed.connect(self.show_db_error)
 
         # Main Layout
         self.main_layout = QVBoxLayout()
 
+        self.busy_indicator = create_busy_indicator()
+        self.worker.busy_changed.connect(self.busy_indicator.setVisible)
+        self.main_layout.addWidget(self.busy_indicator)
+
         # Add Information Button
         self.add_info_button = QPushButton("Add Information")
         self.add_info_button.clicked.connect(self.open_add_info_dialog)
         self.main_layout.addWidget(self.add_info_button)
 
+        # Bulk Import Button
+        self.bulk_import_button = QPushButton("Bulk Import IOCs")
+        self.bulk_import_button.clicked.connect(self.open_bulk_import)
+        self.main_layout.addWidget(self.bulk_import_button)
+
+        # Related Cases Button
+        self.related_cases_button = QPushButton("🔗 Related Cases")
+        self.related_cases_button.clicked.connect(self.open_related_cases)
+        self.main_layout.addWidget(self.related_cases_button)
+
+        # Export Bundle Button
+        self.export_bundle_button = QPushButton("📦 Export Case Bundle")
+        self.export_bundle_button.clicked.connect(self.export_bundle)
+        self.main_layout.addWidget(self.export_bundle_button)
+
+        # Edit Buffer - each tab's model holds its edits and removals until they are saved together
+        edit_layout = QHBoxLayout()
+        self.pending_label = QLabel()
+        self.save_all_button = QPushButton("💾 Save All")
+        self.save_all_button.clicked.connect(self.save_all)
+        self.discard_button = QPushButton("Discard Changes")
+        self.discard_button.clicked.connect(self.discard_changes)
+        self.remove_selected_button = QPushButton("🗑️ Remove Selected")
+        self.remove_selected_button.setToolTip("Mark the selected rows to be removed from this case")
+        self.remove_selected_button.clicked.connect(self.mark_selected_for_deletion)
+        edit_layout.addWidget(self.pending_label)
+        edit_layout.addStretch()
+        edit_layout.addWidget(self.remove_selected_button)
+        edit_layout.addWidget(self.discard_button)
+        edit_layout.addWidget(self.save_all_button)
+        self.main_layout.addLayout(edit_layout)
+
         # Case Summary
-        case_info = self.case_data[0]
-        self.case_summary = QLabel(f"<b>Case Name:</b> {case_info[0]}<br>"
-                                   f"<b>Subject Name:</b> {case_info[1]}<br>"
-                                   f"<b>Username:</b> {case_info[2]}<br>"
-                                   f"<b>Description:</b> {case_info[3]}")
+        self.case_summary = QLabel("<i>Loading case...</i>")
         self.case_summary.setStyleSheet("background-color: #3A3A3A; padding: 10px; border-radius: 5px;")
         self.case_summary.setWordWrap(True)
         self.main_layout.addWidget(self.case_summary)
@@ -452,42 +4378,90 @@ class CaseDetailsDialog(QDialog):
             QTabBar::tab:selected { background: #007ACC; color: white; font-weight: bold; }
             QTabBar::tab:hover { background: #444; color: #FFD700; }
         """)
+        self.entity_models = {}  # Table name -> EntityTableModel
+        for table_name, title, headers, columns in self.TABS:
+            model = EntityTableModel(self.worker, case_id, table_name, headers, columns, Config.CASE_PAGE_SIZE, self)
+            model.pending_changed.connect(self.update_pending)
+            self.entity_models[table_name] = model
+            self.tabs.addTab(self.create_entity_view(model), title)
+        self.tabs.currentChanged.connect(self.tab_shown)
         self.main_layout.addWidget(self.tabs)
 
         self.setLayout(self.main_layout)
 
+        # Changes made elsewhere are read back and patched in row by row
+        self.changed_ids = {}  # Table name -> entity ids to re-read, or None to reload the tab
+        self.info_changed = False
+        self.patching = False
+        self.patch_timer = QTimer(self)
+        self.patch_timer.setSingleShot(True)
+        self.patch_timer.setInterval(LIVE_PATCH_DELAY_MS)
+        self.patch_timer.timeout.connect(self.patch_changes)
+        get_change_bridge().changed.connect(self.case_changed)
+        self.finished.connect(lambda: get_change_bridge().changed.disconnect(self.case_changed))
+
         # Load Data
         self.refresh_data()
+        self.update_pending()
+
+    def create_entity_view(self, model):
+        """A table view over one tab's model; the revert and remove buttons are painted, not widgets."""
+        view = QTableView()
+        view.setModel(model)
+        revert_delegate = ButtonDelegate("#AA2222", view)
+        revert_delegate.clicked.connect(model.revert_row)
+        remove_delegate = ButtonDelegate("#662222", view)
+        remove_delegate.clicked.connect(model.toggle_removed)
+        view.setItemDelegateForColumn(model.revert_column, revert_delegate)
+        view.setItemDelegateForColumn(model.remove_column, remove_delegate)
+        view.setStyleSheet("""
+            QTableView { background-color: #3A3A3A; border: 1px solid #555; }
+            QHeaderView::section { background-color: #007ACC; color: white; font-weight: bold; border: 1px solid #555; }
+        """)
+        view.setEditTriggers(QTableView.EditTrigger.DoubleClicked)
+        view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        view.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
+        return view
+
+    def tab_shown(self, index):
+        if index >= 0:
+            self.tabs.widget(index).model().activate()
 
     def refresh_data(self):
-        """Reloads the case details dynamically when new data is added."""
-        case_details = get_case_details(self.case_id)
-
-        # Assign data to corresponding attributes
-        self.case_data = case_details["case_info"]
-        self.case_ips = case_details["ips"]
-        self.case_domains = case_details["domains"]
-        self.case_social_profiles = case_details["social_profiles"]
-        self.case_metadata = case_details["metadata"]
-        self.case_notes = case_details["notes"]
-
-        # Clear old tabs before reloading
-        while self.tabs.count():
-            self.tabs.removeTab(0)
-
-        if not self.case_data:
+        """Reloads the summary and row counts, and the pages of every tab already shown.
+
+        A case in the case cache is shown at once, without a round trip.
+        """
+        for model in self.entity_models.values():
+            model.reload()
+        self.tab_shown(self.tabs.currentIndex())
+        cache = get_case_cache()
+        cached = cache.get(self.case_id, "overview") if cache is not None else None
+        if cached is not None:
+            self.apply_overview(cached)
             return
-        log_info("Opened Case File", f"Case ID: {self.case_id} - {self.case_data[0]}")
-
-        # Extract Data
-        case_info = self.case_data  # This is now a tuple, not a list of tuples
+        self.worker.submit(get_case_overview, self.case_id, channel="overview", on_result=self.apply_overview)
 
-        # Fix incorrect indexing
-        social_profiles = [[row[0], row[1]] for row in self.case_social_profiles if row[0] is not None]
-        domains = [[row[0]] for row in self.case_domains]
-        ips = [[row[0], row[1], row[2], row[3]] for row in self.case_ips]  # IP Address, Location, ISP, Last Seen
+    def show_db_error(self, message):
+        QMessageBox.warning(self, "Database Error", message)
 
-        # Update Summary
+    def apply_overview(self, overview):
+        """Shows the case summary and the row count of each tab."""
+        if not overview:
+            log_warning("Open Case Failed", f"No case found for ID {self.case_id}")
+            QDialog.reject(self)
+            return
+        first_load = self.case_data is None
+        self.case_data = overview["case_info"]
+        if first_load:
+            log_info("Opened Case File", self.case_data[0], case_id=self.case_id)
+        self.show_summary()
+        for index, (table_name, title, _, _) in enumerate(self.TABS):
+            self.entity_models[table_name].total = overview["counts"][table_name]
+            self.tabs.setTabText(index, f"{title} ({overview['counts'][table_name]})")
+
+    def show_summary(self):
+        case_info = self.case_data
         self.case_summary.setText(f"<b>Case Name:</b> {case_info[0]}<br>"
                                 f"<b>Subject Name:</b> {case_info[1]}<br>"
                                 f"<b>Username:</b> {case_info[2]}<br>"
@@ -495,203 +4469,487 @@ class CaseDetailsDialog(QDialog):
                                 f"<b>Created At:</b> {case_info[4]}<br>"
                                 f"<b>Last Updated:</b> {case_info[5]}")
 
-        # Notes Tab
-        self.notes_table = self.create_editable_table(["Notes"], [[n[0]] for n in self.case_notes], "notes", "note")
-        self.tabs.addTab(self.notes_table, "Notes")
-
-        # Other Tabs
-        self.social_table = self.create_editable_table(["Platform", "Profile URL"], social_profiles, "social_profiles", "profile_url")
-        self.tabs.addTab(self.social_table, "Social Profiles")
+    def case_changed(self, change):
+        """Queues what a change notification affects in this case; patch_changes reads it back."""
+        table = change["table"]
+        if table is None:
+            # Reconnected after missing notifications: reload every tab (tabs with unsaved edits wait)
+            self.info_changed = True
+            self.changed_ids = dict.fromkeys(self.entity_models)
+        elif table == "cases":
+            if change["case_id"] != self.case_id:
+                return
+            self.info_changed = True
+        else:
+            table_name = CHANGE_ENTITY_TABLES.get(table)
+            model = self.entity_models.get(table_name)
+            if model is None:
+                return
+            if change["case_id"] is not None and change["case_id"] != self.case_id:
+                return
+            if change["ids"] is None:
+                if change["case_id"] is None and not model.rowCount():
+                    return
+                self.changed_ids[table_name] = None
+                self.info_changed = True  # Row counts may have changed
+            else:
+                ids = {entity_id for entity_id in change["ids"]
+                       if change["case_id"] is not None or model.has(entity_id)}  # Shared entities shown here
+                if not ids:
+                    return
+                if table_name not in self.changed_ids:
+                    self.changed_ids[table_name] = ids
+                elif self.changed_ids[table_name] is not None:
+                    self.changed_ids[table_name] |= ids
+                self.info_changed = self.info_changed or change["case_id"] is not None
+        if not self.patch_timer.isActive():
+            self.patch_timer.start()
+
+    def patch_changes(self):
+        """Reads back the queued changes; one patch runs at a time so results apply in order."""
+        if self.patching or not (self.changed_ids or self.info_changed) or self.case_data is None:
+            return
+        tables = {}
+        for table_name, entity_ids in self.changed_ids.items():
+            if entity_ids is None:
+                self.entity_models[table_name].reload()  # Too many to list: start the tab over
+            else:
+                tables[table_name] = (self.entity_models[table_name].columns, entity_ids)
+        include_info = self.info_changed
+        self.changed_ids = {}
+        self.info_changed = False
+        if not tables and not include_info:
+            return
+        self.patching = True
+        self.worker.submit(load_case_patch, self.case_id, tables, include_info,
+                           on_result=functools.partial(self.apply_case_patch, tables),
+                           on_error=self.patch_failed)
+
+    def patch_failed(self, message):
+        self.patching = False
+        log_warning("Live Refresh Failed", message, case_id=self.case_id)
+
+    def apply_case_patch(self, tables, patch):
+        self.patching = False
+        if "overview" in patch:
+            if patch["overview"] is None:
+                QMessageBox.warning(self, "Case Removed", "This case was deleted by another analyst.")
+                QDialog.reject(self)
+                return
+            self.apply_overview(patch["overview"])
+        for table_name, rows in patch["rows"].items():
+            self.entity_models[table_name].apply_rows(tables[table_name][1], rows)
+        self.patch_changes()  # Whatever arrived while this patch was loading
+
+    def mark_selected_for_deletion(self):
+        """Marks every selected row of the current tab for removal on the next save."""
+        view = self.tabs.currentWidget()
+        if view is not None:
+            view.model().mark_removed([index.row() for index in view.selectionModel().selectedRows()])
+
+    def pending_count(self):
+        return sum(model.pending_count() for model in self.entity_models.values())
+
+    def update_pending(self):
+        count = self.pending_count()
+        self.pending_label.setText(f"{count} unsaved change{'s' if count != 1 else ''}" if count else "")
+        self.save_all_button.setEnabled(bool(count))
+        self.discard_button.setEnabled(bool(count))
+
+    def save_all(self):
+        """Sends every buffered edit and removal to the database in one transaction."""
+        edits = []
+        deletes = {}
+        for table_name, model in self.entity_models.items():
+            edits.extend(model.pending_edits())
+            if model.deleted:
+                deletes[table_name] = sorted(model.deleted)
+        if not edits and not deletes:
+            return
 
-        self.domains_table = self.create_editable_table(["Domain"], domains, "domains", "domain")
-        self.tabs.addTab(self.domains_table, "Domains")
+        self.save_all_button.setEnabled(False)
+        self.worker.submit(save_case_edits, self.case_id, edits, deletes, channel="save",
+                           on_result=self.edits_saved, on_error=self.save_failed)
+
+    def save_failed(self, message):
+        self.update_pending()
+        self.show_db_error(message)
+
+    def edits_saved(self, result):
+        """Updates the saved rows in place; nothing else is reloaded."""
+        if result["conflicts"]:
+            QMessageBox.warning(self, "Save Conflict",
+                                f"{len(result['conflicts'])} edited entries were changed or removed by someone else. "
+                                "Nothing was saved; the case has been reloaded.")
+            for model in self.entity_models.values():
+                model.discard()
+            self.refresh_data()
+            return
+        if result["rejected"]:
+            QMessageBox.warning(self, "Nothing Saved",
+                                "Fix these entries and save again:\n" +
+                                "\n".join(f"{table_name.replace('_', ' ').title()} #{entity_id}: {message}"
+                                          for table_name, entity_id, message in result["rejected"][:20]))
+            self.update_pending()
+            return
 
-        self.ips_table = self.create_editable_table(["IP Address", "Location", "ISP", "Last Seen"], ips, "ips", "ip_address")
-        self.tabs.addTab(self.ips_table, "IP Addresses")
+        for model in self.entity_models.values():
+            model.saved(result["updated"], result["saved"])
+        self.update_pending()
 
+    def discard_changes(self):
+        for model in self.entity_models.values():
+            model.discard()
 
-    def create_editable_table(self, headers, data, table_name, column_name):
-        """Creates an editable table with checkmark, cancel, and delete buttons."""
-        table = QTableWidget()
-        table.setColumnCount(len(headers) + 2)  # +2 for action buttons
-        table.setHorizontalHeaderLabels(headers + ["Actions", "Delete"])
-        table.setRowCount(len(data))
+    def reject(self):
+        """Asks before closing with unsaved changes."""
+        if self.pending_count() and QMessageBox.question(
+                self, "Unsaved Changes", "Discard unsaved changes?") != QMessageBox.StandardButton.Yes:
+            return
+        super().reject()
 
-        for row_idx, row_data in enumerate(data):
-            for col_idx, value in enumerate(row_data):
-                item = QTableWidgetItem(str(value))
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)  # Make editable
-                table.setItem(row_idx, col_idx, item)
+    def open_bulk_import(self):
+        """Imports a newline, CSV or JSON list of IOCs into the case."""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import IOCs", "", "IOC Files (*.txt *.csv *.json);;All Files (*)"
+        )
+        if not file_path:
+            return  # User canceled
 
-            # Add buttons for save (✔), cancel (❌), and delete (🗑️)
-            button_widget = QWidget()
-            button_layout = QHBoxLayout()
+        def imported(stats):
+            self.bulk_import_button.setEnabled(True)
+            QMessageBox.information(self, "Import Complete", format_import_stats(stats))
+            if not change_feed_connected():
+                self.refresh_data()  # Otherwise the new rows are patched in from their notifications
 
-            save_button = QPushButton("✔")
-            save_button.setStyleSheet("background-color: green; color: white; font-size: 12px; padding: 5px;")
-            save_button.clicked.connect(lambda _, r=row_idx: self.update_database(table, r, table_name))
+        def failed(message):
+            self.bulk_import_button.setEnabled(True)
+            QMessageBox.warning(self, "Import Failed", message)
 
-            cancel_button = QPushButton("❌")
-            cancel_button.setStyleSheet("background-color: red; color: white; font-size: 12px; padding: 5px;")
-            cancel_button.clicked.connect(lambda _, r=row_idx: self.cancel_edit(table, r, row_data))
+        self.bulk_import_button.setEnabled(False)
+        self.worker.submit(import_ioc_file, self.case_id, file_path, on_result=imported, on_error=failed)
 
-            delete_button = QPushButton("🗑️")
-            delete_button.setStyleSheet("background-color: darkred; color: white; font-size: 12px; padding: 5px;")
-            delete_button.clicked.connect(lambda _, r=row_idx: self.delete_entry(table, r, table_name, column_name))
+    def export_bundle(self):
+        """Packs the saved state of this case into a bundle file for another instance."""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Case Bundle", os.path.join(Config.BUNDLE_PATH, f"case_{self.case_id}{BUNDLE_SUFFIX}"),
+            f"Case Bundles (*{BUNDLE_SUFFIX})"
+        )
+        if not file_path:
+            return  # User canceled
+        if not file_path.endswith(BUNDLE_SUFFIX):
+            file_path += BUNDLE_SUFFIX
 
-            button_layout.addWidget(save_button)
-            button_layout.addWidget(cancel_button)
-            button_widget.setLayout(button_layout)
+        def exported(manifest):
+            self.export_bundle_button.setEnabled(True)
+            rows = sum(entry["rows"] for entry in manifest["files"].values())
+            QMessageBox.information(self, "Bundle Exported", f"{rows} rows written to\n{manifest['path']}")
 
-            delete_widget = QWidget()
-            delete_layout = QHBoxLayout()
-            delete_layout.addWidget(delete_button)
-            delete_layout.setContentsMargins(0, 0, 0, 0)
-            delete_widget.setLayout(delete_layout)
+        def failed(message):
+            self.export_bundle_button.setEnabled(True)
+            QMessageBox.warning(self, "Export Failed", message)
 
-            table.setCellWidget(row_idx, len(headers), button_widget)
-            table.setCellWidget(row_idx, len(headers) + 1, delete_widget)
+        self.export_bundle_button.setEnabled(False)
+        self.worker.submit(export_case_bundle, self.case_id, file_path, on_result=exported, on_error=failed)
 
-        table.setStyleSheet("""
-            QTableWidget { background-color: #3A3A3A; border: 1px solid #555; }
-            QHeaderView::section { background-color: #007ACC; color: white; font-weight: bold; border: 1px solid #555; }
-        """)
-
-        table.setEditTriggers(QTableWidget.EditTrigger.DoubleClicked)
-        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        return table
+    def open_related_cases(self):
+        """Lists other cases that share entities with this one."""
+        dialog = RelatedCasesDialog(self.case_id, self)
+        dialog.exec()
 
-    def delete_entry(self, table, row, table_name, column_name):
-        """Deletes a row from the database and updates the UI."""
-        conn = psycopg2.connect(DB_CONN)
-        cur = conn.cursor()
+    def open_add_info_dialog(self):
+        """Opens a dialog to add new information to the case."""
+        dialog = AddInfoDialog(self.case_id, self)
+        if dialog.exec():
+            if not change_feed_connected():
+                self.refresh_data()  # Otherwise the new row is patched in from its notification
+            log_info("Added Information", case_id=self.case_id)
 
-        # Identify the entry to delete using the first column (primary key or unique value)
-        entry_value = table.item(row, 0).text() if table.item(row, 0) else None
-        if not entry_value:
-            print("Error: No value found to delete.")
-            cur.close()
-            conn.close()
-            return
 
-        # Execute delete query
-        delete_query = f"DELETE FROM {table_name} WHERE {column_name} = %s"
-        cur.execute(delete_query, (entry_value,))
-        conn.commit()
+def fill_table(table, headers, rows):
+    """Fills a read-only QTableWidget; the first column of each row is kept as its item data."""
+    table.clear()
+    table.setColumnCount(len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setRowCount(len(rows))
+    for row_idx, row_data in enumerate(rows):
+        for col_idx, value in enumerate(row_data):
+            item = QTableWidgetItem(str(value))
+            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            item.setData(Qt.ItemDataRole.UserRole, row_data[0])
+            table.setItem(row_idx, col_idx, item)
 
-        print(f"Deleted {table_name}: {column_name} = {entry_value}")
 
-        cur.close()
-        conn.close()
-
-        # Refresh UI after deletion
-        current_tab = self.tabs.currentIndex()
-        log_info("Deleted Entry", f"Table: {table_name}, Value: {entry_value}")
-        self.refresh_data()
-        self.tabs.setCurrentIndex(current_tab)  # Restore the active tab
+class RelatedCasesDialog(QDialog):
+    """Cases sharing entities with a given case, ranked by overlap."""
 
+    def __init__(self, case_id, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Related Cases - Case {case_id}")
+        self.setGeometry(350, 350, 600, 400)
+        self.case_id = case_id
+        layout = QVBoxLayout()
 
-    def update_database(self, table, row, table_name):
-        """Updates only entries linked to the specific case."""
-        conn = psycopg2.connect(DB_CONN)
-        cur = conn.cursor()
+        self.worker = DBWorker(self)
+        self.worker.failed.connect(lambda message: QMessageBox.warning(self, "Database Error", message))
+        self.busy_indicator = create_busy_indicator()
+        self.worker.busy_changed.connect(self.busy_indicator.setVisible)
+        layout.addWidget(self.busy_indicator)
 
-        # Mapping of main tables to their linking tables and correct identifier columns
-        link_table_map = {
-            "ips": ("case_ips", "ip_id", "ip_address"),  # Match by ip_address
-            "domains": ("case_domains", "domain_id", "domain"),  # Match by domain
-            "social_profiles": ("case_social_profiles", "social_profile_id", "profile_url"),  # Match by profile_url
-            "metadata": ("case_metadata", "metadata_id", "info"),  # Match by info (data field)
-            "notes": ("case_notes", "note_id", "note")  # Match by note content
-        }
+        self.table = QTableWidget()
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.cellDoubleClicked.connect(self.open_case)
+        layout.addWidget(self.table)
 
-        if table_name not in link_table_map:
-            log_info("Update Database Failed", f"Invalid Table: {table_name}")
-            cur.close()
-            conn.close()
-            return
+        self.setLayout(layout)
+        self.worker.submit(get_related_cases, case_id, on_result=self.show_results)
 
-        link_table, link_column, identifier_column = link_table_map[table_name]
+    def show_results(self, rows):
+        fill_table(self.table, ["Case ID", "Case Name", "Shared Entities", "Entity Types"], rows)
+        log_info("Related Cases", f"Related: {len(rows)}", case_id=self.case_id)
 
-        # Get the row's unique identifier based on the correct column name
-        identifier_value = table.item(row, 0).text() if table.item(row, 0) else None
-        if not identifier_value or identifier_value == "N/A":
-            log_info("Update Database Failed", f"Invalid Identifier: {identifier_value} for {table_name}")
-            cur.close()
-            conn.close()
-            return
+    def open_case(self, row, column):
+        case_id = self.table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+        CaseDetailsDialog(case_id, self).exec()
 
-        # Retrieve the correct ID from the primary table
-        cur.execute(f"SELECT id FROM {table_name} WHERE {identifier_column} = %s", (identifier_value,))
-        entry = cur.fetchone()
 
-        if not entry:
-            log_info("Update Database Failed", f"No Matching Entry for {identifier_value} in {table_name}")
-            cur.close()
-            conn.close()
-            return
+class HotEntitiesDialog(QDialog):
+    """Entities shared by many cases, with the cases each one links."""
 
-        entry_id = entry[0]
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Hot Entities")
+        self.setGeometry(300, 300, 700, 550)
+        layout = QVBoxLayout()
 
-        # Check if the record is linked to this case
-        cur.execute(f"SELECT 1 FROM {link_table} WHERE case_id = %s AND {link_column} = %s", (self.case_id, entry_id))
-        link_check = cur.fetchone()
+        self.worker = DBWorker(self)
+        self.worker.failed.connect(lambda message: QMessageBox.warning(self, "Database Error", message))
+        self.busy_indicator = create_busy_indicator()
+        self.worker.busy_changed.connect(self.busy_indicator.setVisible)
+        layout.addWidget(self.busy_indicator)
 
-        if not link_check:
-            log_info("Update Database Failed", f"Entry {identifier_value} not linked to Case {self.case_id}")
-            cur.close()
-            conn.close()
-            return
+        filter_layout = QHBoxLayout()
+        self.min_cases_input = QSpinBox()
+        self.min_cases_input.setRange(2, 100000)
+        self.min_cases_input.setValue(3)
+        self.min_cases_input.valueChanged.connect(self.load_entities)
+        filter_layout.addWidget(QLabel("Shared by at least"))
+        filter_layout.addWidget(self.min_cases_input)
+        filter_layout.addWidget(QLabel("cases"))
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
 
-        # Get column names dynamically (excluding action buttons)
-        column_names = [table.horizontalHeaderItem(i).text().lower().replace(" ", "_") for i in range(table.columnCount() - 2)]
+        self.entities_table = QTableWidget()
+        self.entities_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.entities_table.cellClicked.connect(self.load_entity_cases)
+        layout.addWidget(self.entities_table)
 
-        # Update only changed values
-        for col_idx, column_name in enumerate(column_names):
-            table_item = table.item(row, col_idx)
-            if table_item is None:
-                continue  # Skip empty cells
+        self.cases_table = QTableWidget()
+        self.cases_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.cases_table.cellDoubleClicked.connect(self.open_case)
+        layout.addWidget(self.cases_table)
 
-            new_value = table_item.text()
+        self.setLayout(layout)
+        self.load_entities()
 
-            # Skip if the value hasn't changed
-            cur.execute(f"SELECT {column_name} FROM {table_name} WHERE id = %s", (entry_id,))
-            existing_value = cur.fetchone()[0]
-            if new_value == str(existing_value):
-                continue
+    def load_entities(self):
+        self.worker.submit(get_hot_entities, self.min_cases_input.value(), channel="entities",
+                           on_result=self.show_entities)
 
-            # Execute the update query
-            update_query = f"UPDATE {table_name} SET {column_name} = %s WHERE id = %s"
-            cur.execute(update_query, (new_value, entry_id))
-            conn.commit()
+    def show_entities(self, rows):
+        self.hot_entities = rows
+        fill_table(self.entities_table, ["Type", "Value", "Cases"], [(t, v, n) for t, _, v, n in rows])
+        self.cases_table.clear()
+        self.cases_table.setRowCount(0)
 
-            log_info("Updated Database", f"Table: {table_name}, Column: {column_name}, New Value: {new_value}")
+    def load_entity_cases(self, row, column):
+        entity_type, entity_id, _, _ = self.hot_entities[row]
+        self.worker.submit(get_entity_cases, entity_type, entity_id, channel="cases",
+                           on_result=lambda rows: fill_table(self.cases_table, ["Case ID", "Case Name"], rows))
 
-        cur.close()
-        conn.close()
+    def open_case(self, row, column):
+        case_id = self.cases_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+        CaseDetailsDialog(case_id, self).exec()
 
-        # Preserve the active tab before refreshing
-        current_tab = self.tabs.currentIndex()
-        self.refresh_data()
-        self.tabs.setCurrentIndex(current_tab)  # Restore the active tab after refreshing
+class ExportDialog(QDialog):
+    """Chooses the scope, format, compression and folder of an export."""
 
+    def __init__(self, case_ids, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Export Cases")
+        self.case_ids = case_ids
+        layout = QFormLayout()
 
+        self.all_input = QCheckBox("Whole database")
+        self.all_input.setChecked(not case_ids)
+        self.all_input.setEnabled(bool(case_ids))
+        self.format_input = QComboBox()
+        self.format_input.addItems([fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or pyarrow is not None])
+        self.format_input.setCurrentText(Config.EXPORT_FORMAT)
+        self.compression_input = QComboBox()
+        self.format_input.currentTextChanged.connect(self.update_compression)
+        self.update_compression(self.format_input.currentText())
+
+        self.output_input = QLineEdit(Config.EXPORT_PATH)
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self.browse)
+        output_layout = QHBoxLayout()
+        output_layout.addWidget(self.output_input)
+        output_layout.addWidget(browse_button)
+
+        export_button = QPushButton("Export")
+        export_button.clicked.connect(self.accept)
+
+        layout.addRow("Scope:", QLabel(f"{len(case_ids)} selected case(s)" if case_ids else "No cases selected"))
+        layout.addRow("", self.all_input)
+        layout.addRow("Format:", self.format_input)
+        layout.addRow("Compression:", self.compression_input)
+        layout.addRow("Folder:", output_layout)
+        layout.addWidget(export_button)
+        self.setLayout(layout)
 
+    def update_compression(self, fmt):
+        self.compression_input.clear()
+        self.compression_input.addItems(EXPORT_COMPRESSION.get(fmt, ["none"]))
+        if Config.EXPORT_COMPRESSION in EXPORT_COMPRESSION.get(fmt, ()):
+            self.compression_input.setCurrentText(Config.EXPORT_COMPRESSION)
 
+    def browse(self):
+        folder = QFileDialog.getExistingDirectory(self, "Export Folder", self.output_input.text())
+        if folder:
+            self.output_input.setText(folder)
 
+    def options(self):
+        """Keyword arguments for export_data()."""
+        return {"case_ids": None if self.all_input.isChecked() else self.case_ids,
+                "output_dir": self.output_input.text().strip() or None,
+                "fmt": self.format_input.currentText(),
+                "compression": self.compression_input.currentText()}
 
+class CaseTableModel(QAbstractTableModel):
+    """Case list that pulls keyset-paginated pages from the database as the view scrolls."""
+    HEADERS = ["ID", "Case Name", "Subject Name", "Username", "Report"]
+    REPORT_COLUMN = 4
 
-    def cancel_edit(self, table, row, original_data):
-        """Cancels edit and restores old value when ❌ is clicked."""
-        for col_idx, value in enumerate(original_data):
-            table.setItem(row, col_idx, QTableWidgetItem(str(value)))
+    def __init__(self, worker, page_size=200, parent=None):
+        super().__init__(parent)
+        self.worker = worker
+        self.page_size = page_size
+        self.name_filter = None
+        self._rows = []
+        self._exhausted = False
+        self._loading = False
+        self._on_loaded = None
+        self._patch_ids = set()
+        self._patching = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if index.column() == self.REPORT_COLUMN:
+            return "📄 Generate Report"
+        return str(self._rows[index.row()][index.column()])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._loading:
+            return
+        self._loading = True
+        after_id = self._rows[-1][0] if self._rows else 0
+        self.worker.submit(get_osint_cases_page, after_id, self.page_size, self.name_filter,
+                           channel="case_page", on_result=self._append_page, on_error=self._page_failed)
+
+    def _append_page(self, page):
+        self._loading = False
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(page) - 1)
+            self._rows.extend(page)
+            self.endInsertRows()
+
+        if self._on_loaded:
+            on_loaded, self._on_loaded = self._on_loaded, None
+            on_loaded(len(self._rows))
+
+    def _page_failed(self, message):
+        self._loading = False
+        self._exhausted = True  # Stop the view from retrying on every scroll; reset() tries again
+        self.worker.failed.emit(message)
+
+    def reset(self, name_filter=None, on_loaded=None):
+        """Drops loaded pages and requests the first page for the given filter.
+
+        A reset supersedes any page request still in flight, so a newer search always wins.
+        `on_loaded` is called with the row count once the first page arrives.
+        """
+        self.beginResetModel()
+        self.name_filter = name_filter
+        self._rows = []
+        self._exhausted = False
+        self._loading = False
+        self._on_loaded = on_loaded
+        self.endResetModel()
+        self.fetchMore()
+
+    def case_id(self, row):
+        return self._rows[row][0]
+
+    def patch_cases(self, case_ids):
+        """Re-reads just these cases and updates, inserts or removes their rows.
+
+        Patches run one at a time so an older read can never overwrite a newer one.
+        """
+        self._patch_ids.update(case_ids)
+        if self._patching or not self._patch_ids:
+            return
+        self._patching = True
+        case_ids, self._patch_ids = self._patch_ids, set()
+        self.worker.submit(get_osint_cases_by_ids, case_ids, self.name_filter,
+                           on_result=functools.partial(self._apply_patch, case_ids, self.name_filter),
+                           on_error=self._patch_failed)
+
+    def _apply_patch(self, case_ids, name_filter, rows):
+        self._patching = False
+        if name_filter == self.name_filter:  # Otherwise a reset already re-read everything
+            fresh = {row[0]: row for row in rows}
+            loaded_ids = [row[0] for row in self._rows]
+            for case_id in sorted(case_ids):
+                position = bisect.bisect_left(loaded_ids, case_id)
+                present = position < len(loaded_ids) and loaded_ids[position] == case_id
+                if case_id in fresh and present:
+                    self._rows[position] = fresh[case_id]
+                    self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.HEADERS) - 1))
+                elif present:
+                    self.beginRemoveRows(QModelIndex(), position, position)
+                    del self._rows[position]
+                    del loaded_ids[position]
+                    self.endRemoveRows()
+                elif case_id in fresh and (self._exhausted or position < len(loaded_ids)):
+                    # Beyond the last loaded page it arrives with the next fetchMore instead
+                    self.beginInsertRows(QModelIndex(), position, position)
+                    self._rows.insert(position, fresh[case_id])
+                    loaded_ids.insert(position, case_id)
+                    self.endInsertRows()
+        self.patch_cases(())
+
+    def _patch_failed(self, message):
+        self._patching = False
+        self.worker.failed.emit(message)
 
-    def open_add_info_dialog(self):
-        """Opens a dialog to add new information to the case."""
-        dialog = AddInfoDialog(self.case_id, self)
-        if dialog.exec():
-            self.refresh_data()  # Refresh the case file dialog after adding new info
-            log_info("Added Information", f"Case ID: {self.case_id}")
 
 class OSINTManager(QMainWindow):
     def __init__(self):
@@ -702,9 +4960,17 @@ class OSINTManager(QMainWindow):
         layout = QVBoxLayout()
 
         self.search_input = QLineEdit(self)
-        self.search_input.setPlaceholderText("Enter case name...")
+        self.search_input.setPlaceholderText("Search cases, IPs, domains, profiles, notes...")
+        self.search_input.returnPressed.connect(self.search_case)
         self.search_btn = QPushButton("Search")
         self.search_btn.clicked.connect(self.search_case)
+
+        # Search as the user types, once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(Config.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_case)
+        self.search_input.textChanged.connect(self.search_timer.start)
         
         self.add_case_btn = QPushButton("Create New Case")
         self.add_case_btn.clicked.connect(self.open_add_case_dialog)
@@ -715,30 +4981,106 @@ class OSINTManager(QMainWindow):
         self.settings_btn = QPushButton("⚙️ Settings")
         self.settings_btn.clicked.connect(self.open_settings_dialog)
 
+        self.hot_entities_btn = QPushButton("🔥 Hot Entities")
+        self.hot_entities_btn.clicked.connect(self.open_hot_entities)
+
+        self.batch_report_btn = QPushButton("📄 Generate Reports for Selected Cases")
+        self.batch_report_btn.clicked.connect(self.generate_selected_reports)
+
+        self.export_btn = QPushButton("📤 Export Cases")
+        self.export_btn.clicked.connect(self.export_cases)
+
+        self.import_bundle_btn = QPushButton("📥 Import Case Bundle")
+        self.import_bundle_btn.clicked.connect(self.import_bundle)
+
         layout.addWidget(QLabel("OSINT Case Search:"))
         layout.addWidget(self.search_input)
         layout.addWidget(self.search_btn)
         layout.addWidget(self.add_case_btn)
+        layout.addWidget(self.hot_entities_btn)
+        layout.addWidget(self.batch_report_btn)
+        layout.addWidget(self.export_btn)
+        layout.addWidget(self.import_bundle_btn)
         layout.addWidget(self.view_logs_btn)
         layout.addWidget(self.settings_btn)
 
-        self.result_table = QTableWidget()
-        self.result_table.setColumnCount(4)
-        self.result_table.setHorizontalHeaderLabels(["ID", "Case Name", "Subject Name", "Username"])
-        self.result_table.cellDoubleClicked.connect(self.view_case_details)
-
+        self.worker = DBWorker(self)
+        self.worker.failed.connect(lambda message: self.statusBar().showMessage(f"Database error: {message}", 10000))
+        self.busy_indicator = create_busy_indicator()
+        self.busy_indicator.setMaximumWidth(150)
+        self.worker.busy_changed.connect(self.busy_indicator.setVisible)
+        self.statusBar().addPermanentWidget(self.busy_indicator)
+
+        self.case_model = CaseTableModel(self.worker, Config.CASE_PAGE_SIZE, self)
+        self.report_delegate = ButtonDelegate(parent=self)
+        self.report_delegate.clicked.connect(lambda row: self.generate_report(self.case_model.case_id(row)))
+
+        self.result_table = QTableView()
+        self.result_table.setModel(self.case_model)
+        self.result_table.setItemDelegateForColumn(CaseTableModel.REPORT_COLUMN, self.report_delegate)
+        self.result_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.result_table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
+        self.result_table.doubleClicked.connect(self.view_case_details)
+
+        # Entity search results, grouped by type
+        self.search_results = QTreeWidget()
+        self.search_results.setHeaderLabels(["Match", "Case", "Score"])
+        self.search_results.itemDoubleClicked.connect(self.open_search_result)
+        self.search_results.hide()
+
+        layout.addWidget(self.search_results)
         layout.addWidget(self.result_table)
 
         container = QWidget()
         container.setLayout(layout)
         self.setCentralWidget(container)
 
+        # Cases changed by other analysts are patched in as their notifications arrive
+        self.changed_cases = set()
+        self.case_patch_timer = QTimer(self)
+        self.case_patch_timer.setSingleShot(True)
+        self.case_patch_timer.setInterval(LIVE_PATCH_DELAY_MS)
+        self.case_patch_timer.timeout.connect(self.patch_changed_cases)
+
+        # Nothing reads the database until the schema is current
+        self.worker.submit(prepare_database, on_result=self.database_ready, on_error=self.database_failed)
+
+    def database_ready(self, applied):
+        """Starts the change feed and loads the case list once prepare_database has run."""
+        get_change_bridge().changed.connect(self.case_changed)
         self.load_data()
+
+    def database_failed(self, message):
+        log_error("Database Preparation Failed", message)
+        QMessageBox.critical(self, "Database Error",
+                             f"The database schema could not be brought up to date:\n{message}\n\n"
+                             "Run `python app.py migrate` to see which migration failed.")
+
+    def case_changed(self, change):
+        """Queues changed cases; only the cases table affects the list."""
+        if change["table"] is None or (change["table"] == "cases" and change["ids"] is None):
+            # Missed or too many changes to list: re-read what is loaded
+            self.changed_cases.clear()
+            self.case_model.reset(self.case_model.name_filter)
+        elif change["table"] == "cases":
+            self.changed_cases.update(change["ids"])
+            if not self.case_patch_timer.isActive():
+                self.case_patch_timer.start()
+
+    def patch_changed_cases(self):
+        changed, self.changed_cases = self.changed_cases, set()
+        self.case_model.patch_cases(changed)
+
     def open_log_viewer(self):
         """Opens the log viewer dialog."""
         dialog = LogViewer(self)
         dialog.exec()    
 
+    def open_hot_entities(self):
+        """Opens the cross-case view of entities shared by many cases."""
+        dialog = HotEntitiesDialog(self)
+        dialog.exec()
+
     def open_settings_dialog(self):
         """Opens the settings dialog."""
         dialog = SettingsDialog(self)
@@ -746,46 +5088,24 @@ class OSINTManager(QMainWindow):
             log_info("Settings opened", "User attempting to update the application settings.")
 
     def load_data(self):
-        data = get_osint_cases()
-        self.result_table.setColumnCount(5)  # Add an extra column for the "Generate Report" button
-        self.result_table.setHorizontalHeaderLabels(["ID", "Case Name", "Subject Name", "Username", "Report"])
-
-        self.result_table.setRowCount(len(data))
-        for row, case in enumerate(data):
-            for col, value in enumerate(case):
-                self.result_table.setItem(row, col, QTableWidgetItem(str(value)))
-
-            # Add "Generate Report" button
-            button = QPushButton("📄 Generate Report")
-            button.setStyleSheet("background-color: #007ACC; color: white; font-size: 12px; padding: 5px;")
-            button.clicked.connect(lambda _, case_id=case[0]: self.generate_report(case_id))
-
-            # Create a widget to hold the button
-            button_widget = QWidget()
-            button_layout = QHBoxLayout()
-            button_layout.addWidget(button)
-            button_layout.setContentsMargins(0, 0, 0, 0)
-            button_widget.setLayout(button_layout)
-
-            self.result_table.setCellWidget(row, 4, button_widget)  # Insert button into the last column
-            log_info("Loaded Cases", f"{len(data)} cases loaded.")
+        """Reloads the case list; further pages are fetched by the model as the user scrolls."""
+        self.case_model.reset(on_loaded=lambda count: log_info("Loaded Cases", f"{count} cases loaded (first page)."))
 
 
     def generate_report(self, case_id):
-        """Generate a professionally styled case report PDF using settings from Config."""
-        case_details = get_case_details(case_id)
-
-        if not case_details:
-            log_error("Generate Report", f"No case details found for Case ID {case_id}")
+        """Loads the case in the background, then asks where to save its report."""
+        self.worker.submit(get_case_info, case_id, channel=("report", case_id),
+                           on_result=lambda case_info: self.write_report(case_id, case_info))
+
+    def write_report(self, case_id, case_info):
+        """Asks where to save the report, then renders it in the background."""
+        if not case_info:
+            log_error("Generate Report", "No case details found", case_id=case_id)
             QMessageBox.critical(self, "Report Generation Failed", "No case details found!")
             return
 
-        # **Sanitize the case name for filename usage**
-        case_name_clean = case_details["case_info"][0].replace(" ", "_").replace("/", "_")
-
         # **Generate report filename using settings**
-        default_filename = f"{Config.REPORT_TITLE.replace(' ', '_')}_{case_name_clean}.pdf"
-        default_save_path = os.path.join(Config.REPORT_SAVE_PATH, default_filename)
+        default_save_path = os.path.join(Config.REPORT_SAVE_PATH, report_filename(case_info[0]))
 
         # **Ask user where to save**
         file_path, _ = QFileDialog.getSaveFileName(
@@ -801,118 +5121,212 @@ class OSINTManager(QMainWindow):
         # **Ensure report directory exists**
         os.makedirs(Config.REPORT_SAVE_PATH, exist_ok=True)
 
-        # **Create the PDF document**
-        doc = SimpleDocTemplate(file_path, pagesize=letter)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # **Use the configured font**
-        title_style = styles["Title"]
-        title_style.fontName = Config.REPORT_FONT
-
-        # **Report Title Section**
-        elements.append(Paragraph(f"<b>{Config.REPORT_TITLE}</b>", title_style))
-        elements.append(Spacer(1, 0.3 * inch))
-
-        # **Case Header Section**
-        case_info = [
-            ["Case ID:", case_id],
-            ["Person of Interest:", case_details["case_info"][1]],
-            ["Username:", case_details["case_info"][2]],
-            ["Created At:", case_details["case_info"][4]],
-            ["Last Updated:", case_details["case_info"][5]],
-        ]
-        elements.append(self.create_styled_table(case_info))
-        elements.append(Spacer(1, 0.3 * inch))
-
-        # **IP Addresses Section**
-        if case_details["ips"]:
-            elements.append(Paragraph("<b>IP ADDRESSES</b>", styles["Heading2"]))
-            ip_table_data = [["IP Address", "Location", "ISP", "Last Seen"]] + case_details["ips"]
-            elements.append(self.create_styled_table(ip_table_data))
-            elements.append(Spacer(1, 0.3 * inch))
-
-        # **Domains Section**
-        if case_details["domains"]:
-            elements.append(Paragraph("<b>DOMAINS</b>", styles["Heading2"]))
-            domain_table_data = [["Domain", "Last Seen"]] + case_details["domains"]
-            elements.append(self.create_styled_table(domain_table_data))
-            elements.append(Spacer(1, 0.3 * inch))
-
-        # **Social Profiles Section**
-        if case_details["social_profiles"]:
-            elements.append(Paragraph("<b>SOCIAL PROFILES</b>", styles["Heading2"]))
-            social_table_data = [["Platform", "Profile URL"]] + case_details["social_profiles"]
-            elements.append(self.create_styled_table(social_table_data))
-            elements.append(Spacer(1, 0.3 * inch))
-
-        # **Metadata Section**
-        if case_details["metadata"]:
-            elements.append(Paragraph("<b>METADATA</b>", styles["Heading2"]))
-            meta_table_data = [["Info", "Source", "Date Found"]] + case_details["metadata"]
-            elements.append(self.create_styled_table(meta_table_data))
-            elements.append(Spacer(1, 0.3 * inch))
-
-        # **Case Notes Section**
-        if case_details["notes"]:
-            elements.append(Paragraph("<b>CASE NOTES</b>", styles["Heading2"]))
-            for note in case_details["notes"]:
-                elements.append(Paragraph(f"📝 <i>{note[0]}</i> (Created: {note[1]})", styles["Normal"]))
-                elements.append(Spacer(1, 0.1 * inch))
-
-        # **Build and Save PDF**
-        doc.build(elements)
-        log_info("Generate Report", f"Case ID {case_id} report saved at {file_path}")
-        QMessageBox.information(self, "Report Generated", f"Report saved successfully:\n{file_path}")
-
-    def create_styled_table(self, data):
-        """Creates a professional-style table for the report using Config settings."""
-        if not data:
-            return Paragraph("<i>No data available</i>", getSampleStyleSheet()["Normal"])
-
-        table = Table(data, colWidths=[120] * len(data[0]))  # Auto column width
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.darkblue),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("FONTNAME", (0, 0), (-1, 0), Config.REPORT_FONT),  # **Use Config Font**
-            ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-            ("BACKGROUND", (0, 1), (-1, -1), colors.whitesmoke),
-            ("GRID", (0, 0), (-1, -1), 1, colors.black),
-        ]))
-
-        return table
+        def saved(cached):
+            log_info("Generate Report", f"Report saved at {file_path}" + (" (cached)" if cached else ""), case_id=case_id)
+            QMessageBox.information(self, "Report Generated", f"Report saved successfully:\n{file_path}")
 
+        self.worker.submit(write_case_report, case_id, file_path, case_info, on_result=saved)
 
+    def generate_selected_reports(self):
+        """Renders reports for every selected case in parallel worker processes."""
+        case_ids = [self.case_model.case_id(index.row()) for index in self.result_table.selectionModel().selectedRows()]
+        if not case_ids:
+            QMessageBox.information(self, "Batch Reports", "Select one or more cases first.")
+            return
+
+        progress_dialog = QProgressDialog("Generating reports...", "Cancel", 0, len(case_ids), self)
+        progress_dialog.setWindowTitle("Batch Reports")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(0)
+        cancelled = threading.Event()
+        progress_dialog.canceled.connect(cancelled.set)
+
+        def progressed(update):
+            done, total, result = update
+            progress_dialog.setValue(done)
+            if "error" in result:
+                progress_dialog.setLabelText(f"{done}/{total} - Case {result['case_id']} failed")
+            else:
+                progress_dialog.setLabelText(f"{done}/{total} - Case {result['case_id']} in {result['seconds']:.1f}s")
+
+        def finished(results):
+            progress_dialog.close()
+            QMessageBox.information(self, "Batch Reports", format_batch_summary(results))
+
+        def failed(message):
+            progress_dialog.close()
+            QMessageBox.warning(self, "Batch Reports Failed", message)
+
+        self.worker.submit(generate_reports_batch, case_ids, should_cancel=cancelled.is_set,
+                           on_result=finished, on_error=failed, on_progress=progressed)
+
+    def export_cases(self):
+        """Streams the selected cases, or the whole database, to files in the background."""
+        case_ids = [self.case_model.case_id(index.row()) for index in self.result_table.selectionModel().selectedRows()]
+        dialog = ExportDialog(case_ids, self)
+        if not dialog.exec():
+            return
+
+        progress_dialog = QProgressDialog("Exporting...", "Cancel", 0, 0, self)
+        progress_dialog.setWindowTitle("Export")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(0)
+        cancelled = threading.Event()
+        progress_dialog.canceled.connect(cancelled.set)
+        started = time.perf_counter()
+        written = {}
+
+        def progressed(update):
+            dataset, rows = update
+            written[dataset] = rows
+            rate = sum(written.values()) / max(time.perf_counter() - started, 1e-6)
+            progress_dialog.setLabelText(f"{dataset}: {rows:,} rows ({rate:,.0f} rows/s)")
+
+        def finished(result):
+            progress_dialog.close()
+            QMessageBox.information(self, "Export", format_export_stats(result))
+
+        def failed(message):
+            progress_dialog.close()
+            QMessageBox.warning(self, "Export Failed", message)
+
+        self.worker.submit(export_data, **dialog.options(), should_cancel=cancelled.is_set,
+                           on_result=finished, on_error=failed, on_progress=progressed)
+
+    def import_bundle(self):
+        """Loads a case bundle from another instance as a new case."""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import Case Bundle", Config.BUNDLE_PATH, f"Case Bundles (*{BUNDLE_SUFFIX});;All Files (*)"
+        )
+        if not file_path:
+            return  # User canceled
+
+        def imported(stats):
+            self.import_bundle_btn.setEnabled(True)
+            if not change_feed_connected():
+                self.load_data()  # Otherwise the new case is patched in from its notification
+            QMessageBox.information(self, "Bundle Imported", format_bundle_stats(stats))
+
+        def failed(message):
+            self.import_bundle_btn.setEnabled(True)
+            QMessageBox.warning(self, "Import Failed", message)
+
+        self.import_bundle_btn.setEnabled(False)
+        self.worker.submit(import_case_bundle, file_path, on_result=imported, on_error=failed)
 
-    
     def search_case(self):
-        query = self.search_input.text()
-        conn = psycopg2.connect(DB_CONN)
-        cur = conn.cursor()
-        cur.execute("SELECT id, case_name, subject_name, username FROM cases WHERE case_name ILIKE %s", (f"%{query}%",))
-        data = cur.fetchall()
-        cur.close()
-        conn.close()
-        
-        self.result_table.setRowCount(len(data))
-        for row, case in enumerate(data):
-            for col, value in enumerate(case):
-                self.result_table.setItem(row, col, QTableWidgetItem(str(value)))
-                log_info("Search Case", f"Query: {query}, Results: {len(data)}")
+        """Filters the case list by name and searches every entity type for the query."""
+        self.search_timer.stop()
+        query = self.search_input.text().strip()
+        self.case_model.reset(name_filter=query or None)
+
+        if len(query) < SEARCH_MIN_CHARS:
+            self.worker.cancel("search")
+            self.search_results.clear()
+            self.search_results.hide()
+            return
+
+        self.worker.submit(search_entities, query, Config.SEARCH_RESULT_LIMIT, channel="search",
+                           on_result=lambda results: self.show_search_results(query, results))
+
+    def show_search_results(self, query, results):
+        """Shows ranked matches grouped by entity type."""
+        self.search_results.clear()
+        for kind, matches in results.items():
+            group = QTreeWidgetItem([f"{kind} ({len(matches)})"])
+            for case_id, case_name, value, rank in matches:
+                item = QTreeWidgetItem([str(value), f"#{case_id} {case_name}", f"{rank:.2f}"])
+                item.setData(0, Qt.ItemDataRole.UserRole, case_id)
+                group.addChild(item)
+            self.search_results.addTopLevelItem(group)
+            group.setExpanded(True)
+
+        if not results:
+            self.search_results.addTopLevelItem(QTreeWidgetItem(["No matches"]))
+        self.search_results.show()
+        log_info("Search Case", f"Query: {query}, Results: {sum(len(m) for m in results.values())}")
+
+    def open_search_result(self, item, column):
+        case_id = item.data(0, Qt.ItemDataRole.UserRole)
+        if case_id is None:
+            return  # Group header
+        log_info("View Case Details", "Opened from search.", case_id=case_id)
+        dialog = CaseDetailsDialog(case_id, self)
+        dialog.exec()
     
     def open_add_case_dialog(self):
         dialog = AddCaseDialog(self)
         if dialog.exec():
-            self.load_data()
+            if not change_feed_connected():
+                self.load_data()  # Otherwise the new case is patched in from its notification
             log_info("Add Case", "A new case was added.")
     
-    def view_case_details(self, row, column):
-        case_id = self.result_table.item(row, 0).text()
-        log_info("View Case Details", f"Case ID {case_id} opened.")
+    def view_case_details(self, index):
+        if index.column() == CaseTableModel.REPORT_COLUMN:
+            return  # Clicks on the report button are handled by the delegate
+        case_id = self.case_model.case_id(index.row())
+        log_info("View Case Details", "Opened.", case_id=case_id)
         dialog = CaseDetailsDialog(case_id, self)
         dialog.exec()
-LOG_FILE = "logs/user_activity.log"  # Ensure this path is correct
+class LogLineModel(QAbstractListModel):
+    """Read-only list of log lines held as file offsets; line text is read from disk when shown."""
+
+    def __init__(self, cache_size=5000, read_ahead=200, parent=None):
+        super().__init__(parent)
+        self.cache_size = cache_size
+        self.read_ahead = read_ahead  # Lines decoded per read, so compressed segments seek once per screen
+        self._files = []  # Open segment files, indexed by the entries of _segments
+        self._file_index = {}  # Path -> position in _files
+        self._segments = array("H")
+        self._offsets = array("Q")
+        self._lines = OrderedDict()  # Row -> text, most recently shown last
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._offsets)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        return self.line(index.row())
+
+    def line(self, row):
+        text = self._lines.get(row)
+        if text is not None:
+            self._lines.move_to_end(row)
+            return text
+        segment = self._segments[row]
+        f = self._files[segment]
+        f.seek(self._offsets[row])
+        for ahead in range(row, min(row + self.read_ahead, len(self._offsets))):
+            if self._segments[ahead] != segment:
+                break
+            if f.tell() != self._offsets[ahead]:
+                f.seek(self._offsets[ahead])  # Forward past lines hidden by the level filter
+            self._lines[ahead] = format_log_line(f.readline())
+        while len(self._lines) > self.cache_size:
+            self._lines.popitem(last=False)
+        return self._lines[row]
+
+    def append(self, path, offsets):
+        if path not in self._file_index:
+            self._file_index[path] = len(self._files)
+            self._files.append(open_log_segment(path))  # Held open so a rotation rename does not move lines
+        first = len(self._offsets)
+        self.beginInsertRows(QModelIndex(), first, first + len(offsets) - 1)
+        self._segments.extend(array("H", [self._file_index[path]]) * len(offsets))
+        self._offsets.extend(offsets)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        for f in self._files:
+            f.close()
+        self._files = []
+        self._file_index = {}
+        self._segments = array("H")
+        self._offsets = array("Q")
+        self._lines.clear()
+        self.endResetModel()
 
 
 class LogViewer(QDialog):
@@ -943,58 +5357,181 @@ class LogViewer(QDialog):
         filter_layout.addWidget(QLabel("Log Level:"))
         filter_layout.addWidget(self.level_filter)
 
+        # **Log Source**
+        self.source_filter = QComboBox(self)
+        self.source_filter.addItems(["Log File", "Audit Trail"])
+        self.source_filter.currentTextChanged.connect(self.change_source)
+        filter_layout.addWidget(QLabel("Source:"))
+        filter_layout.addWidget(self.source_filter)
+
+        # **Live Tail**
+        self.tail_checkbox = QCheckBox("Live tail")
+        self.tail_checkbox.toggled.connect(self.toggle_tail)
+        filter_layout.addWidget(self.tail_checkbox)
+
         # **Apply Filter Button**
         self.filter_button = QPushButton("Apply Filter")
         self.filter_button.clicked.connect(self.apply_filters)
 
+        # **Audit Trail Filters** - applied by the database
+        self.audit_filters = QWidget()
+        audit_filter_layout = QHBoxLayout(self.audit_filters)
+        audit_filter_layout.setContentsMargins(0, 0, 0, 0)
+        self.case_filter = QLineEdit()
+        self.case_filter.setPlaceholderText("Case ID")
+        self.user_filter = QLineEdit()
+        self.user_filter.setPlaceholderText("User")
+        self.action_filter = QLineEdit()
+        self.action_filter.setPlaceholderText("Action")
+        for widget in (self.case_filter, self.user_filter, self.action_filter):
+            widget.returnPressed.connect(self.apply_filters)
+            audit_filter_layout.addWidget(widget)
+        self.audit_filters.hide()
+
         layout.addLayout(filter_layout)
+        layout.addWidget(self.audit_filters)
         layout.addWidget(self.filter_button)
 
-        # **Log Display**
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
-        layout.addWidget(self.log_text)
+        self.worker = DBWorker(self)
+        self.worker.failed.connect(lambda message: QMessageBox.warning(self, "Log Error", message))
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        # **Log Display** - only the visible lines are ever read from disk
+        self.log_model = LogLineModel(parent=self)
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.log_view.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        layout.addWidget(self.log_view)
+
+        self.audit_rows = []
+        self.audit_table = QTableWidget()
+        self.audit_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.audit_table.hide()
+        layout.addWidget(self.audit_table)
+        self.load_more_button = QPushButton("Load More")
+        self.load_more_button.clicked.connect(lambda: self.load_audit_events(more=True))
+        self.load_more_button.hide()
+        layout.addWidget(self.load_more_button)
+
+        self.stop_event = threading.Event()
+        self.tail_position = None
+        self.tail_timer = QTimer(self)
+        self.tail_timer.setInterval(1000)
+        self.tail_timer.timeout.connect(self.poll_tail)
+        self.finished.connect(self.stop_scan)
 
         self.setLayout(layout)
         self.load_logs()  # Initial log load
 
-    def load_logs(self):
-        """Loads logs from file and applies filters."""
-        if not os.path.exists(LOG_FILE):
-            self.log_text.setPlainText("No logs found.")
-            return
-
-        with open(LOG_FILE, "r") as f:
-            logs = f.readlines()
-
-        filtered_logs = self.filter_logs(logs)
-        self.log_text.setPlainText("\n".join(filtered_logs))
-
-    def filter_logs(self, logs):
-        """Filters logs based on selected date range and log level."""
-        start_date = self.start_date.date().toString("yyyy-MM-dd")
-        end_date = self.end_date.date().toString("yyyy-MM-dd")
-        selected_level = self.level_filter.currentText()
+    def selected_level(self):
+        level = self.level_filter.currentText()
+        return None if level == "ALL" else level
+
+    def stop_scan(self):
+        self.stop_event.set()
+        self.tail_timer.stop()
+
+    def audit_source(self):
+        return self.source_filter.currentText() == "Audit Trail"
+
+    def change_source(self):
+        self.stop_scan()
+        audit = self.audit_source()
+        self.audit_filters.setVisible(audit)
+        self.audit_table.setVisible(audit)
+        self.log_view.setVisible(not audit)
+        self.load_more_button.setVisible(False)
+        self.tail_checkbox.setEnabled(not audit)
+        if audit:
+            self.tail_checkbox.setChecked(False)
+        self.load_logs()
 
-        filtered = []
-        for log in logs:
-            parts = log.split(" - ")  # Expected format: "2025-03-05 10:30:00 - INFO - Action..."
-            if len(parts) < 3:
-                continue  # Skip malformed logs
+    def load_audit_events(self, more=False):
+        """Queries the audit trail with the filters applied server-side, one page at a time."""
+        case_id = self.case_filter.text().strip()
+        if case_id and not case_id.isdigit():
+            QMessageBox.warning(self, "Invalid Filter", "Case ID must be a number.")
+            return
+        if not more:
+            self.audit_rows = []
+        before = (self.audit_rows[-1][1], self.audit_rows[-1][0]) if more and self.audit_rows else None
+
+        self.status_label.setText("Querying...")
+        self.worker.submit(query_audit_events,
+                           self.start_date.date().toString("yyyy-MM-dd"),
+                           self.end_date.date().toString("yyyy-MM-dd"),
+                           self.selected_level(), int(case_id) if case_id else None,
+                           self.user_filter.text().strip() or None, self.action_filter.text().strip() or None,
+                           before, Config.AUDIT_PAGE_SIZE,
+                           channel="audit", on_result=self.show_audit_events)
+
+    def show_audit_events(self, rows):
+        self.audit_rows.extend(rows)
+        fill_table(self.audit_table, ["Time", "Level", "User", "Host", "Action", "Details", "Case", "Duration"], [
+            (occurred_at.strftime("%Y-%m-%d %H:%M:%S"), level, username, host, action, details,
+             "" if case_id is None else case_id, "" if duration is None else f"{duration * 1000:.0f} ms")
+            for _, occurred_at, level, username, host, action, details, case_id, duration in self.audit_rows
+        ])
+        self.load_more_button.setVisible(len(rows) == Config.AUDIT_PAGE_SIZE)
+        self.status_label.setText(f"{len(self.audit_rows)} events")
 
-            log_date, log_level, log_message = parts[0][:10], parts[1], parts[2]
+    def load_logs(self):
+        """Seeks to the selected dates through the log index and lists the matching lines as they are found."""
+        if self.audit_source():
+            self.load_audit_events()
+            return
+        self.stop_scan()
+        self.stop_event = threading.Event()
+        self.log_model.clear()
+        self.tail_position = None
+        if not log_segments(Config.LOG_FILE_PATH):
+            self.status_label.setText("No logs found.")
+            return
 
-            # **Date Filtering**
-            if not (start_date <= log_date <= end_date):
-                continue
+        self.status_label.setText("Scanning...")
+        self.worker.submit(load_log_range,
+                           self.start_date.date().toString("yyyy-MM-dd"),
+                           self.end_date.date().toString("yyyy-MM-dd"),
+                           self.selected_level(), self.stop_event,
+                           channel="logs", on_result=self.logs_loaded, on_progress=self.append_lines)
+
+    def append_lines(self, update):
+        path, offsets = update
+        follow = self.log_view.verticalScrollBar().value() == self.log_view.verticalScrollBar().maximum()
+        self.log_model.append(path, offsets)
+        if follow and self.tail_checkbox.isChecked():
+            self.log_view.scrollToBottom()
+
+    def logs_loaded(self, position):
+        self.tail_position = position
+        self.status_label.setText(f"{self.log_model.rowCount()} lines")
+        if self.tail_checkbox.isChecked():
+            self.tail_timer.start()
+
+    def toggle_tail(self, enabled):
+        """Tailing follows today's log, so the range is extended to today first."""
+        if not enabled:
+            self.tail_timer.stop()
+            return
+        if self.end_date.date() != QDate.currentDate():
+            self.end_date.setDate(QDate.currentDate())
+            self.load_logs()
+        elif self.tail_position is not None:
+            self.tail_timer.start()
 
-            # **Log Level Filtering**
-            if selected_level != "ALL" and log_level != selected_level:
-                continue
+    def poll_tail(self):
+        if self.worker.is_busy():
+            return  # Previous poll still scanning
 
-            filtered.append(log)
+        def tailed(position):
+            self.tail_position = position
+            self.status_label.setText(f"{self.log_model.rowCount()} lines (live)")
 
-        return filtered
+        self.worker.submit(tail_log, self.tail_position, self.selected_level(), self.stop_event,
+                           channel="tail", on_result=tailed, on_progress=self.append_lines)
 
     def apply_filters(self):
         """Refresh logs when filters are applied."""
@@ -1083,9 +5620,177 @@ class SettingsDialog(QDialog):
 
 
 
+def run_cli(argv):
+    """Headless entry point: `python app.py <command> ...`."""
+    parser = argparse.ArgumentParser(prog="app.py", description="Quantalyze command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Bulk import IOCs into a case")
+    import_parser.add_argument("case_id", type=int)
+    import_parser.add_argument("file", help="Newline list, CSV or JSON file of IPs, domains, profile URLs and notes")
+    import_parser.add_argument("--format", choices=["auto", "lines", "csv", "json"], default="auto")
+
+    commands.add_parser("refresh-correlations", help="Rebuild the cross-case correlation index")
+    commands.add_parser("gc-entities", help="Delete entities no case links to any more")
+
+    migrate_parser = commands.add_parser("migrate", help="Create or update the database schema")
+    migrate_parser.add_argument("--status", action="store_true", help="List migrations without applying them")
+
+    plans_parser = commands.add_parser("check-plans", help="Flag sequential scans of large tables in the shipped queries")
+    plans_parser.add_argument("--case-id", type=int, default=None, help="Sample case (default: the newest)")
+    plans_parser.add_argument("--threshold", type=int, default=None,
+                              help="Table rows above which a scan is flagged (default: PLAN_SEQ_SCAN_ROWS)")
+
+    reports_parser = commands.add_parser("reports", help="Render PDF reports in parallel")
+    reports_parser.add_argument("case_ids", type=int, nargs="*", help="Cases to report on")
+    reports_parser.add_argument("--all", action="store_true", help="Report on every case")
+    reports_parser.add_argument("--output", default=None, help="Output directory (default: REPORT_SAVE_PATH)")
+    reports_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    reports_parser.add_argument("--no-cache", action="store_true", help="Re-render even unchanged cases")
+
+    export_parser = commands.add_parser("export", help="Stream cases to JSON Lines, CSV or Parquet files")
+    export_parser.add_argument("case_ids", type=int, nargs="*", help="Cases to export")
+    export_parser.add_argument("--all", action="store_true", help="Export the whole database")
+    export_parser.add_argument("--format", choices=list(EXPORT_FORMATS), default=None,
+                               help="Output format (default: EXPORT_FORMAT)")
+    export_parser.add_argument("--compression", choices=sorted({c for codecs in EXPORT_COMPRESSION.values() for c in codecs}),
+                               default=None, help="Compression (default: EXPORT_COMPRESSION)")
+    export_parser.add_argument("--output", default=None, help="Output directory (default: EXPORT_PATH)")
+    export_parser.add_argument("--fetch-size", type=int, default=None,
+                               help="Rows per server-side fetch (default: EXPORT_FETCH_SIZE)")
+
+    bundle_export_parser = commands.add_parser("export-bundle", help="Pack a case into a portable bundle file")
+    bundle_export_parser.add_argument("case_id", type=int)
+    bundle_export_parser.add_argument("--output", default=None,
+                                      help=f"Bundle file (default: BUNDLE_PATH/<case name>_<id>{BUNDLE_SUFFIX})")
+
+    bundle_import_parser = commands.add_parser("import-bundle", help="Load case bundles as new cases")
+    bundle_import_parser.add_argument("files", nargs="+", help=f"{BUNDLE_SUFFIX} files")
+
+    enrich_parser = commands.add_parser("enrich-ips", help="Fill IP location and ISP from local GeoIP databases")
+    enrich_parser.add_argument("--batch-size", type=int, default=None, help="IPs per batch (default: ENRICH_BATCH)")
+    enrich_parser.add_argument("--workers", type=int, default=None, help="Lookup threads (default: ENRICH_WORKERS)")
+
+    resolve_parser = commands.add_parser("resolve-domains", help="Resolve domains to A/AAAA/MX records and link them")
+    resolve_parser.add_argument("--all", action="store_true", help="Re-resolve domains resolved before")
+    resolve_parser.add_argument("--backend", choices=list(DNS_BACKENDS), default=None,
+                                help="Resolver backend (default: DNS_BACKEND)")
+    resolve_parser.add_argument("--nameserver", action="append", default=None,
+                                help="DNS server to query, repeatable (default: DNS_NAMESERVERS)")
+    resolve_parser.add_argument("--port", type=int, default=None, help="DNS server port (default: DNS_PORT)")
+    resolve_parser.add_argument("--concurrency", type=int, default=None,
+                                help="Queries in flight (default: DNS_CONCURRENCY)")
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command != "migrate":
+            # Only the GUI migrates on start; the other commands expect the current schema
+            pending = pending_migrations()
+            if pending:
+                print(f"The database schema is out of date ({len(pending)} pending migration(s), "
+                      f"starting with {pending[0][0]}: {pending[0][1]}). Run `python app.py migrate` first.",
+                      file=sys.stderr)
+                return 2
+        if args.command == "import":
+            stats = import_ioc_file(args.case_id, args.file, args.format)
+            print(format_import_stats(stats))
+            refresh_correlation_index()  # The coalescing timers would not outlive this process
+            if stats["staged"]["Domain"] and Config.DNS_RESOLVE_ON_IMPORT:
+                print(format_resolution_stats(resolve_domains()))
+            if Config.ENRICH_ON_IMPORT and enrichment_available():
+                print(format_enrichment_stats(enrich_ips()))
+        elif args.command == "refresh-correlations":
+            refresh_correlation_index()
+        elif args.command == "migrate":
+            if not args.status:
+                applied = run_migrations()
+                print(f"Applied {len(applied)} migration(s)")
+            for version, name, applied_at in get_migration_status():
+                print(f"{version:>4}  {'applied ' + str(applied_at) if applied_at else 'pending':<40}  {name}")
+        elif args.command == "check-plans":
+            findings = check_query_plans(args.case_id, args.threshold)
+            for name, table, rows in findings:
+                print(f"Seq Scan on {table} (~{rows} rows): {name}")
+            print(f"{len(findings)} sequential scan(s) of large tables" if findings else "No sequential scans of large tables")
+            return 1 if findings else 0
+        elif args.command == "gc-entities":
+            for table_name, count in collect_orphaned_entities().items():
+                print(f"{table_name}: {count} removed")
+        elif args.command == "export":
+            if not args.all and not args.case_ids:
+                parser.error("give one or more case IDs, or --all")
+            started = time.perf_counter()
+            written = {}
+
+            def progress(dataset, rows):
+                written[dataset] = rows
+                rate = sum(written.values()) / max(time.perf_counter() - started, 1e-6)
+                print(f"\r{dataset}: {rows} rows ({rate:,.0f} rows/s overall)", end="", file=sys.stderr)
+
+            result = export_data(None if args.all else args.case_ids, args.output, args.format, args.compression,
+                                 args.fetch_size, progress)
+            print(file=sys.stderr)
+            print(format_export_stats(result))
+        elif args.command == "export-bundle":
+            manifest = export_case_bundle(args.case_id, args.output)
+            rows = sum(entry["rows"] for entry in manifest["files"].values())
+            print(f"{manifest['path']}: {rows} rows, {os.path.getsize(manifest['path'])} bytes "
+                  f"in {manifest['seconds']:.2f}s")
+        elif args.command == "import-bundle":
+            for path in args.files:
+                print(f"{path}:\n{format_bundle_stats(import_case_bundle(path))}")
+            refresh_correlation_index()  # The coalescing timers would not outlive this process
+            if Config.DNS_RESOLVE_ON_IMPORT:
+                print(format_resolution_stats(resolve_domains()))
+            if Config.ENRICH_ON_IMPORT and enrichment_available():
+                print(format_enrichment_stats(enrich_ips()))
+        elif args.command == "resolve-domains":
+            def progress(domains, ips):
+                print(f"\r{domains} domains, {ips} IPs linked", end="", file=sys.stderr)
+
+            backend = create_dns_backend(args.backend, args.nameserver, args.port)
+            stats = resolve_domains(args.all, backend=backend, concurrency=args.concurrency, progress=progress)
+            print(file=sys.stderr)
+            print(format_resolution_stats(stats))
+            if stats["linked"]["ips"] and Config.ENRICH_ON_IMPORT and enrichment_available():
+                print(format_enrichment_stats(enrich_ips()))
+        elif args.command == "enrich-ips":
+            def progress(rows, found):
+                print(f"\r{rows} IPs, {found} found", end="", file=sys.stderr)
+
+            stats = enrich_ips(args.batch_size, args.workers, progress)
+            print(file=sys.stderr)
+            print(format_enrichment_stats(stats))
+        elif args.command == "reports":
+            case_ids = [row[0] for row in get_osint_cases()] if args.all else args.case_ids
+            if not case_ids:
+                parser.error("give one or more case IDs, or --all")
+
+            def progress(done, total, result):
+                if "error" in result:
+                    print(f"[{done}/{total}] Case {result['case_id']}: FAILED - {result['error']}")
+                else:
+                    source = "cached" if result.get("cached") else f"{result['seconds']:.2f}s"
+                    print(f"[{done}/{total}] Case {result['case_id']}: {result['path']} ({source})")
+
+            results = generate_reports_batch(case_ids, args.output, args.workers, progress,
+                                             use_cache=not args.no_cache)
+            print(format_batch_summary(results))
+            return 1 if any("error" in result for result in results) else 0
+    finally:
+        close_db_pool()
+    return 0
+
+
 if __name__ == "__main__":
+    # Only here: spawned report workers import this module too, and log through init_worker_logging
+    log_listener = setup_logging()
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
     try:
         app = QApplication(sys.argv)
+        app.aboutToQuit.connect(close_db_pool)
+        app.aboutToQuit.connect(stop_change_feed)
         window = OSINTManager()
         window.show()
         sys.exit(app.exec())
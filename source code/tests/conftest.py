@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import uuid
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+# app.py lives next to this directory rather than in an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+class FakeClock:
+    """Stands in for app's `time` module: monotonic() only moves when advance() is called."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freezes the clock app.py reads; asyncio keeps the real one."""
+    fake = FakeClock()
+    monkeypatch.setattr(app, "time", fake)
+    return fake
+
+
+@pytest.fixture(scope="session")
+def postgres(tmp_path_factory):
+    """DSN of a server to create test databases on: TEST_DB_DSN, or a throwaway pgserver instance."""
+    dsn = os.getenv("TEST_DB_DSN")
+    if dsn:
+        yield dsn
+        return
+    pgserver = pytest.importorskip("pgserver", reason="set TEST_DB_DSN or pip install pgserver")
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("pgdata")), cleanup_mode="delete")
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture
+def database(postgres, monkeypatch):
+    """Points app's connection pool at a new, empty database for one test; yields its DSN.
+
+    Servers built without contrib (pgserver's, for one) lack pg_trgm, so the search index migration
+    becomes a no-op there; every other migration runs as shipped.
+    """
+    name = f"quantalyze_test_{uuid.uuid4().hex[:12]}"
+    admin = psycopg2.connect(postgres)
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(f"CREATE DATABASE {name}")
+        cur.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cur.fetchone() is None:
+            monkeypatch.setattr(app, "MIGRATIONS", [
+                (version, label, (lambda cur: None) if step is app.ensure_search_indexes else step, transactional)
+                for version, label, step, transactional in app.MIGRATIONS])
+    dsn = psycopg2.extensions.make_dsn(postgres, dbname=name)
+    monkeypatch.setattr(app, "DB_CONN", dsn)
+    monkeypatch.setattr(app, "_db_pool", None)
+    try:
+        yield dsn
+    finally:
+        app.close_db_pool()
+        with admin.cursor() as cur:
+            cur.execute(f"DROP DATABASE {name}")
+        admin.close()
@@ -0,0 +1,43 @@
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def no_background_jobs(monkeypatch):
+    """Imports schedule follow-up work on timers; none of it may outlive the test database."""
+    monkeypatch.setattr(app.correlation_refresher, "schedule", lambda: None)
+    monkeypatch.setattr(app, "schedule_ip_enrichment", lambda: None)
+    monkeypatch.setattr(app, "schedule_domain_resolution", lambda: None)
+
+
+def test_bundle_round_trip_on_an_upgraded_database(database, tmp_path):
+    app.run_migrations()
+    with app.db_cursor(commit=True) as cur:
+        # Databases older than the managed schema: persons.username is not unique
+        cur.execute("ALTER TABLE persons DROP CONSTRAINT persons_username_key")
+        cur.execute("INSERT INTO persons (full_name, username) VALUES ('Alice', 'alice'), ('Alice B.', 'alice')")
+        cur.execute("DELETE FROM schema_migrations WHERE version = 12")
+    assert app.run_migrations() == [12]
+
+    case_id = app.add_case("Phishing", "Alice", "alice", "")
+    with app.db_cursor(commit=True) as cur:
+        cur.execute("INSERT INTO ips (ip_address) VALUES ('192.0.2.1') RETURNING id")
+        cur.execute("INSERT INTO case_ips (case_id, ip_id) VALUES (%s, %s)", (case_id, cur.fetchone()[0]))
+        cur.execute("INSERT INTO notes (case_id, note) VALUES (%s, 'seen twice') RETURNING id", (case_id,))
+        cur.execute("INSERT INTO case_notes (case_id, note_id) VALUES (%s, %s)", (case_id, cur.fetchone()[0]))
+
+    manifest = app.export_case_bundle(case_id, str(tmp_path / "phishing.qcase"))
+    stats = app.import_case_bundle(manifest["path"])
+
+    assert stats["case_id"] != case_id
+    assert stats["created"]["ips"] == 0  # Linked to the existing row
+    with app.db_cursor() as cur:
+        cur.execute("SELECT full_name FROM persons WHERE username = 'alice'")
+        assert cur.fetchall() == [("Alice",)]
+        cur.execute("SELECT i.ip_address FROM case_ips l JOIN ips i ON i.id = l.ip_id WHERE l.case_id = %s",
+                    (stats["case_id"],))
+        assert cur.fetchall() == [("192.0.2.1",)]
+        cur.execute("SELECT n.note FROM case_notes l JOIN notes n ON n.id = l.note_id WHERE l.case_id = %s",
+                    (stats["case_id"],))
+        assert cur.fetchall() == [("seen twice",)]
@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+import app
+
+
+class StubListener:
+    """The parts of ChangeListener CaseCache uses: a connected event and subscribe()."""
+
+    def __init__(self):
+        self.connected = threading.Event()
+        self.connected.set()
+        self.callbacks = []
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+
+    def notify(self, change):
+        for callback in self.callbacks:
+            callback(change)
+
+
+# Parts as get_case_rows_page() keys them
+IP_ROWS = ("rows", "ips", ("ip_address",), 0, 200)
+DOMAIN_ROWS = ("rows", "domains", ("domain",), 0, 200)
+
+
+@pytest.fixture
+def listener():
+    return StubListener()
+
+
+@pytest.fixture
+def cache(listener):
+    return app.CaseCache(1024 * 1024, listener)
+
+
+def fill(cache, case_id, part="details", value="cached", entity_ids=None):
+    cache.put(case_id, value, cache.token(case_id), part, entity_ids)
+
+
+def test_case_change_drops_every_part_of_that_case_only(cache, listener):
+    fill(cache, 1)
+    fill(cache, 1, "overview")
+    fill(cache, 2)
+    listener.notify({"table": "cases", "case_id": 1, "ids": [1]})
+    assert cache.get(1) is None
+    assert cache.get(1, "overview") is None
+    assert cache.get(2) == "cached"
+
+
+def test_entity_change_drops_entries_showing_the_changed_rows(cache, listener):
+    fill(cache, 1, IP_ROWS, entity_ids={"ips": {10, 11}})
+    fill(cache, 2, IP_ROWS, entity_ids={"ips": {12}})
+    fill(cache, 3, DOMAIN_ROWS, entity_ids={"domains": {10}})
+    listener.notify({"table": "ips", "ids": [11]})
+    assert cache.get(1, IP_ROWS) is None
+    assert cache.get(2, IP_ROWS) == "cached"
+    assert cache.get(3, DOMAIN_ROWS) == "cached"
+
+
+def test_entity_change_without_ids_drops_every_entry_showing_that_table(cache, listener):
+    fill(cache, 1, IP_ROWS, entity_ids={"ips": {10}})
+    fill(cache, 2, DOMAIN_ROWS, entity_ids={"domains": {10}})
+    listener.notify({"table": "ips", "ids": None})
+    assert cache.get(1, IP_ROWS) is None
+    assert cache.get(2, DOMAIN_ROWS) == "cached"
+
+
+def test_change_of_unknown_table_drops_everything(cache, listener):
+    fill(cache, 1)
+    fill(cache, 2, IP_ROWS, entity_ids={"ips": {10}})
+    listener.notify({"table": None, "ids": None})
+    assert cache.stats()["entries"] == 0
+    assert cache.size == 0
+
+
+def test_load_overtaken_by_a_change_is_not_cached(cache, listener):
+    case_token = cache.token(1)
+    listener.notify({"table": "cases", "case_id": 1, "ids": [1]})
+    cache.put(1, "stale", case_token)
+
+    entity_token = cache.token(2)
+    listener.notify({"table": "ips", "ids": [10]})
+    cache.put(2, "stale", entity_token, entity_ids={"ips": {10}})
+    assert cache.get(1) is None
+    assert cache.get(2) is None
+
+
+def test_nothing_is_served_while_the_listener_is_disconnected(cache, listener):
+    fill(cache, 1)
+    listener.connected.clear()
+    assert cache.get(1) is None
+    listener.connected.set()
+    assert cache.get(1) == "cached"
+
+
+def test_oldest_entries_are_dropped_over_the_size_budget(listener):
+    cache = app.CaseCache(1, listener)
+    cache.max_bytes = app._approx_size("x" * 100) * 2
+    fill(cache, 1, value="x" * 100)
+    fill(cache, 2, value="x" * 100)
+    cache.get(1)
+    fill(cache, 3, value="x" * 100)
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
@@ -0,0 +1,208 @@
+import asyncio
+
+import pytest
+
+import app
+
+
+class StubBackend:
+    """In-process DNS backend answering from a table; counts every query it receives.
+
+    `answers` maps (name, rdtype) to ([values], ttl), an exception to raise, or a list of those used
+    one per query. Names missing from the table raise DnsNoRecords, like NXDOMAIN.
+    """
+
+    def __init__(self, answers=None, delay=0):
+        self.answers = answers or {}
+        self.delay = delay
+        self.calls = []
+
+    async def query(self, name, rdtype):
+        self.calls.append((name, rdtype))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        answer = self.answers.get((name, rdtype), app.DnsNoRecords(name))
+        if isinstance(answer, list):
+            answer = answer.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class RecordingAsyncio:
+    """Stands in for app's `asyncio` module, recording backoff sleeps instead of waiting them out."""
+
+    def __init__(self):
+        self.delays = []
+
+    async def sleep(self, delay):
+        self.delays.append(delay)
+
+    def __getattr__(self, name):
+        return getattr(asyncio, name)
+
+
+def resolve(backend, *lookups, cache=None, retries=0, concurrency=4):
+    """Runs resolve() for each (name, rdtype) in order on a fresh resolver; returns (results, resolver)."""
+    async def main():
+        resolver = app.AsyncResolver(backend, concurrency, retries, cache or app.DnsCache())
+        return [await resolver.resolve(name, rdtype) for name, rdtype in lookups], resolver
+    return asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def dns_settings(monkeypatch):
+    monkeypatch.setattr(app.Config, "DNS_NEGATIVE_TTL", 60)
+    monkeypatch.setattr(app.Config, "DNS_MAX_TTL", 3600)
+
+
+def test_cache_entry_expires_after_its_ttl(clock):
+    cache = app.DnsCache()
+    cache.put(("example.com", "A"), ["192.0.2.1"], 30)
+    clock.advance(29.9)
+    assert cache.get(("example.com", "A")) == ["192.0.2.1"]
+    clock.advance(0.1)
+    assert cache.get(("example.com", "A")) is None
+
+
+def test_cache_drops_least_recently_used_entry_when_full(clock):
+    cache = app.DnsCache(max_entries=2)
+    cache.put(("a.example", "A"), ["192.0.2.1"], 60)
+    cache.put(("b.example", "A"), ["192.0.2.2"], 60)
+    cache.get(("a.example", "A"))
+    cache.put(("c.example", "A"), ["192.0.2.3"], 60)
+    assert cache.get(("b.example", "A")) is None
+    assert cache.get(("a.example", "A")) == ["192.0.2.1"]
+    assert cache.get(("c.example", "A")) == ["192.0.2.3"]
+
+
+def test_answer_is_served_from_cache_until_ttl_expires(clock):
+    backend = StubBackend({("example.com", "A"): (["192.0.2.1"], 300)})
+    cache = app.DnsCache()
+    results, resolver = resolve(backend, ("example.com", "A"), ("example.com", "A"), cache=cache)
+    assert results == [["192.0.2.1"], ["192.0.2.1"]]
+    assert len(backend.calls) == 1
+    assert resolver.stats["cached"] == 1
+
+    clock.advance(300)
+    resolve(backend, ("example.com", "A"), cache=cache)
+    assert len(backend.calls) == 2
+
+
+def test_ttl_is_capped_at_dns_max_ttl(clock, monkeypatch):
+    monkeypatch.setattr(app.Config, "DNS_MAX_TTL", 10)
+    backend = StubBackend({("example.com", "A"): (["192.0.2.1"], 86400)})
+    cache = app.DnsCache()
+    resolve(backend, ("example.com", "A"), cache=cache)
+    clock.advance(10)
+    resolve(backend, ("example.com", "A"), cache=cache)
+    assert len(backend.calls) == 2
+
+
+def test_nxdomain_is_cached_for_the_negative_ttl(clock):
+    backend = StubBackend()  # Every name is NXDOMAIN
+    cache = app.DnsCache()
+    results, resolver = resolve(backend, ("missing.example", "A"), ("missing.example", "A"), cache=cache)
+    assert results == [[], []]
+    assert len(backend.calls) == 1
+    assert resolver.stats["negative"] == 1
+
+    clock.advance(60)
+    resolve(backend, ("missing.example", "A"), cache=cache)
+    assert len(backend.calls) == 2
+
+
+def test_nodata_is_cached_per_record_type(clock):
+    backend = StubBackend({("example.com", "A"): (["192.0.2.1"], 300)})  # No MX records
+    cache = app.DnsCache()
+    results, resolver = resolve(backend, ("example.com", "MX"), ("example.com", "A"), ("example.com", "MX"),
+                                cache=cache)
+    assert results == [[], ["192.0.2.1"], []]
+    assert backend.calls == [("example.com", "MX"), ("example.com", "A")]
+    assert resolver.stats["negative"] == 1
+
+
+def test_concurrent_lookups_of_one_name_share_a_query():
+    backend = StubBackend({("example.com", "A"): (["192.0.2.1"], 300)}, delay=0.01)
+
+    async def main():
+        resolver = app.AsyncResolver(backend, 4, 0, app.DnsCache())
+        return await asyncio.gather(*(resolver.resolve("example.com", "A") for _ in range(10)))
+
+    assert asyncio.run(main()) == [["192.0.2.1"]] * 10
+    assert backend.calls == [("example.com", "A")]
+
+
+def test_failed_query_is_retried_with_exponential_backoff(monkeypatch):
+    recorder = RecordingAsyncio()
+    monkeypatch.setattr(app, "asyncio", recorder)
+    backend = StubBackend({("example.com", "A"): [OSError("timeout"), OSError("timeout"), (["192.0.2.1"], 300)]})
+    results, resolver = resolve(backend, ("example.com", "A"), retries=2)
+    assert results == [["192.0.2.1"]]
+    assert recorder.delays == [0.25, 0.5]
+    assert resolver.stats["queries"] == 3
+    assert resolver.stats["failed"] == 0
+
+
+def test_lookup_failing_every_retry_returns_none_and_is_not_cached(monkeypatch):
+    monkeypatch.setattr(app, "asyncio", RecordingAsyncio())
+    backend = StubBackend({("example.com", "A"): OSError("timeout")})
+    cache = app.DnsCache()
+    results, resolver = resolve(backend, ("example.com", "A"), cache=cache, retries=1)
+    assert results == [None]
+    assert resolver.stats["failed"] == 1
+    assert cache.get(("example.com", "A")) is None
+
+
+def test_resolve_domain_normalizes_answers_and_drops_self_mx():
+    backend = StubBackend({
+        ("example.com", "A"): (["192.0.2.1"], 300),
+        ("example.com", "AAAA"): (["2001:0DB8::1"], 300),
+        ("example.com", "MX"): (["Mail.Example.com.", "example.com"], 300),
+    })
+
+    async def main():
+        resolver = app.AsyncResolver(backend, 4, 0, app.DnsCache())
+        return await resolver.resolve_domain("example.com", ["A", "AAAA", "MX"])
+
+    assert asyncio.run(main()) == {"ips": {"192.0.2.1", "2001:db8::1"}, "mx": {"mail.example.com"}}
+
+
+def test_resolve_domain_fails_when_any_record_type_fails(monkeypatch):
+    monkeypatch.setattr(app, "asyncio", RecordingAsyncio())
+    backend = StubBackend({("example.com", "A"): (["192.0.2.1"], 300), ("example.com", "MX"): OSError("refused")})
+
+    async def main():
+        resolver = app.AsyncResolver(backend, 4, 0, app.DnsCache())
+        return await resolver.resolve_domain("example.com", ["A", "MX"])
+
+    assert asyncio.run(main()) is None
+
+
+def test_write_dns_results_touches_every_case_showing_a_refreshed_entity(database, monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(app, "invalidate_cached_case", invalidated.append)
+    app.run_migrations()
+    with app.db_cursor(commit=True) as cur:
+        cur.execute("INSERT INTO cases (case_name, last_updated) SELECT name, '2000-01-01' "
+                    "FROM unnest(ARRAY['domain', 'address', 'other']) AS name RETURNING id")
+        by_domain, by_address, other = [row[0] for row in cur.fetchall()]
+        cur.execute("INSERT INTO domains (domain) VALUES ('example.com') RETURNING id")
+        domain_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO ips (ip_address) VALUES ('192.0.2.1') RETURNING id")
+        ip_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO case_domains (case_id, domain_id) VALUES (%s, %s)", (by_domain, domain_id))
+        # Already linked, so resolving adds no link to either case; both still show the bumped last_seen
+        cur.execute("INSERT INTO case_ips (case_id, ip_id) VALUES (%s, %s), (%s, %s)",
+                    (by_domain, ip_id, by_address, ip_id))
+
+    linked = app.write_dns_results([(domain_id, {"ips": {"192.0.2.1"}, "mx": set()})])
+
+    assert linked == {"ips": 0, "domains": 0}
+    assert sorted(invalidated) == sorted([by_domain, by_address])
+    with app.db_cursor() as cur:
+        cur.execute("SELECT id FROM cases WHERE last_updated > '2000-01-01' ORDER BY id")
+        assert [row[0] for row in cur.fetchall()] == sorted([by_domain, by_address])
+        cur.execute("SELECT last_seen IS NOT NULL, resolved_at IS NOT NULL FROM domains")
+        assert cur.fetchall() == [(True, True)]
+    assert other not in invalidated
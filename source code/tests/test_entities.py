@@ -0,0 +1,16 @@
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize("category, value, expected", [
+    ("IP Address", " 192.0.2.1 ", "192.0.2.1"),
+    ("IP Address", "2001:0DB8:0000::0001", "2001:db8::1"),
+    ("IP Address", "Not-An-IP", "not-an-ip"),
+    ("Domain", "Example.COM.", "example.com"),
+    ("Social Profile", "HTTPS://Twitter.COM/SomeUser/", "https://twitter.com/SomeUser"),
+    ("Social Profile", "twitter.com/someuser/", "twitter.com/someuser"),
+    ("Note", "  Keep Case  ", "Keep Case"),
+])
+def test_normalize_entity_value(category, value, expected):
+    assert app.normalize_entity_value(category, value) == expected
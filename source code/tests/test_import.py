@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("192.0.2.1", "IP Address"),
+    ("2001:db8::1", "IP Address"),
+    ("example.com", "Domain"),
+    ("sub.Example.co.uk", "Domain"),
+    ("https://twitter.com/someuser", "Social Profile"),
+    ("https://www.github.com/someuser", "Social Profile"),
+    ("https://example.com/page", "Note"),
+    ("seen on a forum", "Note"),
+    ("localhost", "Note"),
+])
+def test_detect_ioc_type(value, expected):
+    assert app.detect_ioc_type(value) == expected
+
+
+def test_read_lines_skips_blanks_and_comments(tmp_path):
+    path = tmp_path / "iocs.txt"
+    path.write_text("# exported list\n192.0.2.1\n\n  example.com  \n", encoding="utf-8")
+    assert list(app.read_ioc_file(str(path))) == [(None, "192.0.2.1"), (None, "example.com")]
+
+
+def test_read_csv_with_type_and_value_columns(tmp_path):
+    path = tmp_path / "iocs.csv"
+    path.write_text("Type,Value\nip,192.0.2.1\ndomains,example.com\nunknown,something\n", encoding="utf-8")
+    assert list(app.read_ioc_file(str(path))) == [
+        ("IP Address", "192.0.2.1"), ("Domain", "example.com"), (None, "something")]
+
+
+def test_read_csv_without_header_yields_every_cell(tmp_path):
+    path = tmp_path / "iocs.csv"
+    path.write_text("192.0.2.1,example.com\nhttps://t.me/someone\n", encoding="utf-8")
+    assert list(app.read_ioc_file(str(path))) == [
+        (None, "192.0.2.1"), (None, "example.com"), (None, "https://t.me/someone")]
+
+
+def test_read_json_list_of_values_and_typed_entries(tmp_path):
+    path = tmp_path / "iocs.json"
+    path.write_text(json.dumps(["192.0.2.1", {"type": "domain", "value": "example.com"},
+                                {"category": "Note", "value": "seen twice"}]), encoding="utf-8")
+    assert list(app.read_ioc_file(str(path))) == [
+        (None, "192.0.2.1"), ("Domain", "example.com"), ("Note", "seen twice")]
+
+
+def test_read_json_values_by_type(tmp_path):
+    path = tmp_path / "iocs.json"
+    path.write_text(json.dumps({"ips": ["192.0.2.1", "192.0.2.2"], "domains": "example.com"}), encoding="utf-8")
+    assert list(app.read_ioc_file(str(path))) == [
+        ("IP Address", "192.0.2.1"), ("IP Address", "192.0.2.2"), ("Domain", "example.com")]
+
+
+@pytest.mark.parametrize("values", [42, {"nested": ["example.com"]}, None])
+def test_read_json_rejects_values_that_are_not_strings_or_lists(tmp_path, values):
+    path = tmp_path / "iocs.json"
+    path.write_text(json.dumps({"domains": values}), encoding="utf-8")
+    with pytest.raises(ValueError, match="'domains'"):
+        list(app.read_ioc_file(str(path)))
+
+
+def test_read_format_overrides_extension(tmp_path):
+    path = tmp_path / "iocs.txt"
+    path.write_text(json.dumps({"ip": "192.0.2.1"}), encoding="utf-8")
+    assert list(app.read_ioc_file(str(path), "json")) == [("IP Address", "192.0.2.1")]
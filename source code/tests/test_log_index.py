@@ -0,0 +1,76 @@
+import gzip
+import os
+
+import app
+
+
+def log_line(day, text):
+    return f'{{"time": "{day} 12:00:00", "level": "INFO", "action": "{text}"}}\n'
+
+
+def read_range(path, start, end):
+    with app.open_log_segment(path) as f:
+        f.seek(start)
+        return f.read(end - start).decode()
+
+
+def test_log_index_ranges_cover_exactly_the_requested_days(tmp_path):
+    path = str(tmp_path / "user_activity.log")
+    with open(path, "w") as f:
+        f.write(log_line("2024-01-01", "a") + log_line("2024-01-02", "b") + "Traceback line\n"
+                + log_line("2024-01-02", "c") + log_line("2024-01-03", "d"))
+
+    ranges, position = app.LogIndex(path).ranges("2024-01-02", "2024-01-02")
+    assert len(ranges) == 1
+    assert read_range(*ranges[0]) == log_line("2024-01-02", "b") + "Traceback line\n" + log_line("2024-01-02", "c")
+    assert position[1] == os.path.getsize(path)
+
+
+def test_log_index_scans_only_appended_bytes_and_persists(tmp_path, monkeypatch):
+    path = str(tmp_path / "user_activity.log")
+    with open(path, "w") as f:
+        f.write(log_line("2024-01-01", "a"))
+    index = app.LogIndex(path)
+    index.update()
+
+    with open(path, "a") as f:
+        f.write(log_line("2024-01-02", "b"))
+    scanned = []
+    scan = index._scan
+    monkeypatch.setattr(index, "_scan", lambda f, entry, size: scanned.append(entry["size"]) or scan(f, entry, size))
+    ranges, _ = index.ranges("2024-01-02", "2024-01-02")
+    assert scanned == [len(log_line("2024-01-01", "a"))]
+    assert read_range(*ranges[0]) == log_line("2024-01-02", "b")
+
+    # A new instance starts from the sidecar
+    reloaded = app.LogIndex(path)
+    monkeypatch.setattr(reloaded, "_scan", lambda *args: scanned.append("rescanned"))
+    assert reloaded.ranges("2024-01-02", "2024-01-02")[0] == ranges
+    assert "rescanned" not in scanned
+
+
+def test_log_index_reads_rotated_gzip_segments_oldest_first(tmp_path):
+    path = str(tmp_path / "user_activity.log")
+    with gzip.open(path + ".1.gz", "wt") as f:
+        f.write(log_line("2024-01-01", "a") + log_line("2024-01-02", "b"))
+    os.utime(path + ".1.gz", (1, 1))
+    with open(path, "w") as f:
+        f.write(log_line("2024-01-02", "c") + log_line("2024-01-03", "d"))
+
+    ranges, _ = app.LogIndex(path).ranges("2024-01-02", "2024-01-03")
+    assert [os.path.basename(segment) for segment, _, _ in ranges] == ["user_activity.log.1.gz", "user_activity.log"]
+    assert "".join(read_range(*r) for r in ranges) == (
+        log_line("2024-01-02", "b") + log_line("2024-01-02", "c") + log_line("2024-01-03", "d"))
+
+
+def test_log_index_starts_over_when_the_file_is_replaced(tmp_path):
+    path = str(tmp_path / "user_activity.log")
+    with open(path, "w") as f:
+        f.write(log_line("2024-01-01", "a") + log_line("2024-01-02", "b"))
+    index = app.LogIndex(path)
+    index.update()
+
+    with open(path, "w") as f:
+        f.write(log_line("2024-02-01", "new"))
+    ranges, _ = index.ranges("2024-01-01", "2024-12-31")
+    assert [read_range(*r) for r in ranges] == [log_line("2024-02-01", "new")]
@@ -0,0 +1,70 @@
+import app
+
+ALL_VERSIONS = [version for version, _, _, _ in app.MIGRATIONS]
+
+
+def test_fresh_database_gets_every_migration_once(database):
+    assert app.run_migrations() == ALL_VERSIONS
+    assert app.pending_migrations() == []
+    assert app.run_migrations() == []
+
+
+def test_canonicalize_migration_merges_rows_differing_only_in_form(database):
+    app.run_migrations()
+    with app.db_cursor(commit=True) as cur:
+        cur.execute("INSERT INTO cases (case_name) VALUES ('a'), ('b') RETURNING id")
+        first, second = [row[0] for row in cur.fetchall()]
+        cur.execute("INSERT INTO ips (ip_address) VALUES ('2001:db8::1'), ('2001:0DB8::0001') RETURNING id")
+        canonical, legacy = [row[0] for row in cur.fetchall()]
+        cur.execute("INSERT INTO case_ips (case_id, ip_id) VALUES (%s, %s), (%s, %s), (%s, %s)",
+                    (first, canonical, first, legacy, second, legacy))
+        cur.execute("INSERT INTO social_profiles (profile_url) VALUES ('HTTPS://Twitter.COM/SomeUser/')")
+        cur.execute("DELETE FROM schema_migrations WHERE version = 11")
+
+    assert app.run_migrations() == [11]
+    with app.db_cursor() as cur:
+        cur.execute("SELECT id, ip_address FROM ips")
+        assert cur.fetchall() == [(canonical, "2001:db8::1")]
+        cur.execute("SELECT case_id, ip_id FROM case_ips ORDER BY case_id")
+        assert cur.fetchall() == [(first, canonical), (second, canonical)]
+        cur.execute("SELECT profile_url FROM social_profiles")
+        assert cur.fetchall() == [("https://twitter.com/SomeUser",)]
+
+
+def test_legacy_database_without_unique_keys_is_merged(database):
+    app.run_migrations()
+    with app.db_cursor(commit=True) as cur:
+        cur.execute("ALTER TABLE domains DROP CONSTRAINT domains_domain_key")
+        cur.execute("INSERT INTO cases (case_name) VALUES ('a') RETURNING id")
+        case_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO domains (domain) VALUES ('example.com'), ('Example.com.'), ('example.com') RETURNING id")
+        domain_ids = [row[0] for row in cur.fetchall()]
+        cur.execute("INSERT INTO case_domains (case_id, domain_id) SELECT %s, unnest(%s)", (case_id, domain_ids))
+        cur.execute("DELETE FROM schema_migrations WHERE version IN (2, 11)")
+
+    assert app.run_migrations() == [2, 11]
+    with app.db_cursor() as cur:
+        cur.execute("SELECT id, domain FROM domains")
+        assert cur.fetchall() == [(domain_ids[0], "example.com")]
+        cur.execute("SELECT domain_id FROM case_domains")
+        assert cur.fetchall() == [(domain_ids[0],)]
+        cur.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'domains_domain_key'")
+        assert cur.fetchone()
+
+
+def test_failed_migration_rolls_back_and_is_not_recorded(database, monkeypatch):
+    def broken(cur):
+        cur.execute("CREATE TABLE half_done (id integer)")
+        raise RuntimeError("step failed")
+
+    monkeypatch.setattr(app, "MIGRATIONS", app.MIGRATIONS + [(999, "Broken", broken, True)])
+    try:
+        app.run_migrations()
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("the broken migration should raise")
+    assert app.pending_migrations() == [(999, "Broken")]
+    with app.db_cursor() as cur:
+        cur.execute("SELECT to_regclass('half_done')")
+        assert cur.fetchone() == (None,)
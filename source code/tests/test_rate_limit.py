@@ -0,0 +1,35 @@
+import logging
+
+import app
+
+
+def record(action="Saved Case", details="ok", case_id=None, level=logging.INFO):
+    return logging.makeLogRecord({"levelno": level, "levelname": logging.getLevelName(level), "msg": "%s | %s",
+                                  "args": (action, details), "action": action, "details": details,
+                                  "case_id": case_id})
+
+
+def test_rate_limit_passes_a_burst_then_drops(clock):
+    limiter = app.RateLimitFilter(window=10, burst=2)
+    assert [limiter.filter(record()) for _ in range(4)] == [True, True, False, False]
+
+
+def test_rate_limit_counts_suppressed_records_after_the_window(clock):
+    limiter = app.RateLimitFilter(window=10, burst=1)
+    first = record()
+    assert limiter.filter(first) and first.suppressed == 0
+    assert not limiter.filter(record())
+    assert not limiter.filter(record())
+    clock.advance(10)
+    later = record()
+    assert limiter.filter(later)
+    assert later.suppressed == 2
+
+
+def test_rate_limit_keys_on_level_details_and_case(clock):
+    limiter = app.RateLimitFilter(window=10, burst=1)
+    assert limiter.filter(record(case_id=1))
+    assert limiter.filter(record(case_id=2))
+    assert limiter.filter(record(case_id=1, details="other"))
+    assert limiter.filter(record(case_id=1, level=logging.WARNING))
+    assert not limiter.filter(record(case_id=1))
@@ -0,0 +1,84 @@
+import re
+
+import pytest
+from reportlab import rl_config
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def uncompressed_pdf(monkeypatch):
+    """Leaves page content streams readable, so drawn text shows up as `(...) Tj` in the file."""
+    monkeypatch.setattr(rl_config, "pageCompression", 0)
+
+
+def page_count(pdf):
+    return len(re.findall(rb"/Type /Page\b(?!s)", pdf))
+
+
+def drawn_text(pdf):
+    """Every text run shown in the document, joined; a line switching fonts is split across runs."""
+    return b"".join(re.findall(rb"\(((?:[^()\\]|\\.)*)\) Tj", pdf))
+
+
+class RecordingDocTemplate(app.StreamingDocTemplate):
+    """Notes how far the source had been read each time a paragraph was drawn."""
+
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.produced = 0
+        self.backlog = []
+
+    def afterFlowable(self, flowable):
+        if isinstance(flowable, Paragraph):  # Page begin/end actions come through here too
+            self.backlog.append(self.produced)
+
+
+def test_streaming_template_reads_its_source_only_a_few_flowables_ahead(tmp_path):
+    style = getSampleStyleSheet()["Normal"]
+    doc = RecordingDocTemplate(str(tmp_path / "stream.pdf"), lookahead=4)
+
+    def source():
+        for i in range(300):
+            doc.produced += 1
+            yield Paragraph(f"line {i}", style)
+
+    doc.build_stream(source())
+
+    assert len(doc.backlog) == 300
+    # The i-th drawn flowable never waits behind more than the lookahead window
+    assert max(produced - drawn for drawn, produced in enumerate(doc.backlog, 1)) <= 4
+    pdf = (tmp_path / "stream.pdf").read_bytes()
+    assert page_count(pdf) > 1
+    assert pdf.count(b"(line 299) Tj") == 1
+
+
+def test_case_report_renders_every_row_across_pages(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(app.Config, "REPORT_TABLE_CHUNK", 40)
+    app.run_migrations()
+    with app.db_cursor(commit=True) as cur:
+        cur.execute("INSERT INTO cases (case_name, subject_name, username) "
+                    "VALUES ('Phishing', 'Alice', 'alice') RETURNING id")
+        case_id = cur.fetchone()[0]
+        cur.execute("INSERT INTO ips (ip_address) SELECT '10.0.' || (n / 256) || '.' || (n % 256) "
+                    "FROM generate_series(1, 300) AS n RETURNING id")
+        cur.execute("INSERT INTO case_ips (case_id, ip_id) SELECT %s, unnest(%s)",
+                    (case_id, [row[0] for row in cur.fetchall()]))
+        cur.execute("INSERT INTO notes (case_id, note) VALUES (%s, 'payload <script> & redirect') RETURNING id",
+                    (case_id,))
+        cur.execute("INSERT INTO case_notes (case_id, note_id) VALUES (%s, %s)", (case_id, cur.fetchone()[0]))
+
+    path = tmp_path / "report.pdf"
+    app.build_case_report(case_id, str(path))
+
+    pdf = path.read_bytes()
+    pages = page_count(pdf)
+    assert pages > 1
+    for n in range(1, 301):
+        assert pdf.count(f"(10.0.{n // 256}.{n % 256}) Tj".encode()) == 1
+    # The header row is repeated on every page a table continues onto, and once per chunk
+    assert pdf.count(b"(IP Address) Tj") >= max(pages, 300 // 40)
+    # Escaped, the note is drawn as typed instead of "<script>" being parsed (and rejected) as a tag
+    assert b"payload <script> & redirect" in drawn_text(pdf)